@@ -8,21 +8,38 @@ from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
 
 from .config import get_settings
+from .services.tracing import install_query_tracing
 
 settings = get_settings()
 
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,
+    echo=settings.SQL_ECHO,
     pool_pre_ping=True,  # Test connections before using
     pool_size=10,
     max_overflow=20,
 )
+install_query_tracing(engine)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional read replica for read-only endpoints (see dependencies.get_read_db)
+replica_engine = create_engine(
+    settings.DATABASE_REPLICA_URL,
+    echo=settings.SQL_ECHO,
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=20,
+) if settings.DATABASE_REPLICA_URL else None
+if replica_engine is not None:
+    install_query_tracing(replica_engine)
+
+ReplicaSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=replica_engine, info={'replica': True},
+) if replica_engine is not None else None
+
 # Base class for models
 Base = declarative_base()
 
@@ -40,5 +57,10 @@ def get_db() -> Generator[Session, None, None]:
 
 
 def init_db():
-    """Initialize database tables."""
+    """
+    Create missing tables directly from the models.
+    
+    For benchmarks and throwaway databases only; real databases are
+    managed by migrations (``alembic upgrade head``).
+    """
     Base.metadata.create_all(bind=engine)
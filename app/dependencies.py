@@ -0,0 +1,155 @@
+"""
+Request dependencies: per-client limits and read replica routing.
+"""
+
+import logging
+import math
+from typing import Callable, Dict, Generator, Optional, Tuple
+
+import redis
+from fastapi import HTTPException, Request
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .database import ReplicaSessionLocal, SessionLocal
+from .services.rate_limit import ImportSlots, get_rate_limiter
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+def route_limits() -> Dict[str, Tuple[float, int]]:
+    """Route group -> (requests per minute, burst), from settings."""
+    return {
+        'upload': (settings.RATE_LIMIT_UPLOAD_PER_MINUTE, settings.RATE_LIMIT_UPLOAD_BURST),
+        'product_writes': (settings.RATE_LIMIT_PRODUCT_WRITES_PER_MINUTE, settings.RATE_LIMIT_PRODUCT_WRITES_BURST),
+        'webhook_tests': (settings.RATE_LIMIT_WEBHOOK_TESTS_PER_MINUTE, settings.RATE_LIMIT_WEBHOOK_TESTS_BURST),
+    }
+
+
+def client_id(request: Request) -> str:
+    """
+    Identify the client a request is counted against.
+    
+    The peer address or, with RATE_LIMIT_PROXY_HOPS trusted proxies in
+    front of the API, the address the outermost of them saw in
+    X-Forwarded-For (entries further left can be forged by the client).
+    """
+    
+    hops = settings.RATE_LIMIT_PROXY_HOPS
+    if hops > 0:
+        forwarded = [ip.strip() for ip in request.headers.get('x-forwarded-for', '').split(',') if ip.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else 'unknown'
+
+
+def rate_limit(group: str) -> Callable[[Request], None]:
+    """
+    Dependency enforcing a route group's rate limit per client.
+    
+    Use as ``dependencies=[Depends(rate_limit("upload"))]``. Does nothing
+    unless RATE_LIMIT_ENABLED.
+    
+    Args:
+        group: Route group, a key of route_limits()
+        
+    Returns:
+        A dependency raising 429 with Retry-After when over the limit
+    """
+    
+    per_minute, burst = route_limits()[group]
+    
+    def check_rate_limit(request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        
+        wait = get_rate_limiter().hit(group, client_id(request), per_minute, burst)
+        if wait > 0:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Rate limit exceeded ({per_minute:g} requests per minute), try again later",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+    
+    return check_rate_limit
+
+
+def acquire_import_slot(request: Request, task_id: str) -> Optional[str]:
+    """
+    Reserve one of the client's MAX_CONCURRENT_IMPORTS_PER_CLIENT slots.
+    
+    Args:
+        request: Upload request (identifies the client)
+        task_id: New import's task id
+        
+    Returns:
+        The client holding the slot, to release it if the upload fails
+        before the import is enqueued; None if caps are disabled or
+        Redis is unavailable
+        
+    Raises:
+        HTTPException: 429 if the client already has the maximum running
+    """
+    
+    limit = settings.MAX_CONCURRENT_IMPORTS_PER_CLIENT
+    if not settings.RATE_LIMIT_ENABLED or limit <= 0:
+        return None
+    
+    client = client_id(request)
+    try:
+        acquired = ImportSlots().acquire(client, task_id, limit)
+    except redis.RedisError as e:
+        logger.warning(f"Import slots unavailable, allowing upload: {str(e)}")
+        return None
+    
+    if not acquired:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many imports running ({limit} allowed per client), try again when one finishes",
+            headers={"Retry-After": str(settings.IMPORT_BACKLOG_RETRY_AFTER)},
+        )
+    return client
+
+
+# Read-your-writes: set on a client's successful writes (ReadYourWritesMiddleware),
+# or sent by API clients that need the primary for a read
+READ_PRIMARY_COOKIE = 'read_primary'
+READ_PRIMARY_HEADER = 'x-read-primary'
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """
+    Database session for read-only endpoints.
+    
+    Uses the read replica (DATABASE_REPLICA_URL) when one is configured,
+    so listings do not compete with imports on the primary. A client
+    reads from the primary instead for REPLICA_STICKY_SECONDS after its
+    own writes (the read_primary cookie) or when it sends an
+    ``X-Read-Primary`` header, so it sees its changes despite replica
+    lag. If the replica cannot be reached the primary serves the read.
+    Replica sessions have ``info['replica']`` set.
+    """
+    
+    db = None
+    if ReplicaSessionLocal is not None and not _reads_primary(request):
+        db = ReplicaSessionLocal()
+        try:
+            db.connection()
+        except SQLAlchemyError as e:
+            logger.warning(f"Read replica unavailable, reading from the primary: {str(e)}")
+            db.close()
+            db = None
+    
+    if db is None:
+        db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _reads_primary(request: Request) -> bool:
+    """Whether a request asked for read-your-writes consistency."""
+    return READ_PRIMARY_COOKIE in request.cookies or request.headers.get(READ_PRIMARY_HEADER, '') not in ('', '0')
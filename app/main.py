@@ -2,14 +2,23 @@
 Main FastAPI application entry point.
 """
 
+import time
+
+_import_started = time.perf_counter()
+
 import logging
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
 import os
 
 from .config import get_settings
-from .database import init_db
+from .dependencies import READ_PRIMARY_COOKIE
+from .middleware import ReadYourWritesMiddleware, TracingMiddleware
+from .static_files import HashedStaticFiles
+from .services.metrics import render_metrics
+from .services.readiness import get_readiness
 from .routers import upload, products, webhooks
 
 # Configure logging
@@ -35,12 +44,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Profile-Id", "Retry-After"],
+)
+
+# Compress larger responses (product listings, UI assets)
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.GZIP_MIN_SIZE,
+    compresslevel=settings.GZIP_LEVEL,
 )
 
-# Mount static files
+# Reads after a client's writes skip the read replica
+if settings.DATABASE_REPLICA_URL:
+    app.add_middleware(ReadYourWritesMiddleware, cookie=READ_PRIMARY_COOKIE)
+
+# Request timing, SQL statement counts and opt-in profiling (outermost)
+app.add_middleware(TracingMiddleware)
+
+# Mount static files (content-hashed names are cached for a year)
 static_dir = os.path.join(os.path.dirname(__file__), 'static')
 if os.path.exists(static_dir):
-    app.mount("/static", StaticFiles(directory=static_dir), name="static")
+    app.mount("/static", HashedStaticFiles(directory=static_dir), name="static")
 
 # Include routers
 app.include_router(upload.router)
@@ -50,10 +74,14 @@ app.include_router(webhooks.router)
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup."""
-    logger.info("Initializing database...")
-    init_db()
-    logger.info("Database initialized")
+    """
+    Log how long the app took from import to ready.
+    
+    Nothing blocking runs here: the schema is managed by migrations
+    (``alembic upgrade head``, run once per deploy), and Celery and Redis
+    clients are created on first use.
+    """
+    logger.info(f"Ready in {(time.perf_counter() - _import_started) * 1000:.0f}ms after import")
 
 
 @app.get("/")
@@ -68,6 +96,29 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+def readiness_check():
+    """
+    Readiness probe: 200 while this instance can serve traffic, else 503.
+    
+    Checks database pool headroom and Redis latency, and reports import
+    queue depths; results are cached for READY_CACHE_SECONDS. /health
+    stays a liveness check (the process is up).
+    """
+    result = get_readiness().check()
+    return JSONResponse(
+        content={"status": "ready" if result['ready'] else "unavailable", **result},
+        status_code=200 if result['ready'] else 503,
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics (of every process in multiprocess mode)."""
+    body, content_type = render_metrics()
+    return Response(content=body, headers={"Content-Type": content_type})
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
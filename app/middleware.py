@@ -0,0 +1,141 @@
+"""
+Request tracing and read-your-writes middleware.
+"""
+
+import hmac
+import logging
+import os
+import uuid
+
+from starlette.datastructures import MutableHeaders
+
+from .config import get_settings
+from .services.metrics import HTTP_REQUEST_QUERIES, HTTP_REQUEST_SECONDS
+from .services.tracing import RequestTrace, SamplingProfiler, current_trace, shorten, write_profile
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+class TracingMiddleware:
+    """
+    Time each request and count the SQL statements it runs.
+    
+    Adds a Server-Timing header (total and database time, query count),
+    exports both to Prometheus per route, and logs requests slower than
+    SLOW_REQUEST_MS or repeating one statement N_PLUS_ONE_THRESHOLD
+    times (an N+1 query pattern).
+    
+    When PROFILING_ENABLED, a request carrying an ``X-Profile`` header
+    (equal to PROFILE_TOKEN, if set) is run under SamplingProfiler. Its
+    folded stacks are written to PROFILE_DIR/<id>.folded, the id being
+    returned in the ``X-Profile-Id`` header.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        trace = RequestTrace(f"{scope['method']} {scope['path']}")
+        token = current_trace.set(trace)
+        status_code = 500
+        
+        profiler = None
+        profile_id = None
+        if self._profile_requested(scope):
+            profile_id = uuid.uuid4().hex
+            profiler = SamplingProfiler(settings.PROFILE_INTERVAL_MS / 1000)
+            profiler.start()
+        
+        async def send_traced(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                headers = MutableHeaders(scope=message)
+                headers.append('Server-Timing', trace.server_timing())
+                if profile_id is not None:
+                    headers.append('X-Profile-Id', profile_id)
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_traced)
+        finally:
+            current_trace.reset(token)
+            if profiler is not None:
+                profiler.stop()
+            self._finish(scope, trace, status_code, profiler, profile_id)
+    
+    @staticmethod
+    def _profile_requested(scope) -> bool:
+        if not settings.PROFILING_ENABLED:
+            return False
+        for name, value in scope['headers']:
+            if name == b'x-profile':
+                return not settings.PROFILE_TOKEN or hmac.compare_digest(
+                    value.decode('latin-1'), settings.PROFILE_TOKEN
+                )
+        return False
+    
+    @staticmethod
+    def _finish(scope, trace: RequestTrace, status_code: int, profiler, profile_id) -> None:
+        seconds = trace.elapsed()
+        route = getattr(scope.get('route'), 'path', 'other')
+        
+        HTTP_REQUEST_SECONDS.labels(scope['method'], route, str(status_code)).observe(seconds)
+        HTTP_REQUEST_QUERIES.labels(route).observe(trace.queries)
+        
+        if seconds * 1000 >= settings.SLOW_REQUEST_MS:
+            logger.warning(
+                f"Slow request {trace.label} -> {status_code}: {seconds * 1000:.0f}ms, "
+                f"{trace.queries} queries in {trace.query_seconds * 1000:.0f}ms"
+            )
+        
+        statement, count = trace.most_repeated()
+        if count >= settings.N_PLUS_ONE_THRESHOLD:
+            logger.warning(f"Possible N+1 in {trace.label}: statement run {count} times: {shorten(statement)}")
+        
+        if profiler is not None:
+            path = os.path.join(settings.PROFILE_DIR, f"{profile_id}.folded")
+            folded = profiler.folded(scope.get('endpoint'))
+            hottest = write_profile(path, folded)
+            samples = sum(folded.values()) or 1
+            logger.info(
+                f"Profile {profile_id} of {trace.label}: {sum(folded.values())} samples in {path}; hottest: "
+                + ", ".join(f"{frame} {count / samples:.0%}" for frame, count in hottest)
+            )
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pin a client's reads to the primary database right after it writes.
+    
+    Successful requests with unsafe methods (POST, PUT, DELETE, ...) set
+    a read_primary cookie lasting REPLICA_STICKY_SECONDS, which
+    get_read_db honours by skipping the read replica, so a browser sees
+    its own changes even while the replica lags. Only installed when a
+    replica is configured.
+    """
+    
+    def __init__(self, app, cookie: str):
+        self.app = app
+        self.cookie = (
+            f"{cookie}=1; Max-Age={settings.REPLICA_STICKY_SECONDS}; Path=/; HttpOnly; SameSite=Lax"
+        )
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_marked(message):
+            if message['type'] == 'http.response.start' and message['status'] < 400:
+                MutableHeaders(scope=message).append('Set-Cookie', self.cookie)
+            await send(message)
+        
+        await self.app(scope, receive, send_marked)
@@ -2,7 +2,7 @@
 SQLAlchemy ORM models for the application.
 """
 
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, Index, event
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Boolean, Date, DateTime, Text, Index, UniqueConstraint, event, text
 from sqlalchemy.sql import func
 from datetime import datetime
 
@@ -13,6 +13,10 @@ class Product(Base):
     """Product model representing items in the catalog."""
     
     __tablename__ = "products"
+    __table_args__ = (
+        # Imports and the API match SKUs case-insensitively
+        Index("ix_products_sku_lower", text("lower(sku)")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     sku = Column(String(255), unique=True, nullable=False, index=True)
@@ -30,6 +34,27 @@ class Product(Base):
         return f"<Product(id={self.id}, sku={self.sku}, name={self.name})>"
 
 
+class CatalogStats(Base):
+    """
+    Catalog totals, maintained incrementally by every product write.
+    
+    Writers add their changes to one of a few slot rows, so concurrent
+    writers rarely wait on each other; the totals are the sums over all
+    slots, a constant-time read however large the catalog.
+    """
+    
+    __tablename__ = "catalog_stats"
+    
+    slot = Column(Integer, primary_key=True, autoincrement=False)
+    products = Column(BigInteger, nullable=False, default=0)
+    active_products = Column(BigInteger, nullable=False, default=0)
+    total_quantity = Column(BigInteger, nullable=False, default=0)
+    inventory_value = Column(Float, nullable=False, default=0.0)  # Sum of price * quantity
+    
+    def __repr__(self) -> str:
+        return f"<CatalogStats(slot={self.slot}, products={self.products})>"
+
+
 class Webhook(Base):
     """Webhook configuration for event notifications."""
     
@@ -71,20 +96,112 @@ class UploadTask(Base):
         return f"<UploadTask(id={self.id}, filename={self.filename}, status={self.status})>"
 
 
+class ImportCheckpoint(Base):
+    """
+    Committed position and counters of a CSV import.
+    
+    Updated in the same transaction as every batch, so a retried or
+    redelivered import resumes exactly after the last committed batch.
+    """
+    
+    __tablename__ = "import_checkpoints"
+    
+    task_id = Column(String(36), primary_key=True)
+    
+    # ResumePoint of the CSV parsers: byte offset of a record boundary, its
+    # row number, and the first row not yet committed
+    resume_offset = Column(BigInteger, nullable=True)
+    resume_row = Column(Integer, nullable=True)
+    next_row = Column(Integer, nullable=True)
+    
+    processed_rows = Column(Integer, nullable=False, default=0)
+    created_products = Column(Integer, nullable=False, default=0)
+    updated_products = Column(Integer, nullable=False, default=0)
+    failed_rows = Column(Integer, nullable=False, default=0)
+    duplicate_rows = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    completed = Column(Boolean, nullable=False, default=False)
+    
+    # Metadata
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self) -> str:
+        return f"<ImportCheckpoint(task_id={self.task_id}, next_row={self.next_row}, completed={self.completed})>"
+
+
 class WebhookLog(Base):
-    """Log webhook execution attempts."""
+    """
+    Log webhook execution attempts.
+    
+    Rows are kept for WEBHOOK_LOG_RETENTION_DAYS and pruned by the
+    prune_webhook_logs task; long-term figures live in WebhookDeliveryStats.
+    """
     
     __tablename__ = "webhook_logs"
+    __table_args__ = (
+        # Serves the per-webhook "latest logs" query without a sort
+        Index("ix_webhook_logs_webhook_id_created_at", "webhook_id", "created_at"),
+        # Serves retention pruning
+        Index("ix_webhook_logs_created_at", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    webhook_id = Column(Integer, nullable=False, index=True)
+    webhook_id = Column(Integer, nullable=False)
     event_type = Column(String(50), nullable=False)
     status_code = Column(Integer, nullable=True)
     response_body = Column(Text, nullable=True)
     error_message = Column(Text, nullable=True)
+    duration_ms = Column(Float, nullable=True)
     
     # Metadata
     created_at = Column(DateTime, server_default=func.now())
     
     def __repr__(self) -> str:
         return f"<WebhookLog(id={self.id}, webhook_id={self.webhook_id}, status_code={self.status_code})>"
+
+
+class WebhookDeliveryStats(Base):
+    """
+    Daily delivery counters per webhook and latency bucket.
+    
+    Maintained incrementally on every delivery attempt so success rate
+    and latency percentiles never require scanning webhook_logs.
+    """
+    
+    __tablename__ = "webhook_delivery_stats"
+    __table_args__ = (
+        UniqueConstraint("webhook_id", "day", "latency_bucket_ms", name="uq_webhook_delivery_stats_bucket"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    webhook_id = Column(Integer, nullable=False)
+    day = Column(Date, nullable=False, index=True)
+    latency_bucket_ms = Column(Integer, nullable=False)  # Upper bound of the latency bucket
+    attempts = Column(Integer, nullable=False, default=0)
+    successes = Column(Integer, nullable=False, default=0)
+    total_latency_ms = Column(Float, nullable=False, default=0.0)
+    
+    def __repr__(self) -> str:
+        return f"<WebhookDeliveryStats(webhook_id={self.webhook_id}, day={self.day}, bucket={self.latency_bucket_ms})>"
+
+
+class OutboxEvent(Base):
+    """
+    Webhook event waiting to be dispatched (transactional outbox).
+    
+    Rows are written in the same transaction as the change they describe
+    and removed by the outbox dispatcher once handed to the broker.
+    """
+    
+    __tablename__ = "webhook_outbox"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    event_type = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON-encoded event data
+    
+    # Metadata (UTC, set client-side so the dispatcher can age rows consistently)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<OutboxEvent(id={self.id}, event_type={self.event_type})>"
@@ -0,0 +1,41 @@
+"""
+Shared Redis client.
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+import redis
+
+from .config import get_settings
+
+
+@lru_cache
+def get_redis() -> redis.Redis:
+    """
+    Get the process-wide Redis client.
+    
+    Created on first use, and redis-py only connects on the first
+    command, so importing the app never waits on Redis. Every service
+    shares the client's connection pool instead of opening a pool per
+    request; the pool reconnects by itself in forked worker processes.
+    """
+    return redis.from_url(get_settings().REDIS_URL)
+
+
+@lru_cache
+def get_broker_redis() -> Optional[redis.Redis]:
+    """
+    Get a client for the Celery broker, to inspect its queues.
+    
+    Returns:
+        The shared client if the broker is the same Redis, a separate
+        one if it is another Redis, or None if the broker is not Redis
+    """
+    
+    settings = get_settings()
+    if settings.CELERY_BROKER_URL == settings.REDIS_URL:
+        return get_redis()
+    if not settings.CELERY_BROKER_URL.startswith(('redis://', 'rediss://', 'unix://')):
+        return None
+    return redis.from_url(settings.CELERY_BROKER_URL)
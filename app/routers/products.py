@@ -2,18 +2,62 @@
 Products router for CRUD operations and product management.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func, select
 
+from ..config import get_settings
 from ..database import get_db
+from ..dependencies import get_read_db, rate_limit
 from ..models import Product
-from ..schemas import ProductCreate, ProductUpdate, ProductResponse, ProductListResponse
+from ..schemas import ProductCreate, ProductUpdate, ProductResponse, ProductListResponse, CatalogStatsResponse
+from ..services.catalog_stats import CatalogStatsService, StatsDelta
+from ..services.catalog_version import etag_matches, get_catalog_version
+from ..services.product_events import ProductEventBatcher, record_product_events
+
+settings = get_settings()
 
 router = APIRouter(prefix="/api/products", tags=["products"])
 
+# ProductResponse fields, in order, fetched as plain rows for listings
+LIST_COLUMNS = (
+    Product.sku,
+    Product.name,
+    Product.description,
+    Product.price,
+    Product.quantity,
+    Product.active,
+    Product.id,
+    Product.created_at,
+    Product.updated_at,
+)
+LIST_FIELDS = tuple(column.key for column in LIST_COLUMNS)
+
+# Per-client rate limit shared by every product write
+WRITE_LIMITS = [Depends(rate_limit("product_writes"))]
+
+
+def read_cache_headers(db: Session, etag: Optional[str]) -> Optional[Dict[str, str]]:
+    """
+    Caching headers for a product read served from ``db``, if any.
+    
+    A read replica may not have caught up with the write behind the
+    current catalog version, and tagging its older rows with that version
+    would let caches keep them until the next write. Replica reads within
+    REPLICA_MAX_LAG_SECONDS of a catalog change are left uncached.
+    """
+    
+    if etag is None:
+        return None
+    if db.info.get('replica') and get_catalog_version().changed_within(settings.REPLICA_MAX_LAG_SECONDS):
+        return None
+    return get_catalog_version().cache_headers(etag)
+
 
-@router.post("/", response_model=ProductResponse, status_code=201)
+@router.post("/", response_model=ProductResponse, status_code=201, dependencies=WRITE_LIMITS)
 def create_product(
     product: ProductCreate,
     db: Session = Depends(get_db),
@@ -33,7 +77,14 @@ def create_product(
     
     db_product = Product(**product.model_dump())
     db.add(db_product)
+    db.flush()  # Apply column defaults before counting the product
+    
+    delta = StatsDelta()
+    delta.add(db_product.price, db_product.quantity, db_product.active)
+    CatalogStatsService.apply(db, delta)
+    record_product_events(db, ProductEventBatcher.CREATED, [db_product.sku])
     db.commit()
+    get_catalog_version().bump()
     db.refresh(db_product)
     
     return db_product
@@ -41,12 +92,13 @@ def create_product(
 
 @router.get("/", response_model=ProductListResponse)
 def list_products(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     sku: str = Query(None),
     name: str = Query(None),
     active: bool = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     List products with pagination and filtering.
@@ -56,52 +108,104 @@ def list_products(
     - **sku**: Filter by SKU (partial match)
     - **name**: Filter by name (partial match)
     - **active**: Filter by active status
+    
+    Rows are fetched as column tuples and encoded with orjson, skipping ORM
+    objects and response model validation; the body matches
+    ProductListResponse.
+    
+    The response carries the catalog version as its ETag; a request whose
+    If-None-Match still matches gets 304 without querying the database.
+    Served from the read replica, if configured (see get_read_db).
     """
     
-    # Build query
-    query = db.query(Product)
+    etag = get_catalog_version().etag()
+    if etag is not None and etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers=get_catalog_version().cache_headers(etag))
     
-    # Apply filters
+    # Build filters
+    filters = []
     if sku:
-        query = query.filter(Product.sku.ilike(f"%{sku}%"))
+        filters.append(Product.sku.ilike(f"%{sku}%"))
     if name:
-        query = query.filter(Product.name.ilike(f"%{name}%"))
+        filters.append(Product.name.ilike(f"%{name}%"))
     if active is not None:
-        query = query.filter(Product.active == active)
+        filters.append(Product.active == active)
     
     # Count total
-    total = query.count()
+    total = db.scalar(select(func.count()).select_from(Product).where(*filters))
     
     # Apply pagination
     offset = (page - 1) * page_size
-    items = query.offset(offset).limit(page_size).all()
+    rows = db.execute(
+        select(*LIST_COLUMNS).where(*filters).offset(offset).limit(page_size)
+    ).all()
     
     total_pages = (total + page_size - 1) // page_size
     
-    return ProductListResponse(
-        items=items,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages,
+    return ORJSONResponse({
+        'items': [dict(zip(LIST_FIELDS, row)) for row in rows],
+        'total': total,
+        'page': page,
+        'page_size': page_size,
+        'total_pages': total_pages,
+    }, headers=read_cache_headers(db, etag))
+
+
+@router.get("/stats", response_model=CatalogStatsResponse)
+def get_catalog_stats(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Catalog totals for the dashboard.
+    
+    Read from the incrementally maintained catalog_stats rows, so the
+    cost does not grow with the catalog; conditional on the catalog
+    version ETag and served from the read replica like other product reads.
+    """
+    
+    etag = get_catalog_version().etag()
+    if etag is not None and etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers=get_catalog_version().cache_headers(etag))
+    
+    stats = CatalogStatsService.get(db)
+    
+    headers = read_cache_headers(db, etag)
+    if headers is not None:
+        response.headers.update(headers)
+    return CatalogStatsResponse(
+        total_products=stats['products'],
+        active_products=stats['active_products'],
+        total_quantity=stats['total_quantity'],
+        inventory_value=stats['inventory_value'],
     )
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
 def get_product(
     product_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
 ):
-    """Get a single product by ID."""
+    """Get a single product by ID (conditional on the catalog version ETag; replica read)."""
+    
+    etag = get_catalog_version().etag()
+    if etag is not None and etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers=get_catalog_version().cache_headers(etag))
     
     product = db.query(Product).filter(Product.id == product_id).first()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
+    headers = read_cache_headers(db, etag)
+    if headers is not None:
+        response.headers.update(headers)
     return product
 
 
-@router.put("/{product_id}", response_model=ProductResponse)
+@router.put("/{product_id}", response_model=ProductResponse, dependencies=WRITE_LIMITS)
 def update_product(
     product_id: int,
     product_update: ProductUpdate,
@@ -113,18 +217,25 @@ def update_product(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
+    delta = StatsDelta()
+    delta.remove(product.price, product.quantity, product.active)
+    
     # Update only provided fields
     update_data = product_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(product, field, value)
     
+    delta.add(product.price, product.quantity, product.active)
+    CatalogStatsService.apply(db, delta)
+    record_product_events(db, ProductEventBatcher.UPDATED, [product.sku])
     db.commit()
+    get_catalog_version().bump()
     db.refresh(product)
     
     return product
 
 
-@router.delete("/{product_id}")
+@router.delete("/{product_id}", dependencies=WRITE_LIMITS)
 def delete_product(
     product_id: int,
     db: Session = Depends(get_db),
@@ -136,16 +247,51 @@ def delete_product(
         raise HTTPException(status_code=404, detail="Product not found")
     
     db.delete(product)
+    delta = StatsDelta()
+    delta.remove(product.price, product.quantity, product.active)
+    CatalogStatsService.apply(db, delta)
+    record_product_events(db, ProductEventBatcher.DELETED, [product.sku])
     db.commit()
+    get_catalog_version().bump()
     
     return {"message": "Product deleted successfully"}
 
 
-@router.delete("/")
+@router.delete("/", dependencies=WRITE_LIMITS)
 def delete_all_products(db: Session = Depends(get_db)):
-    """Delete all products (bulk delete)."""
+    """
+    Delete all products (bulk delete).
+    
+    Products are deleted in chunks so a product.deleted event can be
+    recorded for every removed SKU without loading the whole catalog.
+    All chunks are deleted in one transaction: a failure part way leaves
+    the catalog untouched, and cached reads are invalidated once.
+    """
+    
+    chunk_size = settings.PRODUCT_EVENT_BATCH_SIZE
+    count = 0
+    delta = StatsDelta()
+    
+    while True:
+        rows = db.query(Product.id, Product.sku, Product.price, Product.quantity, Product.active)\
+            .order_by(Product.id)\
+            .limit(chunk_size)\
+            .all()
+        if not rows:
+            break
+        
+        db.query(Product)\
+            .filter(Product.id.in_([row.id for row in rows]))\
+            .delete(synchronize_session=False)
+        for row in rows:
+            delta.remove(row.price, row.quantity, row.active)
+        record_product_events(db, ProductEventBatcher.DELETED, [row.sku for row in rows])
+        
+        count += len(rows)
     
-    count = db.query(Product).delete()
+    CatalogStatsService.apply(db, delta)
     db.commit()
+    if count:
+        get_catalog_version().bump()
     
     return {"message": f"Deleted {count} products"}
@@ -2,64 +2,197 @@
 Upload router for handling CSV file uploads and progress tracking.
 """
 
+import logging
 import os
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, BackgroundTasks
+import shutil
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
+from starlette.datastructures import UploadFile
+import redis
 import uuid
 
+from ..config import get_settings
 from ..database import get_db
+from ..dependencies import acquire_import_slot, rate_limit
 from ..schemas import UploadResponse, UploadProgressResponse
+from ..services.dedupe import DuplicateSkuFilter
+from ..services.import_errors import ImportErrorReport
 from ..services.progress import ProgressService
-from ..workers.tasks import process_csv_task
+from ..services.rate_limit import ImportSlots
+from ..workers.queues import import_queue, queue_depth
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/upload", tags=["upload"])
 
 
-@router.post("/", response_model=UploadResponse)
-async def upload_csv(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-):
+def check_import_backlog(queue: str) -> None:
     """
-    Upload a CSV file for product import.
+    Refuse a new import while its queue is over IMPORT_MAX_BACKLOG.
     
-    - **file**: CSV file with columns: sku, name, description, price, quantity, active
-    - Returns: task_id for tracking progress
+    Args:
+        queue: Queue the import would be sent to
+        
+    Raises:
+        HTTPException: 429 with Retry-After if the queue is saturated
     """
     
-    if not file.filename.lower().endswith('.csv'):
-        raise HTTPException(status_code=400, detail="File must be a CSV")
+    try:
+        depth = queue_depth(queue)
+    except redis.RedisError as e:
+        # Enqueueing will report the broker outage itself
+        logger.warning(f"Could not read depth of queue {queue}: {str(e)}")
+        return
     
-    # Generate unique task ID
-    task_id = str(uuid.uuid4())
+    if depth is not None and depth >= settings.IMPORT_MAX_BACKLOG:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Import queue is full ({depth} imports waiting), try again later",
+            headers={"Retry-After": str(settings.IMPORT_BACKLOG_RETRY_AFTER)},
+        )
+
+
+def declared_size(request: Request) -> Optional[int]:
+    """
+    Size of the request body from its Content-Length header.
+    
+    Args:
+        request: Upload request
+        
+    Returns:
+        Size in bytes, or None if the client did not declare it
+    """
+    
+    try:
+        return int(request.headers['content-length'])
+    except (KeyError, ValueError):
+        return None
+
+
+# The file is read from the form by upload_csv itself, so document it here
+UPLOAD_REQUEST_BODY = {
+    'requestBody': {
+        'required': True,
+        'content': {
+            'multipart/form-data': {
+                'schema': {
+                    'type': 'object',
+                    'required': ['file'],
+                    'properties': {'file': {'type': 'string', 'format': 'binary'}},
+                },
+            },
+        },
+    },
+}
+
+
+def save_upload(file: UploadFile, task_id: str) -> str:
+    """
+    Copy an uploaded file to the upload directory.
+    
+    Args:
+        file: Uploaded CSV
+        task_id: Import task id, prefixed to the file name
+        
+    Returns:
+        Path of the saved file
+    """
     
     # Create upload directory if it doesn't exist
     upload_dir = "/tmp/uploads"
     os.makedirs(upload_dir, exist_ok=True)
     
-    # Save file temporarily
     file_path = os.path.join(upload_dir, f"{task_id}_{file.filename}")
-    
-    contents = await file.read()
     with open(file_path, 'wb') as f:
-        f.write(contents)
+        shutil.copyfileobj(file.file, f)
+    return file_path
+
+
+def start_import(task_id: str, filename: str, file_path: str, queue: str) -> None:
+    """
+    Initialize progress tracking and enqueue the import task.
+    
+    Args:
+        task_id: Import task id
+        filename: Uploaded file name, for progress
+        file_path: Saved CSV
+        queue: Import queue to send the task to
+    """
     
-    # Initialize progress tracking
     progress_service = ProgressService()
-    progress_service.init_progress(task_id, file.filename)
+    progress_service.init_progress(task_id, filename)
     
-    # Trigger async Celery task
-    process_csv_task.delay(task_id, file_path)
+    # Imported here so the API starts without building the Celery app
+    from ..workers.tasks import process_csv_task
+    process_csv_task.apply_async((task_id, file_path), queue=queue)
+
+
+@router.post(
+    "/",
+    response_model=UploadResponse,
+    dependencies=[Depends(rate_limit("upload"))],
+    openapi_extra=UPLOAD_REQUEST_BODY,
+)
+async def upload_csv(
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """
+    Upload a CSV file for product import.
+    
+    - **file**: CSV file with columns: sku, name, description, price, quantity, active
+    - Returns: task_id for tracking progress
+    - 429 with Retry-After while the target import queue holds IMPORT_MAX_BACKLOG imports,
+      the client is over its upload rate limit or already has
+      MAX_CONCURRENT_IMPORTS_PER_CLIENT imports running
+      
+    The queue is picked and the limits are checked from Content-Length
+    before the body is received, so a saturated server refuses an
+    upload without buffering it. The form is parsed only afterwards.
+    Redis round trips and file writes run in the threadpool, so they
+    never block the event loop.
+    """
+    
+    # Small files skip the bulk import queue; shed load when it is backed up
+    queue = import_queue(declared_size(request))
+    await run_in_threadpool(check_import_backlog, queue)
+    
+    # Generate unique task ID
+    task_id = str(uuid.uuid4())
+    client = await run_in_threadpool(acquire_import_slot, request, task_id)
+    
+    try:
+        async with request.form() as form:
+            file = form.get('file')
+            if not isinstance(file, UploadFile):
+                raise HTTPException(status_code=422, detail="No file uploaded in the 'file' field")
+            if not file.filename or not file.filename.lower().endswith('.csv'):
+                raise HTTPException(status_code=400, detail="File must be a CSV")
+            filename = file.filename
+            
+            # Save file temporarily (large parts were spooled to disk by the form parser)
+            file_path = await run_in_threadpool(save_upload, file, task_id)
+        
+        await run_in_threadpool(start_import, task_id, filename, file_path, queue)
+    except Exception:
+        # Refused or failed before the import was enqueued: free the slot
+        if client is not None:
+            await run_in_threadpool(ImportSlots().release, client, task_id)
+        raise
     
     return UploadResponse(
         task_id=task_id,
-        filename=file.filename,
+        filename=filename,
         message="Upload started. Check progress at /api/upload/progress/{task_id}"
     )
 
 
 @router.get("/progress/{task_id}", response_model=UploadProgressResponse)
-async def get_upload_progress(
+def get_upload_progress(
     task_id: str,
 ):
     """
@@ -74,11 +207,51 @@ async def get_upload_progress(
     if not progress_data:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    return _progress_response(task_id, progress_data)
+
+
+@router.post("/cancel/{task_id}", response_model=UploadProgressResponse)
+def cancel_upload(
+    task_id: str,
+):
+    """
+    Stop an import after the batch it is writing.
+    
+    - **task_id**: The task ID returned from the upload endpoint
+    - Batches already written are kept; the progress status becomes
+      "cancelling", then "cancelled" once the import stops
+    """
+    
+    progress_service = ProgressService()
+    progress_data = progress_service.get_progress(task_id)
+    
+    if not progress_data:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    if progress_data.get('status') in ProgressService.FINISHED:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Task already {progress_data['status']}",
+        )
+    
+    progress_service.request_cancel(task_id)
+    
+    return _progress_response(task_id, progress_service.get_progress(task_id))
+
+
+def _progress_response(task_id: str, progress_data: dict) -> UploadProgressResponse:
+    """Build the progress response from stored progress data."""
+    
     # Calculate progress percentage
     total = progress_data.get('total_rows', 0)
     processed = progress_data.get('processed_rows', 0)
     progress_percentage = (processed / total * 100) if total > 0 else 0
     
+    duplicate_rows = progress_data.get('duplicate_rows', 0)
+    duplicates_report_url = f"/api/upload/duplicates/{task_id}" if duplicate_rows else None
+    failed_rows = progress_data.get('failed_rows', 0)
+    errors_report_url = f"/api/upload/errors/{task_id}" if failed_rows else None
+    
     return UploadProgressResponse(
         task_id=task_id,
         filename=progress_data.get('filename', ''),
@@ -87,9 +260,67 @@ async def get_upload_progress(
         processed_rows=processed,
         created_products=progress_data.get('created_products', 0),
         updated_products=progress_data.get('updated_products', 0),
-        failed_rows=progress_data.get('failed_rows', 0),
+        failed_rows=failed_rows,
+        errors_report_url=errors_report_url,
+        duplicate_rows=duplicate_rows,
+        duplicates_report_url=duplicates_report_url,
         progress_percentage=progress_percentage,
+        batch_size=progress_data.get('batch_size'),
+        batch_sizes=progress_data.get('batch_sizes', []),
+        metrics=progress_data.get('metrics'),
         error_message=progress_data.get('error_message'),
         created_at=progress_data.get('created_at'),
         completed_at=progress_data.get('completed_at'),
     )
+
+
+@router.get("/duplicates/{task_id}")
+def download_duplicates_report(
+    task_id: str,
+):
+    """
+    Download the report of rows that repeat a SKU seen earlier in the file.
+    
+    - **task_id**: The task ID returned from the upload endpoint
+    - Returns: CSV with row, sku, first_row and resolution (applied/ignored)
+    """
+    
+    progress_service = ProgressService()
+    if not progress_service.get_progress(task_id):
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    report_path = DuplicateSkuFilter.get_report_path(task_id)
+    if not os.path.exists(report_path):
+        raise HTTPException(status_code=404, detail="No duplicate SKUs found for this task")
+    
+    return FileResponse(
+        report_path,
+        media_type="text/csv",
+        filename=f"{task_id}_duplicates.csv",
+    )
+
+
+@router.get("/errors/{task_id}")
+def download_errors_report(
+    task_id: str,
+):
+    """
+    Download the report of rows rejected during an import.
+    
+    - **task_id**: The task ID returned from the upload endpoint
+    - Returns: CSV with row, sku, stage (parse/write) and error
+    """
+    
+    progress_service = ProgressService()
+    if not progress_service.get_progress(task_id):
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    report_path = ImportErrorReport.get_report_path(task_id)
+    if not os.path.exists(report_path):
+        raise HTTPException(status_code=404, detail="No rows were rejected for this task")
+    
+    return FileResponse(
+        report_path,
+        media_type="text/csv",
+        filename=f"{task_id}_errors.csv",
+    )
@@ -3,16 +3,22 @@ Webhooks router for CRUD operations and webhook management.
 """
 
 import time
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from ..database import get_db
+from ..dependencies import get_read_db, rate_limit
 from ..models import Webhook, WebhookLog
 from ..schemas import (
     WebhookCreate, WebhookUpdate, WebhookResponse,
-    WebhookLogResponse, WebhookTestRequest, WebhookTestResponse
+    WebhookLogResponse, WebhookTestRequest, WebhookTestResponse,
+    WebhookCircuitResponse, WebhookStatsResponse,
 )
-from ..services.webhook_service import WebhookService
+from ..services.circuit_breaker import CircuitBreaker
+from ..services.subscriptions import get_subscription_registry
+from ..services.webhook_logs import WebhookLogService
+from ..services.webhook_service import WebhookService, WebhookDeliveryError
 
 router = APIRouter(prefix="/api/webhooks", tags=["webhooks"])
 
@@ -29,6 +35,8 @@ def create_webhook(
     db.commit()
     db.refresh(db_webhook)
     
+    get_subscription_registry().publish_invalidation()
+    
     return db_webhook
 
 
@@ -88,6 +96,8 @@ def update_webhook(
     db.commit()
     db.refresh(webhook)
     
+    get_subscription_registry().publish_invalidation()
+    
     return webhook
 
 
@@ -105,10 +115,16 @@ def delete_webhook(
     db.delete(webhook)
     db.commit()
     
+    get_subscription_registry().publish_invalidation()
+    
     return {"message": "Webhook deleted successfully"}
 
 
-@router.post("/{webhook_id}/test", response_model=WebhookTestResponse)
+@router.post(
+    "/{webhook_id}/test",
+    response_model=WebhookTestResponse,
+    dependencies=[Depends(rate_limit("webhook_tests"))],
+)
 def test_webhook(
     webhook_id: int,
     test_request: WebhookTestRequest,
@@ -129,21 +145,25 @@ def test_webhook(
     
     start_time = time.time()
     try:
+        # Manual tests bypass an open circuit so operators can check recovery;
+        # the outcome is still recorded on the breaker.
         status_code, response_body = webhook_service.trigger_webhook(
             webhook.url,
             test_request.event_type,
-            {"test": True, "event_type": test_request.event_type}
+            {"test": True, "event_type": test_request.event_type},
+            respect_circuit=False,
         )
         response_time_ms = (time.time() - start_time) * 1000
         
         # Log the attempt
-        log = WebhookLog(
-            webhook_id=webhook_id,
-            event_type=test_request.event_type,
+        WebhookLogService.record(
+            db,
+            webhook_id,
+            test_request.event_type,
             status_code=status_code,
-            response_body=response_body[:500] if response_body else None,
+            response_body=response_body,
+            duration_ms=response_time_ms,
         )
-        db.add(log)
         db.commit()
         
         return WebhookTestResponse(
@@ -154,33 +174,89 @@ def test_webhook(
         )
     except Exception as e:
         response_time_ms = (time.time() - start_time) * 1000
+        status_code = e.status_code if isinstance(e, WebhookDeliveryError) else None
         
         # Log the failure
-        log = WebhookLog(
-            webhook_id=webhook_id,
-            event_type=test_request.event_type,
+        WebhookLogService.record(
+            db,
+            webhook_id,
+            test_request.event_type,
+            status_code=status_code,
             error_message=str(e),
+            duration_ms=response_time_ms,
         )
-        db.add(log)
         db.commit()
         
         return WebhookTestResponse(
             webhook_id=webhook_id,
-            status_code=None,
+            status_code=status_code,
             response_time_ms=response_time_ms,
             success=False,
             error_message=str(e),
         )
 
 
+def _circuit_response(webhook: Webhook, status: dict) -> WebhookCircuitResponse:
+    """Build the circuit status response for a webhook."""
+    
+    return WebhookCircuitResponse(
+        webhook_id=webhook.id,
+        url=webhook.url,
+        state=status['state'],
+        consecutive_failures=status['consecutive_failures'],
+        failure_threshold=status['failure_threshold'],
+        opened_at=datetime.fromtimestamp(status['opened_at']) if status['opened_at'] else None,
+        retry_at=datetime.fromtimestamp(status['retry_at']) if status['retry_at'] else None,
+    )
+
+
+@router.get("/{webhook_id}/circuit", response_model=WebhookCircuitResponse)
+def get_webhook_circuit(
+    webhook_id: int,
+    db: Session = Depends(get_db),
+):
+    """
+    Get the circuit breaker status for a webhook's endpoint.
+    
+    - **webhook_id**: ID of the webhook
+    """
+    
+    webhook = db.query(Webhook).filter(Webhook.id == webhook_id).first()
+    if not webhook:
+        raise HTTPException(status_code=404, detail="Webhook not found")
+    
+    return _circuit_response(webhook, CircuitBreaker().get_status(webhook.url))
+
+
+@router.post("/{webhook_id}/circuit/reset", response_model=WebhookCircuitResponse)
+def reset_webhook_circuit(
+    webhook_id: int,
+    db: Session = Depends(get_db),
+):
+    """
+    Force a webhook's circuit closed so deliveries resume immediately.
+    
+    - **webhook_id**: ID of the webhook
+    """
+    
+    webhook = db.query(Webhook).filter(Webhook.id == webhook_id).first()
+    if not webhook:
+        raise HTTPException(status_code=404, detail="Webhook not found")
+    
+    circuit_breaker = CircuitBreaker()
+    circuit_breaker.reset(webhook.url)
+    
+    return _circuit_response(webhook, circuit_breaker.get_status(webhook.url))
+
+
 @router.get("/{webhook_id}/logs", response_model=list[WebhookLogResponse])
 def get_webhook_logs(
     webhook_id: int,
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
-    Get recent logs for a webhook.
+    Get recent logs for a webhook (from the read replica, if configured).
     
     - **webhook_id**: ID of the webhook
     - **limit**: Maximum number of logs to return
@@ -197,3 +273,27 @@ def get_webhook_logs(
         .all()
     
     return logs
+
+
+@router.get("/{webhook_id}/stats", response_model=WebhookStatsResponse)
+def get_webhook_stats(
+    webhook_id: int,
+    days: int = Query(7, ge=1, le=365),
+    db: Session = Depends(get_db),
+):
+    """
+    Get aggregated delivery stats for a webhook.
+    
+    Served from daily counters, so the cost does not grow with log volume.
+    
+    - **webhook_id**: ID of the webhook
+    - **days**: Window size in days (including today)
+    """
+    
+    webhook = db.query(Webhook).filter(Webhook.id == webhook_id).first()
+    if not webhook:
+        raise HTTPException(status_code=404, detail="Webhook not found")
+    
+    stats = WebhookLogService.get_stats(db, webhook_id, days)
+    
+    return WebhookStatsResponse(webhook_id=webhook_id, **stats)
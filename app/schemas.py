@@ -3,7 +3,7 @@ Pydantic schemas for request/response validation.
 """
 
 from pydantic import BaseModel, HttpUrl, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 
 
@@ -52,6 +52,14 @@ class ProductListResponse(BaseModel):
     total_pages: int
 
 
+class CatalogStatsResponse(BaseModel):
+    """Schema for catalog totals (dashboard)."""
+    total_products: int
+    active_products: int
+    total_quantity: int
+    inventory_value: float  # Sum of price * quantity
+
+
 # ===== Webhook Schemas =====
 
 class WebhookBase(BaseModel):
@@ -91,14 +99,49 @@ class WebhookLogResponse(BaseModel):
     status_code: Optional[int]
     response_body: Optional[str]
     error_message: Optional[str]
+    duration_ms: Optional[float] = None
     created_at: datetime
     
     class Config:
         from_attributes = True
 
 
+class WebhookStatsResponse(BaseModel):
+    """Schema for aggregated webhook delivery stats."""
+    webhook_id: int
+    window_days: int
+    attempts: int
+    successes: int
+    failures: int
+    success_rate: Optional[float] = None
+    avg_latency_ms: Optional[float] = None
+    p95_latency_ms: Optional[float] = None
+
+
+class WebhookCircuitResponse(BaseModel):
+    """Schema for a webhook's circuit breaker status."""
+    webhook_id: int
+    url: str
+    state: str
+    consecutive_failures: int
+    failure_threshold: int
+    opened_at: Optional[datetime] = None
+    retry_at: Optional[datetime] = None
+
+
 # ===== Upload Schemas =====
 
+class ImportMetricsResponse(BaseModel):
+    """Schema for the stage timings of an import attempt."""
+    elapsed_seconds: float
+    rows_per_second: float
+    batches: int
+    parse_errors: int
+    commit_avg_ms: float
+    commit_max_ms: float
+    stage_seconds: Dict[str, float]
+
+
 class UploadProgressResponse(BaseModel):
     """Schema for upload progress response."""
     task_id: str
@@ -109,7 +152,13 @@ class UploadProgressResponse(BaseModel):
     created_products: int
     updated_products: int
     failed_rows: int
+    errors_report_url: Optional[str] = None
+    duplicate_rows: int = 0
+    duplicates_report_url: Optional[str] = None
     progress_percentage: float
+    batch_size: Optional[int] = None
+    batch_sizes: List[int] = []
+    metrics: Optional[ImportMetricsResponse] = None
     error_message: Optional[str] = None
     created_at: datetime
     completed_at: Optional[datetime] = None
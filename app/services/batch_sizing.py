@@ -0,0 +1,138 @@
+"""
+Adaptive import batch sizing from observed write latency and memory.
+"""
+
+import logging
+from typing import List
+
+from ..config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveBatchSizer:
+    """
+    Tune the import batch size from how the previous batches performed.
+    
+    Pass the sizer itself as ``batch_size`` to a parser (it is callable)
+    and report every written batch to ``observe``. The size:
+    
+    - shrinks in proportion when a batch takes longer than
+      ``target_seconds`` to write, or to fit the memory budget;
+    - otherwise grows by ``GROWTH`` while a larger batch still improves
+      throughput by at least ``MIN_GAIN``. When it stops paying off the
+      size steps back and holds there; that ceiling is re-probed every
+      ``PROBE_INTERVAL`` batches, as database load changes.
+      
+    Batches already parsed at an older size (the pipeline runs ahead)
+    are not used for growth decisions.
+    """
+    
+    GROWTH = 1.5
+    MIN_GAIN = 0.05  # Minimum relative throughput gain that justifies growing
+    PROBE_INTERVAL = 20  # Batches before a throughput ceiling is re-probed
+    HISTORY_LENGTH = 50  # Size changes kept for progress reporting
+    
+    def __init__(
+        self,
+        initial: int = None,
+        min_size: int = None,
+        max_size: int = None,
+        target_seconds: float = None,
+        memory_budget_mb: int = None,
+        buffered_batches: int = 1,
+    ):
+        """
+        Initialize sizer.
+        
+        Args:
+            initial: Starting batch size
+            min_size: Smallest batch size
+            max_size: Largest batch size
+            target_seconds: Longest acceptable write time per batch
+            memory_budget_mb: Memory allowed for all batches alive at once
+            buffered_batches: Batches alive at once (being written plus prefetched)
+        """
+        self.min_size = min_size or settings.BATCH_SIZE_MIN
+        self.max_size = max(max_size or settings.BATCH_SIZE_MAX, self.min_size)
+        self.target_seconds = target_seconds or settings.BATCH_TARGET_SECONDS
+        self.memory_budget = (memory_budget_mb or settings.BATCH_MEMORY_BUDGET_MB) * 1024 * 1024
+        self.buffered_batches = max(buffered_batches, 1)
+        
+        self.size = self._clamp(initial or settings.BATCH_SIZE, self.max_size)
+        self.history: List[int] = [self.size]
+        
+        self._last_rows = None
+        self._last_rate = None
+        self._ceiling = None
+        self._batches_since_ceiling = 0
+    
+    def __call__(self) -> int:
+        """Current batch size (lets the sizer stand in for a fixed size)."""
+        return self.size
+    
+    def observe(self, rows: int, seconds: float, nbytes: int = 0) -> int:
+        """
+        Record a written batch and pick the next batch size.
+        
+        Args:
+            rows: Rows in the batch
+            seconds: Time taken to write and commit it
+            nbytes: Approximate memory held by the batch
+            
+        Returns:
+            New batch size
+        """
+        
+        if rows <= 0:
+            return self.size
+        
+        seconds = max(seconds, 1e-6)
+        rate = rows / seconds
+        
+        limit = self.max_size
+        if nbytes:
+            limit = min(limit, int(self.memory_budget * rows / (nbytes * self.buffered_batches)))
+        
+        if self._ceiling is not None:
+            self._batches_since_ceiling += 1
+            if self._batches_since_ceiling >= self.PROBE_INTERVAL:
+                self._ceiling = None
+        
+        if seconds > self.target_seconds:
+            # Too slow: aim the next batch at the target latency
+            proposed = rows * max(self.target_seconds / seconds, 0.5)
+        elif rows != self.size:
+            # Partial final batch, or parsed before the last change took effect
+            proposed = self.size
+        elif self._last_rows is not None and rows > self._last_rows \
+                and rate < self._last_rate * (1 + self.MIN_GAIN):
+            # Growing no longer pays off: step back and hold
+            self._ceiling = self._last_rows
+            self._batches_since_ceiling = 0
+            proposed = self._last_rows
+        else:
+            # Grow, but not past the size expected to hit the target latency
+            proposed = rows * min(self.GROWTH, self.target_seconds / seconds)
+            if self._ceiling is not None:
+                proposed = min(proposed, self._ceiling)
+        
+        self._last_rows = rows
+        self._last_rate = rate
+        
+        size = self._clamp(proposed, limit)
+        if size != self.size:
+            logger.info(
+                f"Batch size {self.size} -> {size} "
+                f"({rows} rows written in {seconds:.2f}s, {rate:.0f} rows/s)"
+            )
+            self.size = size
+            self.history.append(size)
+            del self.history[:-self.HISTORY_LENGTH]
+        
+        return self.size
+    
+    def _clamp(self, size: float, limit: int) -> int:
+        """Bound a proposed size by ``limit`` and the configured range."""
+        return int(max(self.min_size, min(size, limit, self.max_size)))
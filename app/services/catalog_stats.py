@@ -0,0 +1,134 @@
+"""
+Incrementally maintained catalog totals for the dashboard.
+"""
+
+import logging
+import random
+from typing import Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from ..models import CatalogStats, Product
+from .upsert import upsert
+
+logger = logging.getLogger(__name__)
+
+
+class StatsDelta:
+    """Change to the catalog totals made by one write, applied at once."""
+    
+    __slots__ = ('products', 'active_products', 'total_quantity', 'inventory_value')
+    
+    def __init__(self):
+        self.products = 0
+        self.active_products = 0
+        self.total_quantity = 0
+        self.inventory_value = 0.0
+    
+    def add(self, price: Optional[float], quantity: Optional[int], active: Optional[bool], sign: int = 1) -> None:
+        """Count a product in (or, with ``sign=-1``, out of) the totals."""
+        quantity = quantity or 0
+        self.products += sign
+        self.active_products += sign if active else 0
+        self.total_quantity += sign * quantity
+        self.inventory_value += sign * (price or 0.0) * quantity
+    
+    def remove(self, price: Optional[float], quantity: Optional[int], active: Optional[bool]) -> None:
+        """Count a product out of the totals."""
+        self.add(price, quantity, active, sign=-1)
+    
+    def values(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    def __bool__(self) -> bool:
+        return any(getattr(self, name) for name in self.__slots__)
+
+
+class CatalogStatsService:
+    """
+    Read and maintain the catalog_stats totals.
+    
+    Every product write (CRUD routes and import batches) applies its
+    StatsDelta in the same transaction as the write, so a rollback,
+    including an import savepoint rolled back over a bad row, undoes both.
+    rebuild() recomputes the totals from the products table; it runs
+    daily to wash out any drift (concurrent writers updating the same
+    product from the same old values, floating-point error, rows changed
+    outside the application).
+    """
+    
+    SLOTS = 16
+    
+    @staticmethod
+    def apply(db: Session, delta: StatsDelta) -> None:
+        """
+        Add a write's changes to the totals. The caller commits.
+        
+        Args:
+            db: Database session (the one making the product write)
+            delta: Changes to add
+        """
+        
+        if not delta:
+            return
+        
+        upsert(
+            db,
+            CatalogStats.__table__,
+            key=('slot',),
+            rows={'slot': random.randrange(CatalogStatsService.SLOTS), **delta.values()},
+            increment=StatsDelta.__slots__,
+        )
+    
+    @staticmethod
+    def get(db: Session) -> dict:
+        """
+        Current totals: one query over the slot rows.
+        
+        Returns:
+            Dict with products, active_products, total_quantity and
+            inventory_value
+        """
+        
+        row = db.execute(select(
+            *(func.coalesce(func.sum(CatalogStats.__table__.c[name]), 0) for name in StatsDelta.__slots__)
+        )).one()
+        return dict(zip(StatsDelta.__slots__, row))
+    
+    @staticmethod
+    def rebuild(db: Session) -> dict:
+        """
+        Recompute the totals from the products table. The caller commits.
+        
+        The slot rows are locked first, so writers committing meanwhile
+        wait and then add their changes on top of the new totals. Every
+        slot row is (re)created, so writers only ever update locked rows.
+        
+        Returns:
+            The recomputed totals
+        """
+        
+        db.execute(select(CatalogStats.slot).with_for_update()).all()
+        
+        quantity = func.coalesce(Product.quantity, 0)
+        row = db.execute(select(
+            func.count(),
+            func.coalesce(func.sum(case((Product.active, 1), else_=0)), 0),
+            func.coalesce(func.sum(quantity), 0),
+            func.coalesce(func.sum(func.coalesce(Product.price, 0.0) * quantity), 0.0),
+        )).one()
+        totals = dict(zip(StatsDelta.__slots__, row))
+        
+        table = CatalogStats.__table__
+        zero = {name: 0 for name in StatsDelta.__slots__}
+        upsert(
+            db,
+            table,
+            key=('slot',),
+            rows=[{'slot': slot, **(totals if slot == 0 else zero)} for slot in range(CatalogStatsService.SLOTS)],
+        )
+        db.execute(table.delete().where(table.c.slot >= CatalogStatsService.SLOTS))
+        
+        logger.info(f"Rebuilt catalog stats: {totals}")
+        return totals
@@ -0,0 +1,130 @@
+"""
+Catalog version counter for HTTP caching of product reads.
+"""
+
+import logging
+import time
+from functools import lru_cache
+from typing import Dict, Optional
+
+import redis
+
+from ..config import get_settings
+from ..redis_client import get_redis
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class CatalogVersion:
+    """
+    A counter in Redis bumped after every committed product write.
+    
+    Product reads use it as their ETag, so a client (or CDN) holding a
+    response can be answered with 304 Not Modified without running the
+    query while the catalog is unchanged. Writers must bump *after*
+    their commit: a read racing a write then at worst tags new data with
+    the old version, which the bump invalidates.
+    
+    The counter starts at the current time in milliseconds, so versions
+    are not reused if Redis loses the key. The time of the last bump is
+    kept too, for reads from a replica that may not have the change yet.
+    """
+    
+    KEY = "catalog_version"
+    CHANGED_AT_KEY = "catalog_version:changed_at"
+    
+    def __init__(self):
+        """Use the shared Redis client."""
+        self.redis_client = get_redis()
+    
+    def current(self) -> Optional[int]:
+        """
+        Get the current version.
+        
+        Returns:
+            The version, or None if Redis is unavailable (no caching)
+        """
+        
+        try:
+            value = self.redis_client.get(self.KEY)
+            if value is None:
+                self.redis_client.set(self.KEY, int(time.time() * 1000), nx=True)
+                value = self.redis_client.get(self.KEY)
+            return int(value)
+        except redis.RedisError as e:
+            logger.warning(f"Catalog version unavailable, serving uncached: {str(e)}")
+            return None
+    
+    def bump(self) -> None:
+        """Invalidate cached product reads; call after committing a write."""
+        
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.set(self.KEY, int(time.time() * 1000), nx=True)
+            pipe.incr(self.KEY)
+            pipe.set(self.CHANGED_AT_KEY, time.time())
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.error(f"Failed to bump catalog version, cached reads may be stale: {str(e)}")
+    
+    def changed_within(self, seconds: float) -> bool:
+        """
+        Whether the catalog changed in the last ``seconds``.
+        
+        True if unknown (Redis unavailable), so callers err towards not
+        caching.
+        """
+        
+        try:
+            changed_at = self.redis_client.get(self.CHANGED_AT_KEY)
+        except redis.RedisError as e:
+            logger.warning(f"Catalog change time unavailable: {str(e)}")
+            return True
+        return changed_at is not None and time.time() - float(changed_at) < seconds
+    
+    def etag(self) -> Optional[str]:
+        """ETag for product reads at the current version (None: uncached)."""
+        version = self.current()
+        return f'W/"catalog-{version}"' if version is not None else None
+    
+    @staticmethod
+    def cache_headers(etag: str) -> Dict[str, str]:
+        """
+        Caching headers for a product read.
+        
+        Browsers revalidate after PRODUCT_CACHE_MAX_AGE seconds; shared
+        caches (CDNs) may serve the response for PRODUCT_CDN_MAX_AGE.
+        """
+        
+        return {
+            'ETag': etag,
+            'Cache-Control': (
+                f"public, max-age={settings.PRODUCT_CACHE_MAX_AGE}, "
+                f"s-maxage={settings.PRODUCT_CDN_MAX_AGE}"
+            ),
+        }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches ``etag`` (weak comparison).
+    
+    Args:
+        if_none_match: Header value, possibly a list or "*"
+        etag: Current ETag
+    """
+    
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    
+    opaque = etag.removeprefix('W/')
+    return any(candidate.strip().removeprefix('W/') == opaque for candidate in if_none_match.split(','))
+
+
+@lru_cache
+def get_catalog_version() -> CatalogVersion:
+    """Get the process-wide catalog version client."""
+    return CatalogVersion()
@@ -0,0 +1,79 @@
+"""
+Checkpoints that let an interrupted CSV import resume where it stopped.
+"""
+
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from .csv_parser import ResumePoint
+from ..models import ImportCheckpoint
+
+
+class ImportCheckpointService:
+    """Load and advance the committed position of an import."""
+    
+    @staticmethod
+    def start(db: Session, task_id: str) -> ImportCheckpoint:
+        """
+        Begin an import attempt and commit the attempt count.
+        
+        Args:
+            db: Database session
+            task_id: Import task identifier
+            
+        Returns:
+            The import's checkpoint, new for a first attempt
+        """
+        
+        checkpoint = db.get(ImportCheckpoint, task_id)
+        if checkpoint is None:
+            checkpoint = ImportCheckpoint(task_id=task_id, attempts=0)
+            db.add(checkpoint)
+        
+        checkpoint.attempts += 1
+        db.commit()
+        return checkpoint
+    
+    @staticmethod
+    def resume_point(checkpoint: ImportCheckpoint) -> Optional[ResumePoint]:
+        """
+        Where parsing continues, or None if no batch was committed yet.
+        
+        Args:
+            checkpoint: Import checkpoint
+        """
+        
+        if checkpoint.next_row is None:
+            return None
+        return ResumePoint(checkpoint.resume_offset, checkpoint.resume_row, checkpoint.next_row)
+    
+    @staticmethod
+    def advance(
+        checkpoint: ImportCheckpoint,
+        resume: ResumePoint,
+        processed_rows: int,
+        created_products: int,
+        updated_products: int,
+        failed_rows: int,
+        duplicate_rows: int,
+    ) -> None:
+        """
+        Record a batch as done; it takes effect when the batch commits.
+        
+        Args:
+            checkpoint: Import checkpoint (attached to the batch's session)
+            resume: ``batch.resume`` of the batch
+            processed_rows: Totals so far, including the batch
+            created_products: Totals so far, including the batch
+            updated_products: Totals so far, including the batch
+            failed_rows: Totals so far, including the batch
+            duplicate_rows: Totals so far, including the batch
+        """
+        
+        checkpoint.resume_offset, checkpoint.resume_row, checkpoint.next_row = resume
+        checkpoint.processed_rows = processed_rows
+        checkpoint.created_products = created_products
+        checkpoint.updated_products = updated_products
+        checkpoint.failed_rows = failed_rows
+        checkpoint.duplicate_rows = duplicate_rows
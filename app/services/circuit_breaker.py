@@ -0,0 +1,186 @@
+"""
+Circuit breaker for webhook endpoints, shared across workers via Redis.
+"""
+
+import hashlib
+import time
+from typing import Optional
+
+from ..config import get_settings
+from ..redis_client import get_redis
+
+settings = get_settings()
+
+
+class CircuitBreaker:
+    """
+    Per-URL circuit breaker with closed, open and half-open states.
+    
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    deliveries to that URL are shed for ``reset_timeout`` seconds. Once the
+    timeout elapses a single worker is allowed through as a probe; its
+    outcome closes the circuit again or re-opens it for another timeout.
+    """
+    
+    PREFIX = "webhook_circuit:"
+    PROBE_PREFIX = "webhook_circuit_probe:"
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(
+        self,
+        failure_threshold: int = None,
+        reset_timeout: int = None,
+    ):
+        """
+        Initialize thresholds; state lives in the shared Redis client.
+        
+        Args:
+            failure_threshold: Consecutive failures before the circuit opens
+            reset_timeout: Seconds the circuit stays open before a probe
+        """
+        self.redis_client = get_redis()
+        self.failure_threshold = failure_threshold or settings.CIRCUIT_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or settings.CIRCUIT_RESET_TIMEOUT
+    
+    @staticmethod
+    def _url_hash(url: str) -> str:
+        """Stable, fixed-length key component for a URL."""
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+    
+    def _key(self, url: str) -> str:
+        return f"{self.PREFIX}{self._url_hash(url)}"
+    
+    def _probe_key(self, url: str) -> str:
+        return f"{self.PROBE_PREFIX}{self._url_hash(url)}"
+    
+    def allow_request(self, url: str) -> bool:
+        """
+        Check whether a delivery to this URL may be attempted now.
+        
+        Args:
+            url: Webhook URL
+            
+        Returns:
+            True if the circuit is closed, or if this caller won the
+            half-open probe slot; False while the circuit is open
+        """
+        
+        data = self.redis_client.hgetall(self._key(url))
+        if not data or data.get(b'state', b'').decode() != self.OPEN:
+            return True
+        
+        opened_at = float(data.get(b'opened_at', 0))
+        if time.time() - opened_at < self.reset_timeout:
+            return False
+        
+        # Timeout elapsed: let exactly one caller probe the endpoint
+        return bool(self.redis_client.set(
+            self._probe_key(url), 1, nx=True, ex=self.reset_timeout
+        ))
+    
+    def record_success(self, url: str) -> None:
+        """
+        Close the circuit after a successful delivery.
+        
+        Args:
+            url: Webhook URL
+        """
+        
+        pipe = self.redis_client.pipeline()
+        pipe.delete(self._key(url))
+        pipe.delete(self._probe_key(url))
+        pipe.execute()
+    
+    def record_failure(self, url: str) -> None:
+        """
+        Count a failed delivery and open the circuit once the threshold is hit.
+        
+        Args:
+            url: Webhook URL
+        """
+        
+        key = self._key(url)
+        probe_key = self._probe_key(url)
+        
+        pipe = self.redis_client.pipeline()
+        pipe.hincrby(key, 'failures', 1)
+        pipe.hget(key, 'state')
+        pipe.exists(probe_key)
+        failures, state, probing = pipe.execute()
+        
+        was_open = state is not None and state.decode() == self.OPEN
+        if failures >= self.failure_threshold or (was_open and probing):
+            pipe = self.redis_client.pipeline()
+            pipe.hset(key, mapping={
+                'state': self.OPEN,
+                'opened_at': time.time(),
+                'url': url,
+            })
+            pipe.delete(probe_key)
+            pipe.execute()
+        
+        # Stale breakers for endpoints that are no longer called expire on their own
+        self.redis_client.expire(key, self.reset_timeout * 10)
+    
+    def retry_after(self, url: str) -> float:
+        """
+        Seconds until the circuit for this URL will admit a probe.
+        
+        Args:
+            url: Webhook URL
+            
+        Returns:
+            Remaining open time in seconds (0 when closed or probe-ready)
+        """
+        
+        opened_at = self.redis_client.hget(self._key(url), 'opened_at')
+        if opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.time() - float(opened_at)))
+    
+    def get_status(self, url: str) -> dict:
+        """
+        Get the breaker status for a URL.
+        
+        Args:
+            url: Webhook URL
+            
+        Returns:
+            Dictionary with state, consecutive failures and reopen time
+        """
+        
+        data = self.redis_client.hgetall(self._key(url))
+        failures = int(data.get(b'failures', 0)) if data else 0
+        state = data.get(b'state', b'').decode() if data else ''
+        
+        opened_at: Optional[float] = None
+        retry_at: Optional[float] = None
+        
+        if state == self.OPEN:
+            opened_at = float(data.get(b'opened_at', 0))
+            retry_at = opened_at + self.reset_timeout
+            if time.time() >= retry_at:
+                state = self.HALF_OPEN
+        else:
+            state = self.CLOSED
+        
+        return {
+            'state': state,
+            'consecutive_failures': failures,
+            'failure_threshold': self.failure_threshold,
+            'opened_at': opened_at,
+            'retry_at': retry_at,
+        }
+    
+    def reset(self, url: str) -> None:
+        """
+        Force the circuit closed (manual override).
+        
+        Args:
+            url: Webhook URL
+        """
+        
+        self.record_success(url)
@@ -0,0 +1,252 @@
+"""
+Columnar CSV parsing service for product imports.
+
+Reads the file in blocks of rows, transposes each block into column
+lists and validates whole columns at once with builtins (``map``,
+comprehensions over ``float``/``int``), instead of building a dict per
+row and validating it field by field. Valid rows go straight into a
+column-oriented ``ProductBatch``. Produces exactly the same batches and
+errors as ``CSVParser.parse_csv``.
+"""
+
+import csv
+from itertools import compress, islice
+from operator import itemgetter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from .csv_parser import CSVParser, CSVParseError, ResumePoint, RowError
+from .product_batch import ProductBatch
+
+TRUE_VALUES = frozenset(('true', '1', 'yes', 'y'))
+
+SKU_REQUIRED = "SKU is required and cannot be empty"
+NAME_REQUIRED = "Name is required and cannot be empty"
+
+
+class ColumnarCSVParser:
+    """Parse and validate product CSV files column by column."""
+    
+    @staticmethod
+    def parse_csv(
+        file_path: str,
+        batch_size: Union[int, Callable[[], int]] = 10000,
+        start: Optional[ResumePoint] = None,
+    ) -> Iterator[Tuple[ProductBatch, List[RowError]]]:
+        """
+        Parse CSV file and yield batches of product data.
+        
+        Args:
+            file_path: Path to the CSV file
+            batch_size: Number of rows per batch, or a callable returning
+                it, consulted at the start of every batch
+            start: Continue from this point (a ``batch.resume`` of an
+                earlier run) instead of the first row
+                
+        Yields:
+            (batch of products, rows rejected by validation); ``batch.resume``
+            is where parsing continues after it. The last batch may be
+            empty, carrying only the errors after the last valid row.
+        """
+        
+        try:
+            # Binary, decoded line by line, so f.tell() gives record offsets
+            with open(file_path, 'rb') as f:
+                reader = csv.reader(map(bytes.decode, f))
+                
+                header = next(reader, None)
+                if not header:
+                    raise CSVParseError("CSV file is empty")
+                
+                csv_columns = set(header)
+                required = set(CSVParser.REQUIRED_COLUMNS)
+                
+                if not required.issubset(csv_columns):
+                    missing = required - csv_columns
+                    raise CSVParseError(f"Missing required columns: {missing}")
+                
+                # Later duplicates win, as with csv.DictReader
+                index = {name: i for i, name in enumerate(header)}
+                sku_position = index['sku']
+                
+                next_size = batch_size if callable(batch_size) else lambda: batch_size
+                
+                batch = ProductBatch()
+                errors = []
+                limit = next_size()
+                row_num = 2  # Row numbers start after the header
+                
+                if start is not None:
+                    f.seek(start.offset)
+                    row_num = start.row
+                    while row_num < start.next_row:
+                        row = next(reader, None)
+                        if row is None:
+                            break
+                        if row:
+                            row_num += 1
+                
+                while True:
+                    # Resume points name the block's offset plus rows to skip in it
+                    block_offset = f.tell()
+                    block_row = row_num
+                    block = list(islice(reader, limit))
+                    if not block:
+                        break
+                    
+                    # csv.DictReader skips blank lines without numbering them
+                    rows = [row for row in block if row]
+                    if not rows:
+                        continue
+                    
+                    valid, row_errors = ColumnarCSVParser._validate_block(rows, index, row_num)
+                    
+                    # Cut batches by slicing the valid runs between invalid rows.
+                    # The k-th invalid row (in order) follows offset - k valid rows.
+                    offsets = sorted(row_errors)
+                    offsets.append(None)
+                    position = 0
+                    for k, offset in enumerate(offsets):
+                        cut = len(valid) if offset is None else offset - k
+                        while position < cut:
+                            take = min(limit - len(batch), cut - position)
+                            batch.extend(valid, position, position + take)
+                            position += take
+                            if len(batch) >= limit:
+                                batch.resume = ResumePoint(block_offset, block_row, batch.row_numbers[-1] + 1)
+                                yield batch, errors
+                                batch = ProductBatch()
+                                errors = []
+                                limit = next_size()
+                        if offset is not None:
+                            row = rows[offset]
+                            sku = row[sku_position].strip() if len(row) > sku_position else ''
+                            errors.append(RowError(row_num + offset, sku, row_errors[offset]))
+                    
+                    row_num += len(rows)
+                
+                # Yield remaining rows and errors
+                if batch or errors:
+                    batch.resume = ResumePoint(f.tell(), row_num, row_num)
+                    yield batch, errors
+        
+        except IOError as e:
+            raise CSVParseError(f"Failed to read file: {str(e)}")
+    
+    @staticmethod
+    def _column(rows: List[List[str]], position: Optional[int]) -> List[str]:
+        """Extract one stripped column from a block; short rows yield ''."""
+        
+        if position is None:
+            return []
+        
+        try:
+            return list(map(str.strip, map(itemgetter(position), rows)))
+        except IndexError:
+            return [row[position].strip() if len(row) > position else '' for row in rows]
+    
+    @staticmethod
+    def _validate_block(
+        rows: List[List[str]],
+        index: Dict[str, int],
+        first_row: int,
+    ) -> Tuple[ProductBatch, Dict[int, str]]:
+        """
+        Validate a block of raw rows column by column.
+        
+        Args:
+            rows: Raw CSV rows (lists of strings)
+            index: Column name to position mapping from the header
+            first_row: CSV row number of the first row in the block
+            
+        Returns:
+            (batch of the valid rows, {row offset: error message})
+        """
+        
+        column = ColumnarCSVParser._column
+        
+        skus = column(rows, index['sku'])
+        names = column(rows, index['name'])
+        descriptions = column(rows, index.get('description'))
+        price_strs = column(rows, index.get('price'))
+        qty_strs = column(rows, index.get('quantity'))
+        active_strs = column(rows, index.get('active'))
+        
+        errors: Dict[int, str] = {}
+        
+        # Required columns: first failing check wins, as in the row path
+        if not all(skus):
+            errors.update((i, SKU_REQUIRED) for i, sku in enumerate(skus) if not sku)
+        if not all(names):
+            for i, name in enumerate(names):
+                if not name and i not in errors:
+                    errors[i] = NAME_REQUIRED
+        
+        prices = None
+        if price_strs:
+            prices = ColumnarCSVParser._coerce(price_strs, float, "Invalid price value", errors)
+        
+        quantities = None
+        if qty_strs:
+            quantities = ColumnarCSVParser._coerce(qty_strs, int, "Invalid quantity value", errors)
+        
+        actives = None
+        if active_strs:
+            actives = [value.lower() in TRUE_VALUES if value else None for value in active_strs]
+        
+        if descriptions:
+            descriptions = [value or None for value in descriptions]
+        
+        row_numbers = range(first_row, first_row + len(rows))
+        columns = (row_numbers, skus, names, descriptions or None, prices, quantities, actives)
+        
+        try:
+            return ColumnarCSVParser._valid_rows(columns, errors), errors
+        except OverflowError:
+            # Quantities beyond the 32-bit INTEGER column are rare; find them only now
+            for i, quantity in enumerate(quantities):
+                if quantity is not None and not CSVParser.MIN_QUANTITY <= quantity <= CSVParser.MAX_QUANTITY:
+                    quantities[i] = None
+                    if i not in errors:
+                        errors[i] = f"Invalid quantity value: {qty_strs[i]}"
+            return ColumnarCSVParser._valid_rows(columns, errors), errors
+    
+    @staticmethod
+    def _valid_rows(columns: Tuple[Optional[List], ...], errors: Dict[int, str]) -> ProductBatch:
+        """Pack the rows without errors into a ProductBatch."""
+        
+        if errors:
+            keep = [True] * len(columns[1])
+            for i in errors:
+                keep[i] = False
+            columns = [None if values is None else list(compress(values, keep)) for values in columns]
+        
+        return ProductBatch.from_columns(*columns)
+    
+    @staticmethod
+    def _coerce(values: List[str], convert, message: str, errors: Dict[int, str]) -> List:
+        """
+        Convert a stripped column, recording the first error per row.
+        
+        Empty and invalid cells become None. Conversion runs as a single
+        ``map`` (or generator, if the column has empty cells) drained by
+        ``list.extend``; when a cell fails, the values converted so far
+        are kept and conversion resumes after the bad cell, so a column
+        is only ever walked once.
+        """
+        
+        converted = []
+        remaining = iter(values)
+        dense = all(values)
+        
+        while True:
+            try:
+                if dense:
+                    converted.extend(map(convert, remaining))
+                else:
+                    converted.extend(convert(value) if value else None for value in remaining)
+                return converted
+            except ValueError:
+                i = len(converted)
+                converted.append(None)
+                if i not in errors:
+                    errors[i] = f"{message}: {values[i]}"
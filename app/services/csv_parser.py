@@ -4,7 +4,9 @@ CSV parsing service for batch processing product imports.
 
 import csv
 from io import StringIO
-from typing import List, Tuple, Dict
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple, Dict, Union
+
+from .product_batch import ProductBatch
 
 
 class CSVParseError(Exception):
@@ -12,31 +14,62 @@ class CSVParseError(Exception):
     pass
 
 
+class ResumePoint(NamedTuple):
+    """
+    Where to continue parsing a CSV file.
+    
+    ``offset`` is the byte offset of a record boundary and ``row`` the
+    row number of the record starting there. Rows before ``next_row`` are
+    skipped: the columnar parser only knows the offsets of its blocks.
+    """
+    offset: int
+    row: int
+    next_row: int
+
+
+class RowError(NamedTuple):
+    """A CSV row rejected by validation."""
+    row: int
+    sku: str  # As given in the row, stripped; '' if missing
+    message: str
+
+
 class CSVParser:
     """Parse and validate CSV files for product imports."""
     
     REQUIRED_COLUMNS = ["sku", "name"]
     OPTIONAL_COLUMNS = ["description", "price", "quantity", "active"]
     
+    # Range of products.quantity (a 32-bit INTEGER column)
+    MIN_QUANTITY = -2 ** 31
+    MAX_QUANTITY = 2 ** 31 - 1
+    
     @staticmethod
     def parse_csv(
         file_path: str,
-        batch_size: int = 10000,
-    ) -> Tuple[List[Dict], List[str]]:
+        batch_size: Union[int, Callable[[], int]] = 10000,
+        start: Optional[ResumePoint] = None,
+    ) -> Iterator[Tuple[ProductBatch, List[RowError]]]:
         """
         Parse CSV file and yield batches of product data.
         
         Args:
             file_path: Path to the CSV file
-            batch_size: Number of rows per batch
-            
+            batch_size: Number of rows per batch, or a callable returning
+                it, consulted at the start of every batch
+            start: Continue from this point (a ``batch.resume`` of an
+                earlier run) instead of the first row
+                
         Yields:
-            (batch of product dicts, list of error messages)
+            (batch of products, rows rejected by validation); ``batch.resume``
+            is where parsing continues after it. The last batch may be
+            empty, carrying only the errors after the last valid row.
         """
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
+            # Binary, decoded line by line, so f.tell() gives record offsets
+            with open(file_path, 'rb') as f:
+                reader = csv.DictReader(map(bytes.decode, f))
                 
                 if not reader.fieldnames:
                     raise CSVParseError("CSV file is empty")
@@ -49,24 +82,39 @@ class CSVParser:
                     missing = required - csv_columns
                     raise CSVParseError(f"Missing required columns: {missing}")
                 
-                batch = []
+                next_size = batch_size if callable(batch_size) else lambda: batch_size
+                
+                first_row = 2  # Start at 2 (after header)
+                skip_until = first_row
+                if start is not None:
+                    f.seek(start.offset)
+                    first_row, skip_until = start.row, start.next_row
+                
+                batch = ProductBatch()
                 errors = []
+                limit = next_size()
                 
-                for row_num, row in enumerate(reader, start=2):  # Start at 2 (after header)
+                for row_num, row in enumerate(reader, start=first_row):
+                    if row_num < skip_until:
+                        continue
+                    
                     try:
                         product = CSVParser._validate_row(row)
-                        batch.append(product)
+                        batch.append(row_number=row_num, **product)
                         
-                        if len(batch) >= batch_size:
+                        if len(batch) >= limit:
+                            batch.resume = ResumePoint(f.tell(), row_num + 1, row_num + 1)
                             yield batch, errors
-                            batch = []
+                            batch = ProductBatch()
                             errors = []
+                            limit = next_size()
                     
                     except CSVParseError as e:
-                        errors.append(f"Row {row_num}: {str(e)}")
+                        errors.append(RowError(row_num, (row.get('sku') or '').strip(), str(e)))
                 
-                # Yield remaining rows
-                if batch:
+                # Yield remaining rows and errors
+                if batch or errors:
+                    batch.resume = ResumePoint(f.tell(), row_num + 1, row_num + 1)
                     yield batch, errors
         
         except IOError as e:
@@ -88,12 +136,12 @@ class CSVParser:
         """
         
         # SKU is required and must be non-empty
-        sku = row.get('sku', '').strip()
+        sku = (row.get('sku') or '').strip()
         if not sku:
             raise CSVParseError("SKU is required and cannot be empty")
         
         # Name is required and must be non-empty
-        name = row.get('name', '').strip()
+        name = (row.get('name') or '').strip()
         if not name:
             raise CSVParseError("Name is required and cannot be empty")
         
@@ -105,13 +153,13 @@ class CSVParser:
         
         # Description (optional)
         if 'description' in row:
-            desc = row.get('description', '').strip()
+            desc = (row.get('description') or '').strip()
             if desc:
                 product['description'] = desc
         
         # Price (optional, must be numeric if provided)
         if 'price' in row:
-            price_str = row.get('price', '').strip()
+            price_str = (row.get('price') or '').strip()
             if price_str:
                 try:
                     product['price'] = float(price_str)
@@ -120,16 +168,19 @@ class CSVParser:
         
         # Quantity (optional, must be integer if provided)
         if 'quantity' in row:
-            qty_str = row.get('quantity', '').strip()
+            qty_str = (row.get('quantity') or '').strip()
             if qty_str:
                 try:
-                    product['quantity'] = int(qty_str)
+                    quantity = int(qty_str)
                 except ValueError:
                     raise CSVParseError(f"Invalid quantity value: {qty_str}")
+                if not CSVParser.MIN_QUANTITY <= quantity <= CSVParser.MAX_QUANTITY:
+                    raise CSVParseError(f"Invalid quantity value: {qty_str}")
+                product['quantity'] = quantity
         
         # Active (optional, boolean)
         if 'active' in row:
-            active_str = row.get('active', '').strip().lower()
+            active_str = (row.get('active') or '').strip().lower()
             if active_str:
                 product['active'] = active_str in ('true', '1', 'yes', 'y')
         
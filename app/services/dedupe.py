@@ -0,0 +1,233 @@
+"""
+Per-import detection of SKUs repeated within the uploaded file.
+"""
+
+import logging
+import os
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .product_batch import ProductBatch
+from .reports import CSVReport
+from ..config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class DuplicateSkuFilter:
+    """
+    Resolve SKUs that occur more than once in one import.
+    
+    SKUs are compared case-insensitively. Every SKU seen so far is kept
+    with the row it first appeared on in a throwaway SQLite file next
+    to the upload, whose page cache is capped at DEDUPE_CACHE_MB, so
+    memory stays fixed however many rows the file has; only the current
+    batch's keys are held in Python.
+    
+    Policies:
+        last: later rows are applied on top of earlier ones (default)
+        first: later rows are dropped before writing
+        
+    Every repeated row is written to a CSV conflict report.
+    
+    Under last-wins the importer also records which SKUs were written
+    (``record_written``), so a later row can be told apart as a repeat
+    applied on top of a written row (``written``) rather than a row
+    whose earlier occurrences were all rejected.
+    
+    The store survives an interrupted import (WAL journal, so a killed
+    worker cannot corrupt it) and is reopened when the import resumes.
+    """
+    
+    LAST_WINS = "last"
+    FIRST_WINS = "first"
+    POLICIES = (LAST_WINS, FIRST_WINS)
+    
+    LOOKUP_CHUNK = 999  # Keys per lookup query
+    REPORT_HEADER = ['row', 'sku', 'first_row', 'resolution']
+    
+    def __init__(
+        self,
+        task_id: str,
+        policy: str = None,
+        cache_mb: int = None,
+        resume_row: Optional[int] = None,
+    ):
+        """
+        Initialize filter.
+        
+        Args:
+            task_id: Import task identifier (names the report and store)
+            policy: One of POLICIES (defaults to DUPLICATE_SKU_POLICY)
+            cache_mb: Page cache of the seen-SKU store, in megabytes
+            resume_row: First row not committed by an interrupted attempt,
+                when resuming one; SKUs first seen from there on are forgotten
+        """
+        
+        self.policy = policy or settings.DUPLICATE_SKU_POLICY
+        if self.policy not in self.POLICIES:
+            raise ValueError(f"Unknown duplicate SKU policy: {self.policy}")
+        
+        self.task_id = task_id
+        self.duplicate_count = 0
+        self.report_path = self.get_report_path(task_id)
+        self._report = CSVReport(self.report_path, self.REPORT_HEADER, resume_row)
+        
+        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+        self._store_path = os.path.join(settings.UPLOAD_DIR, f"{task_id}_skus.sqlite")
+        if resume_row is None:
+            self._remove_store()
+        
+        cache_kb = (cache_mb or settings.DEDUPE_CACHE_MB) * 1024
+        self._store = sqlite3.connect(self._store_path, isolation_level=None)
+        self._store.execute("PRAGMA journal_mode = WAL")
+        self._store.execute("PRAGMA synchronous = OFF")
+        self._store.execute(f"PRAGMA cache_size = -{cache_kb}")
+        self._store.execute(
+            "CREATE TABLE IF NOT EXISTS seen "
+            "(sku_key TEXT PRIMARY KEY, first_row INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        
+        self._store.execute(
+            "CREATE TABLE IF NOT EXISTS written "
+            "(sku_key TEXT PRIMARY KEY, first_row INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        
+        if resume_row is not None:
+            # Recorded by the interrupted attempt for batches it never committed
+            self._store.execute("DELETE FROM seen WHERE first_row >= ?", (resume_row,))
+            self._store.execute("DELETE FROM written WHERE first_row >= ?", (resume_row,))
+    
+    @staticmethod
+    def get_report_path(task_id: str) -> str:
+        """
+        Location of an import's conflict report.
+        
+        Args:
+            task_id: Import task identifier
+            
+        Returns:
+            Path of the CSV report (it exists only if duplicates were found)
+        """
+        return os.path.join(settings.UPLOAD_DIR, "reports", f"{task_id}_duplicates.csv")
+    
+    def filter(self, batch: ProductBatch) -> Tuple[ProductBatch, int]:
+        """
+        Record a batch's SKUs and apply the policy to repeated ones.
+        
+        Args:
+            batch: Parsed batch, in file order
+            
+        Returns:
+            Tuple of (batch to write, number of repeated rows in it)
+        """
+        
+        keys = [sku.lower() for sku in batch.skus]
+        first_rows = self._lookup(keys)
+        
+        new_keys = []
+        keep = []
+        duplicates = 0
+        resolution = 'ignored' if self.policy == self.FIRST_WINS else 'applied'
+        
+        for index, key in enumerate(keys):
+            row_number = batch.row_numbers[index]
+            first_row = first_rows.get(key)
+            
+            if first_row is None:
+                first_rows[key] = row_number
+                new_keys.append((key, row_number))
+                keep.append(True)
+            else:
+                duplicates += 1
+                keep.append(False)
+                self._report.add([row_number, batch.skus[index], first_row, resolution])
+        
+        # Key order keeps the inserts local in the store's B-tree
+        new_keys.sort()
+        self._store.execute("BEGIN")
+        self._store.executemany("INSERT INTO seen (sku_key, first_row) VALUES (?, ?)", new_keys)
+        self._store.execute("COMMIT")
+        
+        self.duplicate_count += duplicates
+        if duplicates and self.policy == self.FIRST_WINS:
+            batch = batch.select(keep)
+        
+        return batch, duplicates
+    
+    def written(self, skus: List[str]) -> Set[str]:
+        """
+        Which SKUs earlier batches wrote to the database.
+        
+        Args:
+            skus: SKUs of the batch about to be written
+            
+        Returns:
+            Lower-cased SKUs recorded by ``record_written``
+        """
+        return set(self._lookup([sku.lower() for sku in skus], table='written'))
+    
+    def record_written(self, skus: Iterable[str], first_row: int) -> None:
+        """
+        Remember SKUs a batch created or updated (before committing it).
+        
+        Args:
+            skus: Created and updated SKUs of the batch
+            first_row: The batch's first row, for dropping the record if
+                the batch is not committed
+        """
+        
+        rows = sorted({(sku.lower(), first_row) for sku in skus})
+        self._store.execute("BEGIN")
+        self._store.executemany("INSERT OR IGNORE INTO written (sku_key, first_row) VALUES (?, ?)", rows)
+        self._store.execute("COMMIT")
+    
+    def _lookup(self, keys: List[str], table: str = 'seen') -> Dict[str, int]:
+        """First row of every key already in ``table`` (seen or written)."""
+        
+        found: Dict[str, int] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        
+        for start in range(0, len(unique_keys), self.LOOKUP_CHUNK):
+            chunk = unique_keys[start:start + self.LOOKUP_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            found.update(self._store.execute(
+                f"SELECT sku_key, first_row FROM {table} WHERE sku_key IN ({placeholders})",
+                chunk,
+            ))
+        
+        return found
+    
+    def _remove_store(self) -> None:
+        """Delete the seen-SKU store and its WAL files, if present."""
+        for path in (self._store_path, f"{self._store_path}-wal", f"{self._store_path}-shm"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to delete SKU store {path}: {str(e)}")
+    
+    def flush(self) -> None:
+        """Write out buffered report lines (before committing the batch)."""
+        self._report.flush()
+    
+    def close(self, keep_store: bool = False) -> None:
+        """
+        Finish the report and delete the seen-SKU store.
+        
+        Args:
+            keep_store: Keep the store for a resumed attempt
+        """
+        
+        self._report.close()
+        self._store.close()
+        if not keep_store:
+            self._remove_store()
+        
+        if self.duplicate_count:
+            logger.info(
+                f"Import {self.task_id}: {self.duplicate_count} repeated SKU rows "
+                f"({self.policy} wins), report at {self.report_path}"
+            )
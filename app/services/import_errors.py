@@ -0,0 +1,85 @@
+"""
+Per-import report of rejected CSV rows.
+"""
+
+import os
+from typing import List, Optional
+
+from .csv_parser import RowError
+from .reports import CSVReport
+from ..config import get_settings
+
+settings = get_settings()
+
+
+class ImportErrorReport:
+    """
+    Collect rows an import rejected, with the reason, in a CSV file.
+    
+    Rows rejected by the parser (validation) and by the database (the
+    writer isolates them from the rest of their batch) share one report.
+    The file is only created once the first row is rejected.
+    """
+    
+    PARSE = "parse"
+    WRITE = "write"
+    
+    REPORT_HEADER = ['row', 'sku', 'stage', 'error']
+    
+    def __init__(self, task_id: str, resume_row: Optional[int] = None):
+        """
+        Initialize report.
+        
+        Args:
+            task_id: Import task identifier (names the report)
+            resume_row: First row not committed by an interrupted attempt,
+                when resuming one
+        """
+        self.task_id = task_id
+        self.count = 0
+        self.report_path = self.get_report_path(task_id)
+        self._report = CSVReport(self.report_path, self.REPORT_HEADER, resume_row)
+    
+    @staticmethod
+    def get_report_path(task_id: str) -> str:
+        """
+        Location of an import's error report.
+        
+        Args:
+            task_id: Import task identifier
+            
+        Returns:
+            Path of the CSV report (it exists only if rows were rejected)
+        """
+        return os.path.join(settings.UPLOAD_DIR, "reports", f"{task_id}_errors.csv")
+    
+    def add(self, row_number: int, sku: str, stage: str, error: str) -> None:
+        """
+        Record one rejected row.
+        
+        Args:
+            row_number: CSV row number
+            sku: SKU of the row, if known
+            stage: PARSE or WRITE
+            error: Why the row was rejected
+        """
+        self._report.add([row_number, sku, stage, error])
+        self.count += 1
+    
+    def add_parse_errors(self, errors: List[RowError]) -> None:
+        """
+        Record the validation errors of a parsed batch.
+        
+        Args:
+            errors: Rows the parser rejected
+        """
+        for error in errors:
+            self.add(error.row, error.sku, self.PARSE, error.message)
+    
+    def flush(self) -> None:
+        """Write out buffered lines (before committing the batch)."""
+        self._report.flush()
+    
+    def close(self) -> None:
+        """Flush and close the report file."""
+        self._report.close()
@@ -0,0 +1,198 @@
+"""
+Prometheus metrics and per-import stage timings.
+
+The API serves them on /metrics; Celery workers start their own endpoint
+on WORKER_METRICS_PORT. With several processes (uvicorn or prefork
+workers) set PROMETHEUS_MULTIPROC_DIR to a directory shared by them,
+emptied at startup, so any endpoint reports the sum of all processes.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Tuple, TypeVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+IMPORT_STAGE_SECONDS = Histogram(
+    'import_stage_seconds',
+    'Time import batches spend in each stage',
+    ['stage'],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+IMPORT_ROWS = Counter('import_rows', 'CSV rows handled by imports', ['outcome'])
+IMPORT_BATCHES = Counter('import_batches', 'Batches committed by imports')
+IMPORTS = Counter('imports', 'Import attempts by how they ended', ['status'])
+REDIS_SECONDS = Histogram(
+    'redis_operation_seconds',
+    'Latency of progress store operations',
+    ['operation'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    'http_request_seconds',
+    'API request latency',
+    ['method', 'route', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+HTTP_REQUEST_QUERIES = Histogram(
+    'http_request_queries',
+    'SQL statements per API request',
+    ['route'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 500),
+)
+SQL_QUERY_SECONDS = Histogram(
+    'sql_query_seconds',
+    'SQL statement latency',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30),
+)
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Registry to export: all processes in multiprocess mode, else this one."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Return (body, content type) of the Prometheus text exposition."""
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int) -> None:
+    """
+    Serve /metrics on ``port`` from a background thread.
+    
+    Args:
+        port: TCP port (0 disables the endpoint)
+    """
+    
+    if not port:
+        return
+    
+    try:
+        start_http_server(port, registry=metrics_registry())
+        logger.info(f"Serving metrics on port {port}")
+    except OSError as e:
+        # Another worker on this host already serves it
+        logger.warning(f"Metrics endpoint not started on port {port}: {str(e)}")
+
+
+class ImportMetrics:
+    """
+    Stage timings and row counts of one import attempt.
+    
+    Every measurement also feeds the process-wide Prometheus metrics.
+    Stages of a batch:
+    
+    - count: counting the file's rows before the import (file I/O)
+    - parse: reading, tokenizing and validating (parser thread)
+    - wait: the writer waiting for the parser (all of parse when the
+      pipeline is off)
+    - dedupe: resolving SKUs repeated within the file
+    - write: product upserts
+    - events: recording product change events
+    - commit: flushing reports and committing the batch
+    - progress: Redis progress writes and cancel checks
+    """
+    
+    STAGES = ('count', 'parse', 'wait', 'dedupe', 'write', 'events', 'commit', 'progress')
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.seconds = dict.fromkeys(self.STAGES, 0.0)
+        self.rows: Dict[str, int] = {}
+        self.batches = 0
+        self.commit_max = 0.0
+    
+    def record(self, stage: str, seconds: float) -> None:
+        """Add ``seconds`` to ``stage``."""
+        self.seconds[stage] += seconds
+        IMPORT_STAGE_SECONDS.labels(stage).observe(seconds)
+        if stage == 'commit':
+            self.commit_max = max(self.commit_max, seconds)
+    
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block as ``stage``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+    
+    def timed(self, stage: str, items: Iterable[T]) -> Iterator[T]:
+        """
+        Iterate ``items``, timing each step as ``stage``.
+        
+        Args:
+            stage: Stage name
+            items: Iterable whose iteration is measured
+            
+        Yields:
+            Items from ``items``
+        """
+        
+        iterator = iter(items)
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self.record(stage, time.perf_counter() - started)
+                yield item
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+    
+    def count(self, outcome: str, rows: int) -> None:
+        """Count ``rows`` rows as ``outcome`` (read, created, parse_error...)."""
+        if rows:
+            self.rows[outcome] = self.rows.get(outcome, 0) + rows
+            IMPORT_ROWS.labels(outcome).inc(rows)
+    
+    def batch_committed(self) -> None:
+        """Count a committed batch."""
+        self.batches += 1
+        IMPORT_BATCHES.inc()
+    
+    def finish(self, status: str) -> None:
+        """Count the attempt as ended with ``status``."""
+        IMPORTS.labels(status).inc()
+    
+    def snapshot(self) -> Dict:
+        """Timings and rates so far, as stored with the task's progress."""
+        
+        elapsed = time.perf_counter() - self.started
+        rows = self.rows.get('read', 0)
+        
+        return {
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+            'batches': self.batches,
+            'parse_errors': self.rows.get('parse_error', 0),
+            'commit_avg_ms': round(self.seconds['commit'] / self.batches * 1000, 1) if self.batches else 0.0,
+            'commit_max_ms': round(self.commit_max * 1000, 1),
+            'stage_seconds': {stage: round(seconds, 3) for stage, seconds in self.seconds.items()},
+        }
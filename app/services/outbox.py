@@ -0,0 +1,70 @@
+"""
+Transactional outbox for webhook events.
+"""
+
+import json
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from ..models import OutboxEvent
+
+
+class OutboxService:
+    """Write and claim webhook events stored in the outbox table."""
+    
+    @staticmethod
+    def enqueue(db: Session, event_type: str, payload: dict) -> None:
+        """
+        Add an event to the outbox in the caller's transaction.
+        
+        Nothing is sent until the transaction commits and the dispatcher
+        picks the row up, so an event is never emitted for a rolled-back
+        change and never lost if the broker is unavailable.
+        
+        Args:
+            db: Session holding the change the event describes
+            event_type: Type of event
+            payload: Event payload
+        """
+        
+        db.add(OutboxEvent(event_type=event_type, payload=json.dumps(payload)))
+    
+    @staticmethod
+    def claim(db: Session, limit: int) -> List[OutboxEvent]:
+        """
+        Lock the oldest pending events for this dispatcher.
+        
+        Uses ``FOR UPDATE SKIP LOCKED`` so concurrent dispatchers claim
+        disjoint rows. Locks are held until the caller commits or rolls back.
+        
+        Args:
+            db: Session whose transaction holds the claim
+            limit: Maximum rows to claim
+            
+        Returns:
+            Claimed events, oldest first
+        """
+        
+        return db.query(OutboxEvent)\
+            .order_by(OutboxEvent.id)\
+            .limit(limit)\
+            .with_for_update(skip_locked=True)\
+            .all()
+    
+    @staticmethod
+    def delete(db: Session, events: List[OutboxEvent]) -> None:
+        """
+        Remove dispatched events in the caller's transaction.
+        
+        Args:
+            db: Session holding the claim
+            events: Events to remove
+        """
+        
+        if not events:
+            return
+        
+        db.query(OutboxEvent)\
+            .filter(OutboxEvent.id.in_([event.id for event in events]))\
+            .delete(synchronize_session=False)
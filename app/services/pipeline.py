@@ -0,0 +1,88 @@
+"""
+Prefetching pipeline overlapping CSV parsing with database writes.
+"""
+
+import queue
+import threading
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class ImportPipeline:
+    """
+    Run a producer (the CSV parser) on a background thread.
+    
+    Items are handed over through a bounded queue, so the parser runs at
+    most ``depth`` batches ahead of the consumer and blocks (back-pressure)
+    when the writer falls behind. The database driver releases the GIL
+    while waiting on the server, which is when the parser gets to run.
+    Items come out in the same order, so results match the serial path.
+    """
+    
+    POLL_INTERVAL = 0.1  # Seconds between checks for a cancelled consumer
+    
+    @staticmethod
+    def prefetch(items: Iterable[T], depth: int) -> Iterator[T]:
+        """
+        Iterate ``items`` with up to ``depth`` items produced ahead.
+        
+        Exceptions raised by the producer are re-raised in the consumer at
+        the point they occurred. If the consumer stops early the producer
+        is signalled, its iterator closed, and the thread joined.
+        
+        Args:
+            items: Source iterable, consumed on a background thread
+            depth: Maximum items buffered ahead (0 runs serially)
+            
+        Yields:
+            Items from ``items``, in order
+        """
+        
+        if depth <= 0:
+            yield from items
+            return
+        
+        buffer = queue.Queue(maxsize=depth)
+        stopped = threading.Event()
+        
+        def put(entry) -> bool:
+            while not stopped.is_set():
+                try:
+                    buffer.put(entry, timeout=ImportPipeline.POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def produce() -> None:
+            source = iter(items)
+            try:
+                for item in source:
+                    if not put((item, None)):
+                        return
+                put((_DONE, None))
+            except BaseException as e:
+                put((_DONE, e))
+            finally:
+                close = getattr(source, 'close', None)
+                if close is not None:
+                    close()
+        
+        producer = threading.Thread(target=produce, name="import-prefetch", daemon=True)
+        producer.start()
+        
+        try:
+            while True:
+                item, error = buffer.get()
+                if item is _DONE:
+                    if error is not None:
+                        raise error
+                    return
+                yield item
+        
+        finally:
+            stopped.set()
+            producer.join()
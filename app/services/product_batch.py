@@ -0,0 +1,237 @@
+"""
+Compact column-oriented container for batches of parsed products.
+"""
+
+import sys
+from array import array
+from itertools import compress
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class ProductBatch:
+    """
+    A batch of validated product rows stored column by column.
+    
+    Strings are kept in plain lists; price, quantity and active are packed
+    into typed arrays with a presence mask (1 = value given in the CSV),
+    so a row costs its strings plus ~16 bytes instead of a dict, two
+    boxed numbers and (further down the line) an ORM object.
+    
+    Each row also carries its CSV row number, for error and conflict
+    reports, and the parsers record in ``resume`` where parsing continues
+    after the batch, for checkpointing.
+    
+    Rows are only materialised as dicts on demand (``row``, iteration),
+    e.g. for debugging or comparing parsers; the bulk writer reads the
+    columns directly.
+    """
+    
+    COLUMNS = (
+        'row_numbers',
+        'skus',
+        'names',
+        'descriptions',
+        'prices',
+        'price_set',
+        'quantities',
+        'quantity_set',
+        'actives',
+        'active_set',
+    )
+    
+    __slots__ = COLUMNS + ('resume',)
+    
+    def __init__(self):
+        self.row_numbers = array('i')
+        self.skus: List[str] = []
+        self.names: List[str] = []
+        self.descriptions: List[Optional[str]] = []
+        self.prices = array('d')
+        self.price_set = bytearray()
+        self.quantities = array('i')
+        self.quantity_set = bytearray()
+        self.actives = array('b')
+        self.active_set = bytearray()
+        self.resume = None  # ResumePoint after the batch's last row
+    
+    @classmethod
+    def from_columns(
+        cls,
+        row_numbers: Iterable[int],
+        skus: List[str],
+        names: List[str],
+        descriptions: Optional[List[Optional[str]]] = None,
+        prices: Optional[List[Optional[float]]] = None,
+        quantities: Optional[List[Optional[int]]] = None,
+        actives: Optional[List[Optional[bool]]] = None,
+    ) -> "ProductBatch":
+        """
+        Build a batch from column lists; None marks a missing value.
+        
+        Args:
+            row_numbers: CSV row number of each row
+            skus: SKU column
+            names: Name column
+            descriptions: Description column, or None if absent from the CSV
+            prices: Price column, or None if absent from the CSV
+            quantities: Quantity column, or None if absent from the CSV
+            actives: Active column, or None if absent from the CSV
+            
+        Returns:
+            New batch (the string lists are adopted, not copied)
+            
+        Raises:
+            OverflowError: If a quantity does not fit in 32 bits
+        """
+        
+        batch = cls()
+        count = len(skus)
+        
+        batch.row_numbers = array('i', row_numbers)
+        batch.skus = skus
+        batch.names = names
+        batch.descriptions = descriptions if descriptions is not None else [None] * count
+        batch.prices, batch.price_set = cls._pack('d', prices, count)
+        batch.quantities, batch.quantity_set = cls._pack('i', quantities, count)
+        batch.actives, batch.active_set = cls._pack('b', actives, count)
+        
+        return batch
+    
+    @staticmethod
+    def _pack(typecode: str, values: Optional[List], count: int):
+        """Pack a column with missing values into (typed array, presence mask)."""
+        
+        if values is None:
+            return array(typecode, [0]) * count, bytearray(count)
+        
+        present = bytearray([value is not None for value in values])
+        if all(present):
+            return array(typecode, values), present
+        
+        return array(typecode, [0 if value is None else value for value in values]), present
+    
+    def append(
+        self,
+        sku: str,
+        name: str,
+        description: Optional[str] = None,
+        price: Optional[float] = None,
+        quantity: Optional[int] = None,
+        active: Optional[bool] = None,
+        row_number: int = 0,
+    ) -> None:
+        """
+        Append a single row; None marks a missing value.
+        
+        Raises:
+            OverflowError: If the quantity does not fit in 32 bits
+        """
+        
+        # First, so an out-of-range quantity leaves the batch unchanged
+        self.quantities.append(quantity or 0)
+        self.quantity_set.append(quantity is not None)
+        self.skus.append(sku)
+        self.names.append(name)
+        self.descriptions.append(description)
+        self.prices.append(price or 0.0)
+        self.price_set.append(price is not None)
+        self.actives.append(bool(active))
+        self.active_set.append(active is not None)
+        self.row_numbers.append(row_number)
+    
+    def extend(self, other: "ProductBatch", start: int = 0, stop: int = None) -> None:
+        """
+        Append rows ``start:stop`` of another batch.
+        
+        Args:
+            other: Batch to copy rows from
+            start: First row to copy
+            stop: Row to stop before (defaults to the end)
+        """
+        
+        window = slice(start, stop)
+        self.row_numbers.extend(other.row_numbers[window])
+        self.skus.extend(other.skus[window])
+        self.names.extend(other.names[window])
+        self.descriptions.extend(other.descriptions[window])
+        self.prices.extend(other.prices[window])
+        self.price_set += other.price_set[window]
+        self.quantities.extend(other.quantities[window])
+        self.quantity_set += other.quantity_set[window]
+        self.actives.extend(other.actives[window])
+        self.active_set += other.active_set[window]
+    
+    def select(self, keep: List[bool]) -> "ProductBatch":
+        """
+        Copy the rows whose ``keep`` flag is true into a new batch.
+        
+        Args:
+            keep: One flag per row
+            
+        Returns:
+            New batch with the kept rows, in order
+        """
+        
+        batch = ProductBatch()
+        batch.resume = self.resume
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            kept = compress(column, keep)
+            if isinstance(column, list):
+                setattr(batch, name, list(kept))
+            elif isinstance(column, bytearray):
+                setattr(batch, name, bytearray(kept))
+            else:
+                setattr(batch, name, array(column.typecode, kept))
+        return batch
+    
+    def row(self, index: int) -> Dict:
+        """
+        Materialise one row as a product dict (missing values omitted).
+        
+        Args:
+            index: Row position in the batch
+            
+        Returns:
+            Dict with the same keys the row parser used to produce
+        """
+        
+        product = {
+            'sku': self.skus[index],
+            'name': self.names[index],
+        }
+        if self.descriptions[index] is not None:
+            product['description'] = self.descriptions[index]
+        if self.price_set[index]:
+            product['price'] = self.prices[index]
+        if self.quantity_set[index]:
+            product['quantity'] = self.quantities[index]
+        if self.active_set[index]:
+            product['active'] = bool(self.actives[index])
+        return product
+    
+    def nbytes(self) -> int:
+        """
+        Approximate memory held by the batch.
+        
+        Returns:
+            Bytes used by the columns and the strings they reference
+        """
+        
+        size = sys.getsizeof
+        total = sum(map(size, (self.skus, self.names, self.descriptions)))
+        total += sum(map(size, self.skus)) + sum(map(size, self.names))
+        total += sum(size(description) for description in self.descriptions if description is not None)
+        for column in (self.row_numbers, self.prices, self.quantities, self.actives):
+            total += column.buffer_info()[1] * column.itemsize
+        total += len(self.price_set) + len(self.quantity_set) + len(self.active_set)
+        return total
+    
+    def __len__(self) -> int:
+        return len(self.skus)
+    
+    def __iter__(self) -> Iterator[Dict]:
+        return (self.row(index) for index in range(len(self.skus)))
+    
+    def __repr__(self) -> str:
+        return f"<ProductBatch(rows={len(self.skus)})>"
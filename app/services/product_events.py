@@ -0,0 +1,112 @@
+"""
+Product change events coalesced into batched webhook payloads.
+"""
+
+from typing import Iterable, Iterator, List
+
+from sqlalchemy.orm import Session
+
+from .outbox import OutboxService
+from ..config import get_settings
+
+settings = get_settings()
+
+
+class ProductEventBatcher:
+    """
+    Batch per-product change events into compact webhook payloads.
+    
+    Writers record SKUs in the outbox in chunks of at most
+    ``PRODUCT_EVENT_BATCH_SIZE``. The outbox dispatcher then coalesces
+    pending rows of the same event type into payloads of up to that many
+    SKUs, holding a partial batch back for at most
+    ``PRODUCT_EVENT_MAX_WAIT`` seconds, so a 1M-row import produces
+    ~1,000 webhook calls instead of 1M.
+    """
+    
+    CREATED = "product.created"
+    UPDATED = "product.updated"
+    DELETED = "product.deleted"
+    EVENT_TYPES = (CREATED, UPDATED, DELETED)
+    
+    @staticmethod
+    def build_payload(skus: List[str]) -> dict:
+        """
+        Build the compact batched payload for a list of SKUs.
+        
+        Args:
+            skus: SKUs affected by the event
+            
+        Returns:
+            Payload dictionary
+        """
+        return {
+            'count': len(skus),
+            'skus': skus,
+        }
+    
+    @staticmethod
+    def chunk(skus: Iterable[str], size: int = None) -> Iterator[List[str]]:
+        """
+        Split SKUs into lists of at most ``size`` items.
+        
+        Args:
+            skus: SKUs to split
+            size: Maximum chunk size (defaults to PRODUCT_EVENT_BATCH_SIZE)
+            
+        Yields:
+            Lists of SKUs
+        """
+        
+        size = size or settings.PRODUCT_EVENT_BATCH_SIZE
+        chunk = []
+        for sku in skus:
+            chunk.append(sku)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    @staticmethod
+    def coalesce(sku_lists: Iterable[List[str]], size: int = None) -> List[List[str]]:
+        """
+        Pack several SKU lists into as few batches of at most ``size`` as possible.
+        
+        Args:
+            sku_lists: SKU lists in event order
+            size: Maximum batch size (defaults to PRODUCT_EVENT_BATCH_SIZE)
+            
+        Returns:
+            List of SKU batches, preserving event order
+        """
+        
+        size = size or settings.PRODUCT_EVENT_BATCH_SIZE
+        batches = []
+        current = []
+        for skus in sku_lists:
+            for sku in skus:
+                current.append(sku)
+                if len(current) >= size:
+                    batches.append(current)
+                    current = []
+        if current:
+            batches.append(current)
+        return batches
+
+
+def record_product_events(db: Session, event_type: str, skus: Iterable[str]) -> None:
+    """
+    Record product change events in the outbox.
+    
+    Must be called before ``db.commit()`` so the events are committed
+    atomically with the product changes they describe.
+    
+    Args:
+        db: Session holding the product changes
+        event_type: One of ProductEventBatcher.EVENT_TYPES
+        skus: SKUs affected by the event
+    """
+    
+    for chunk in ProductEventBatcher.chunk(skus):
+        OutboxService.enqueue(db, event_type, ProductEventBatcher.build_payload(chunk))
@@ -0,0 +1,259 @@
+"""
+Bulk upsert of parsed product batches.
+"""
+
+import logging
+from typing import Dict, List, Tuple
+
+from sqlalchemy import Boolean, Float, Integer, Text, bindparam, func, insert, select, update
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from .catalog_stats import CatalogStatsService, StatsDelta
+from .product_batch import ProductBatch
+from ..models import Product
+
+products_table = Product.__table__
+logger = logging.getLogger(__name__)
+
+# Errors caused by the data of some row, as opposed to the connection or server
+ROW_ERRORS = (IntegrityError, DataError)
+
+
+class ProductBatchWriter:
+    """
+    Upsert a ProductBatch with a handful of set-based statements.
+    
+    Replaces the per-row ``SELECT ... WHERE lower(sku) = ?`` plus ORM
+    object per product: existing SKUs are looked up in chunks, new
+    products are inserted and existing ones updated with executemany.
+    Statement parameters are built from the batch columns one write
+    chunk at a time, so no per-row dicts or ORM objects live for the
+    whole batch.
+    
+    SKUs match case-insensitively. When a SKU occurs several times in a
+    batch its rows are folded in order (later values win, missing values
+    keep the earlier one) and written once; the later rows are returned
+    as repeats, not as updates.
+    
+    The lookup also returns the stored price, quantity and active flag,
+    so the batch's change to the catalog totals (CatalogStatsService) is
+    known without another query and applied with the batch.
+    """
+    
+    LOOKUP_CHUNK = 999  # SKUs per lookup query (SQLite's default parameter limit)
+    WRITE_CHUNK = 1000  # Rows per executemany
+    
+    INSERT_STATEMENT = insert(products_table).values(
+        sku=bindparam('p_sku'),
+        name=bindparam('p_name'),
+        description=bindparam('p_description', type_=Text),
+        price=bindparam('p_price', type_=Float),
+        quantity=bindparam('p_quantity', type_=Integer),
+        active=bindparam('p_active', type_=Boolean),
+    )
+    
+    # Missing values keep the stored value; sku and name are always given
+    UPDATE_STATEMENT = update(products_table)\
+        .where(products_table.c.id == bindparam('p_id'))\
+        .values(
+            sku=bindparam('p_sku'),
+            name=bindparam('p_name'),
+            description=func.coalesce(bindparam('p_description', type_=Text), products_table.c.description),
+            price=func.coalesce(bindparam('p_price', type_=Float), products_table.c.price),
+            quantity=func.coalesce(bindparam('p_quantity', type_=Integer), products_table.c.quantity),
+            active=func.coalesce(bindparam('p_active', type_=Boolean), products_table.c.active),
+        )
+    
+    @staticmethod
+    def write(db: Session, batch: ProductBatch) -> Tuple[List[str], List[str], List[str]]:
+        """
+        Insert new products and update existing ones. The caller commits.
+        
+        Args:
+            db: Database session
+            batch: Validated products
+            
+        Returns:
+            Tuple of (created SKUs, updated SKUs, SKUs of rows folded into
+            an earlier row of the batch)
+        """
+        
+        keys = [sku.lower() for sku in batch.skus]
+        existing = ProductBatchWriter._lookup(db, keys)
+        
+        # Positions of SKUs that occur more than once in the batch
+        repeats: Dict[str, List[int]] = {}
+        if len(set(keys)) < len(keys):
+            for index, key in enumerate(keys):
+                repeats.setdefault(key, []).append(index)
+            repeats = {key: indexes for key, indexes in repeats.items() if len(indexes) > 1}
+        
+        created_skus = []
+        updated_skus = []
+        repeated_skus = []
+        inserts = []
+        updates = []
+        delta = StatsDelta()
+        
+        for index, key in enumerate(keys):
+            indexes = repeats.get(key)
+            if indexes is not None and indexes[0] != index:
+                # Already folded into the first occurrence's write
+                repeated_skus.append(batch.skus[index])
+                continue
+            
+            params = ProductBatchWriter._params(batch, index)
+            if indexes is not None:
+                for later in indexes[1:]:
+                    ProductBatchWriter._fold(params, ProductBatchWriter._params(batch, later))
+            
+            if key in existing:
+                product_id, price, quantity, active = existing[key]
+                params['p_id'] = product_id
+                updates.append(params)
+                updated_skus.append(batch.skus[index])
+                delta.remove(price, quantity, active)
+                delta.add(
+                    params['p_price'] if params['p_price'] is not None else price,
+                    params['p_quantity'] if params['p_quantity'] is not None else quantity,
+                    params['p_active'] if params['p_active'] is not None else active,
+                )
+            else:
+                ProductBatchWriter._apply_defaults(params)
+                inserts.append(params)
+                created_skus.append(batch.skus[index])
+                delta.add(params['p_price'], params['p_quantity'], params['p_active'])
+            
+            if len(inserts) >= ProductBatchWriter.WRITE_CHUNK:
+                db.execute(ProductBatchWriter.INSERT_STATEMENT, inserts)
+                inserts = []
+            if len(updates) >= ProductBatchWriter.WRITE_CHUNK:
+                db.execute(ProductBatchWriter.UPDATE_STATEMENT, updates)
+                updates = []
+        
+        if inserts:
+            db.execute(ProductBatchWriter.INSERT_STATEMENT, inserts)
+        if updates:
+            db.execute(ProductBatchWriter.UPDATE_STATEMENT, updates)
+        CatalogStatsService.apply(db, delta)
+        
+        return created_skus, updated_skus, repeated_skus
+    
+    @staticmethod
+    def write_isolated(
+        db: Session,
+        batch: ProductBatch,
+    ) -> Tuple[List[str], List[str], List[str], List[Tuple[int, str, str]]]:
+        """
+        Write a batch, rejecting only the rows the database refuses.
+        
+        The batch is written under a SAVEPOINT. If a row error (constraint
+        violation, over-length or out-of-range value) aborts it, the
+        savepoint is rolled back and each half is retried the same way,
+        down to single rows, which are rejected. A clean batch costs one
+        savepoint; k bad rows cost about 2k log2(n) extra writes. Halves
+        are written in file order, so repeated SKUs resolve as in
+        ``write``: a row updating a product that an earlier half created or
+        updated is a repeat. A repeat whose first row was rejected is
+        written as a create or update of its own. The outer transaction
+        stays usable; the caller commits.
+        
+        Args:
+            db: Database session
+            batch: Validated products
+            
+        Returns:
+            Tuple of (created SKUs, updated SKUs, SKUs of repeated rows,
+            rejected rows as (row number, SKU, reason))
+        """
+        
+        created_skus = []
+        updated_skus = []
+        repeated_skus = []
+        rejected = []
+        written = set()  # Keys written by earlier halves
+        pending = [(0, len(batch))] if batch else []
+        
+        while pending:
+            start, stop = pending.pop()
+            if start == 0 and stop == len(batch):
+                part = batch
+            else:
+                part = ProductBatch()
+                part.extend(batch, start, stop)
+            
+            savepoint = db.begin_nested()
+            try:
+                created, updated, repeated = ProductBatchWriter.write(db, part)
+                savepoint.commit()
+            except ROW_ERRORS as e:
+                savepoint.rollback()
+                if stop - start == 1:
+                    rejected.append((part.row_numbers[0], part.skus[0], str(e.orig).strip()))
+                else:
+                    # Stack: the first half is written first
+                    middle = (start + stop) // 2
+                    pending.append((middle, stop))
+                    pending.append((start, middle))
+                continue
+            
+            created_skus.extend(created)
+            repeated_skus.extend(repeated)
+            if written:
+                repeated_skus.extend(sku for sku in updated if sku.lower() in written)
+                updated = [sku for sku in updated if sku.lower() not in written]
+            updated_skus.extend(updated)
+            if start != 0 or stop != len(batch):
+                written.update(sku.lower() for sku in created + updated)
+        
+        if rejected:
+            logger.warning(f"Rejected {len(rejected)} of {len(batch)} rows at write time")
+        
+        return created_skus, updated_skus, repeated_skus, rejected
+    
+    @staticmethod
+    def _lookup(db: Session, keys: List[str]) -> Dict[str, Tuple]:
+        """Map lower-cased SKUs that already exist to (id, price, quantity, active)."""
+        
+        existing: Dict[str, Tuple] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        sku_lower = func.lower(Product.sku)
+        
+        for start in range(0, len(unique_keys), ProductBatchWriter.LOOKUP_CHUNK):
+            chunk = unique_keys[start:start + ProductBatchWriter.LOOKUP_CHUNK]
+            rows = db.execute(
+                select(sku_lower, Product.id, Product.price, Product.quantity, Product.active)
+                .where(sku_lower.in_(chunk))
+            )
+            for key, *stored in rows:
+                existing.setdefault(key, tuple(stored))
+        
+        return existing
+    
+    @staticmethod
+    def _params(batch: ProductBatch, index: int) -> dict:
+        """Statement parameters for one row; None marks a missing value."""
+        return {
+            'p_sku': batch.skus[index],
+            'p_name': batch.names[index],
+            'p_description': batch.descriptions[index],
+            'p_price': batch.prices[index] if batch.price_set[index] else None,
+            'p_quantity': batch.quantities[index] if batch.quantity_set[index] else None,
+            'p_active': bool(batch.actives[index]) if batch.active_set[index] else None,
+        }
+    
+    @staticmethod
+    def _fold(params: dict, later: dict) -> None:
+        """Apply a later row for the same SKU on top of ``params``."""
+        for key, value in later.items():
+            if value is not None:
+                params[key] = value
+    
+    @staticmethod
+    def _apply_defaults(params: dict) -> None:
+        """Fill missing values of a new product with the column defaults."""
+        if params['p_quantity'] is None:
+            params['p_quantity'] = products_table.c.quantity.default.arg
+        if params['p_active'] is None:
+            params['p_active'] = products_table.c.active.default.arg
@@ -4,9 +4,11 @@ Progress tracking service using Redis for real-time upload progress.
 
 import json
 from datetime import datetime
-import redis
+from typing import List, Optional
 
 from ..config import get_settings
+from ..redis_client import get_redis
+from .metrics import REDIS_SECONDS
 
 settings = get_settings()
 
@@ -15,11 +17,13 @@ class ProgressService:
     """Track upload progress in Redis with JSON serialization."""
     
     PREFIX = "upload_progress:"
+    CANCEL_PREFIX = "upload_cancel:"
+    FINISHED = ('completed', 'failed', 'cancelled')
     TTL = 86400 * 7  # 7 days
     
     def __init__(self):
-        """Initialize Redis connection."""
-        self.redis_client = redis.from_url(settings.REDIS_URL)
+        """Use the shared Redis client."""
+        self.redis_client = get_redis()
     
     def init_progress(self, task_id: str, filename: str) -> None:
         """
@@ -39,17 +43,22 @@ class ProgressService:
             'created_products': 0,
             'updated_products': 0,
             'failed_rows': 0,
+            'duplicate_rows': 0,
+            'batch_size': None,
+            'batch_sizes': [],
+            'metrics': None,
             'error_message': None,
             'created_at': datetime.now().isoformat(),
             'completed_at': None,
         }
         
         key = f"{self.PREFIX}{task_id}"
-        self.redis_client.setex(
-            key,
-            self.TTL,
-            json.dumps(progress_data)
-        )
+        with REDIS_SECONDS.labels('set').time():
+            self.redis_client.setex(
+                key,
+                self.TTL,
+                json.dumps(progress_data)
+            )
     
     def update_progress(
         self,
@@ -62,6 +71,10 @@ class ProgressService:
         failed_rows: int = None,
         error_message: str = None,
         completed: bool = False,
+        duplicate_rows: int = None,
+        batch_size: int = None,
+        batch_sizes: List[int] = None,
+        metrics: dict = None,
     ) -> None:
         """
         Update progress data.
@@ -76,6 +89,10 @@ class ProgressService:
             failed_rows: Failed rows
             error_message: Error message if any
             completed: Whether task is completed
+            duplicate_rows: Rows repeating a SKU seen earlier in the file
+            batch_size: Batch size currently used by the import
+            batch_sizes: Recent batch sizes chosen, oldest first
+            metrics: Stage timings of the import (ImportMetrics.snapshot)
         """
         
         key = f"{self.PREFIX}{task_id}"
@@ -98,16 +115,26 @@ class ProgressService:
             data['failed_rows'] = failed_rows
         if error_message is not None:
             data['error_message'] = error_message
+        if duplicate_rows is not None:
+            data['duplicate_rows'] = duplicate_rows
+        if batch_size is not None:
+            data['batch_size'] = batch_size
+        if batch_sizes is not None:
+            data['batch_sizes'] = batch_sizes
+        if metrics is not None:
+            data['metrics'] = metrics
         
         if completed:
-            data['status'] = 'completed'
+            if status is None:
+                data['status'] = 'completed'
             data['completed_at'] = datetime.now().isoformat()
         
-        self.redis_client.setex(
-            key,
-            self.TTL,
-            json.dumps(data)
-        )
+        with REDIS_SECONDS.labels('set').time():
+            self.redis_client.setex(
+                key,
+                self.TTL,
+                json.dumps(data)
+            )
     
     def get_progress(self, task_id: str) -> dict:
         """
@@ -121,13 +148,31 @@ class ProgressService:
         """
         
         key = f"{self.PREFIX}{task_id}"
-        data = self.redis_client.get(key)
+        with REDIS_SECONDS.labels('get').time():
+            data = self.redis_client.get(key)
         
         if not data:
             return None
         
         return json.loads(data)
     
+    def get_statuses(self, task_ids: List[str]) -> List[Optional[str]]:
+        """
+        Get the status of several tasks in one round trip.
+        
+        Args:
+            task_ids: Task identifiers
+            
+        Returns:
+            Status per task, in order (None where there is no progress)
+        """
+        
+        if not task_ids:
+            return []
+        with REDIS_SECONDS.labels('get').time():
+            values = self.redis_client.mget([f"{self.PREFIX}{task_id}" for task_id in task_ids])
+        return [json.loads(value)['status'] if value else None for value in values]
+    
     def mark_failed(self, task_id: str, error_message: str) -> None:
         """
         Mark a task as failed.
@@ -144,6 +189,44 @@ class ProgressService:
             completed=True,
         )
     
+    def request_cancel(self, task_id: str) -> None:
+        """
+        Ask a running or queued import to stop.
+        
+        The import checks between batches; batches already committed stay.
+        
+        Args:
+            task_id: Task identifier
+        """
+        
+        self.redis_client.setex(f"{self.CANCEL_PREFIX}{task_id}", self.TTL, 1)
+        self.update_progress(task_id, status='cancelling')
+    
+    def is_cancel_requested(self, task_id: str) -> bool:
+        """
+        Whether cancellation of an import was requested.
+        
+        Args:
+            task_id: Task identifier
+        """
+        
+        with REDIS_SECONDS.labels('exists').time():
+            return bool(self.redis_client.exists(f"{self.CANCEL_PREFIX}{task_id}"))
+    
+    def mark_cancelled(self, task_id: str) -> None:
+        """
+        Mark an import as stopped on request.
+        
+        Args:
+            task_id: Task identifier
+        """
+        
+        self.update_progress(
+            task_id,
+            status='cancelled',
+            completed=True,
+        )
+    
     def delete_progress(self, task_id: str) -> None:
         """
         Delete progress data (cleanup).
@@ -0,0 +1,156 @@
+"""
+Per-client rate limits and concurrent import caps, kept in Redis.
+"""
+
+import logging
+import time
+from functools import lru_cache
+
+import redis
+
+from ..config import get_settings
+from ..redis_client import get_redis
+from .progress import ProgressService
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Refill, take one token if available, and save the bucket in one atomic step.
+# The server clock is used so every API instance agrees on elapsed time.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RateLimiter:
+    """
+    Token bucket per client and route group.
+    
+    Each bucket holds up to ``burst`` tokens and refills at
+    ``per_minute / 60`` tokens a second; a request takes one token or is
+    refused with the time until one is available. Checking costs a single
+    script call (EVALSHA) to Redis. If Redis is unavailable requests are
+    let through: a limiter outage should not become an API outage.
+    """
+    
+    PREFIX = "rate_limit:"
+    
+    def __init__(self):
+        """Register the bucket script with the shared Redis client."""
+        self.redis_client = get_redis()
+        self._take = self.redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+    
+    def hit(self, group: str, client: str, per_minute: float, burst: int) -> float:
+        """
+        Take a token from a client's bucket.
+        
+        Args:
+            group: Route group
+            client: Client identifier
+            per_minute: Sustained requests per minute
+            burst: Bucket size (requests allowed at once)
+            
+        Returns:
+            0 if allowed, else seconds until the next token
+        """
+        
+        try:
+            return float(self._take(keys=[f"{self.PREFIX}{group}:{client}"], args=[per_minute / 60, burst]))
+        except redis.RedisError as e:
+            logger.warning(f"Rate limiter unavailable, allowing request: {str(e)}")
+            return 0.0
+
+
+class ImportSlots:
+    """
+    Cap the imports a client may have running at once.
+    
+    Each client has a sorted set of its import task ids, scored by start
+    time. Finished imports are dropped when the set is next checked, by
+    their progress status, so a worker that dies mid-import does not
+    leak a slot beyond its progress record; an id without progress is
+    kept for PENDING_GRACE seconds (the upload is still being enqueued).
+    """
+    
+    PREFIX = "import_slots:"
+    PENDING_GRACE = 60  # Seconds
+    MAX_AGE = 86400  # Seconds; an import running longer no longer holds a slot
+    
+    def __init__(self):
+        """Use the shared Redis client."""
+        self.redis_client = get_redis()
+        self.progress_service = ProgressService()
+    
+    def acquire(self, client: str, task_id: str, limit: int) -> bool:
+        """
+        Take a slot for a new import.
+        
+        The id is added before counting, so two uploads racing for the
+        last slot cannot both get it (at worst both are refused).
+        
+        Args:
+            client: Client identifier
+            task_id: Import task id
+            limit: Concurrent imports allowed
+            
+        Returns:
+            Whether the import may start; if not, no slot is held
+        """
+        
+        key = f"{self.PREFIX}{client}"
+        now = time.time()
+        self._prune(key, now)
+        
+        pipe = self.redis_client.pipeline()
+        pipe.zadd(key, {task_id: now})
+        pipe.expire(key, self.MAX_AGE)
+        pipe.zcard(key)
+        running = pipe.execute()[-1]
+        
+        if running > limit:
+            self.release(client, task_id)
+            return False
+        return True
+    
+    def release(self, client: str, task_id: str) -> None:
+        """Free a slot (for an import that was not started)."""
+        self.redis_client.zrem(f"{self.PREFIX}{client}", task_id)
+    
+    def _prune(self, key: str, now: float) -> None:
+        """Drop finished, stale and abandoned imports from a client's set."""
+        
+        self.redis_client.zremrangebyscore(key, '-inf', now - self.MAX_AGE)
+        members = self.redis_client.zrange(key, 0, -1, withscores=True)
+        if not members:
+            return
+        
+        statuses = self.progress_service.get_statuses([member.decode() for member, _ in members])
+        done = [
+            member
+            for (member, started), status in zip(members, statuses)
+            if status in ProgressService.FINISHED or (status is None and now - started > self.PENDING_GRACE)
+        ]
+        if done:
+            self.redis_client.zrem(key, *done)
+
+
+@lru_cache
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide rate limiter."""
+    return RateLimiter()
@@ -0,0 +1,149 @@
+"""
+Readiness checks for load balancer probes.
+"""
+
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Dict
+
+import redis
+from sqlalchemy import text
+
+from ..config import get_settings
+from ..database import engine, replica_engine
+from ..redis_client import get_redis
+from ..workers.queues import IMPORT_QUEUES, queue_depth
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class ReadinessService:
+    """
+    Decide whether this API instance should receive traffic.
+    
+    The instance is ready while its database pool has at least
+    READY_MIN_DB_CONNECTIONS free slots and the database answers, and
+    Redis answers a PING within READY_MAX_REDIS_MS. Import queue depths
+    are reported but never fail the probe: the queues are shared by every
+    instance, so a backlog would take them all out of rotation at once.
+    Uploads are shed individually instead (429 above IMPORT_MAX_BACKLOG).
+    The read replica, if configured, is reported the same way: reads fall
+    back to the primary while it is down.
+    
+    Results are cached for READY_CACHE_SECONDS, so frequent probes from
+    several load balancers cost at most one round of checks per period.
+    """
+    
+    def __init__(self):
+        """Initialize the result cache."""
+        self._lock = threading.Lock()
+        self._result: Dict = None
+        self._checked_at = 0.0
+    
+    def check(self) -> Dict:
+        """
+        Get the (possibly cached) readiness result.
+        
+        Returns:
+            Dict with 'ready', 'checked_at' (epoch seconds) and the
+            individual 'checks', each with an 'ok' flag
+        """
+        
+        with self._lock:
+            if self._result is None or time.monotonic() - self._checked_at >= settings.READY_CACHE_SECONDS:
+                self._result = self._run_checks()
+                self._checked_at = time.monotonic()
+            return self._result
+    
+    def _run_checks(self) -> Dict:
+        checks = {
+            'database': self.check_database(),
+            'redis': self.check_redis(),
+            'imports': self.check_import_queues(),
+        }
+        if replica_engine is not None:
+            checks['replica'] = self.check_replica()
+        ready = checks['database']['ok'] and checks['redis']['ok']
+        if not ready:
+            failed = [name for name, result in checks.items() if not result['ok']]
+            logger.warning(f"Not ready: {', '.join(failed)} failing: {checks}")
+        return {'ready': ready, 'checked_at': time.time(), 'checks': checks}
+    
+    @staticmethod
+    def check_database() -> Dict:
+        """Pool headroom, then a round trip if a connection is free."""
+        
+        pool = engine.pool
+        result = {'ok': False}
+        max_overflow = getattr(pool, '_max_overflow', -1)  # QueuePool only; -1 is unbounded
+        if max_overflow >= 0:
+            in_use = pool.checkedout()
+            capacity = pool.size() + max_overflow
+            free = capacity - in_use
+            result.update(in_use=in_use, capacity=capacity, free=free)
+            if free < settings.READY_MIN_DB_CONNECTIONS:
+                result['error'] = f"{free} free connections, {settings.READY_MIN_DB_CONNECTIONS} required"
+                return result
+        
+        started = time.perf_counter()
+        try:
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except Exception as e:
+            result['error'] = str(e)
+            return result
+        
+        result.update(ok=True, latency_ms=round((time.perf_counter() - started) * 1000, 1))
+        return result
+    
+    @staticmethod
+    def check_replica() -> Dict:
+        """Read replica round trip (informational)."""
+        
+        started = time.perf_counter()
+        try:
+            with replica_engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+        return {'ok': True, 'latency_ms': round((time.perf_counter() - started) * 1000, 1)}
+    
+    @staticmethod
+    def check_redis() -> Dict:
+        """PING latency against READY_MAX_REDIS_MS."""
+        
+        started = time.perf_counter()
+        try:
+            get_redis().ping()
+        except redis.RedisError as e:
+            return {'ok': False, 'error': str(e)}
+        
+        latency_ms = (time.perf_counter() - started) * 1000
+        result = {'ok': latency_ms <= settings.READY_MAX_REDIS_MS, 'latency_ms': round(latency_ms, 1)}
+        if not result['ok']:
+            result['error'] = f"PING took over {settings.READY_MAX_REDIS_MS:.0f}ms"
+        return result
+    
+    @staticmethod
+    def check_import_queues() -> Dict:
+        """Waiting imports per queue against IMPORT_MAX_BACKLOG (informational)."""
+        
+        try:
+            depths = {queue: queue_depth(queue) for queue in IMPORT_QUEUES}
+        except redis.RedisError as e:
+            return {'ok': False, 'error': str(e)}
+        
+        saturated = [
+            queue for queue, depth in depths.items()
+            if depth is not None and depth >= settings.IMPORT_MAX_BACKLOG
+        ]
+        return {'ok': not saturated, 'depths': depths, 'max_backlog': settings.IMPORT_MAX_BACKLOG}
+
+
+@lru_cache
+def get_readiness() -> ReadinessService:
+    """Get the process-wide readiness service."""
+    return ReadinessService()
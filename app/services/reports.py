@@ -0,0 +1,75 @@
+"""
+Row-keyed CSV reports written incrementally during an import.
+"""
+
+import csv
+import os
+from typing import List, Optional
+
+
+class CSVReport:
+    """
+    Append-only CSV report whose first column is a CSV row number.
+    
+    The file is only created once the first line is added. A resumed
+    import passes ``resume_row``: lines for that row onwards were written
+    by the interrupted attempt for uncommitted batches and are dropped
+    before appending continues. Flush before committing each batch, so
+    the lines of committed batches are never lost.
+    """
+    
+    def __init__(self, path: str, header: List[str], resume_row: Optional[int] = None):
+        """
+        Initialize report.
+        
+        Args:
+            path: Report location
+            header: Column names, the first one holding the row number
+            resume_row: First row not committed by an earlier attempt
+        """
+        self.path = path
+        self.header = header
+        self._file = None
+        self._writer = None
+        
+        if resume_row is not None and os.path.exists(path):
+            self._truncate(resume_row)
+            self._open('a')
+    
+    def add(self, line: list) -> None:
+        """Append one line, creating the report on first use."""
+        
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._open('w')
+            self._writer.writerow(self.header)
+        
+        self._writer.writerow(line)
+    
+    def flush(self) -> None:
+        """Hand buffered lines to the OS, so they survive a killed worker."""
+        if self._file is not None:
+            self._file.flush()
+    
+    def close(self) -> None:
+        """Flush and close the report file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+    
+    def _open(self, mode: str) -> None:
+        self._file = open(self.path, mode, newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+    
+    def _truncate(self, resume_row: int) -> None:
+        """Drop lines for rows at or after ``resume_row``."""
+        
+        with open(self.path, 'r', newline='', encoding='utf-8') as f:
+            lines = [
+                line for line in csv.reader(f)
+                if not line[0].isdigit() or int(line[0]) < resume_row
+            ]
+        
+        with open(self.path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(lines)
@@ -0,0 +1,153 @@
+"""
+In-process cache of webhook subscriptions keyed by event type.
+"""
+
+import logging
+import threading
+import time
+from collections import namedtuple
+from functools import lru_cache
+from typing import Dict, List
+
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models import Webhook
+from ..redis_client import get_redis
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+Subscription = namedtuple("Subscription", ["webhook_id", "url"])
+
+
+class SubscriptionRegistry:
+    """
+    Cache enabled webhooks per event type so dispatch needs no DB query.
+    
+    The whole (small) ``webhooks`` table is loaded as one snapshot that
+    expires after ``ttl`` seconds. Webhook writes broadcast an
+    invalidation over Redis pub/sub; every process running a registry
+    listens for it and drops its snapshot, so changes apply immediately
+    and the TTL only bounds staleness if a message is missed.
+    """
+    
+    CHANNEL = "webhook_subscriptions:invalidate"
+    
+    def __init__(self, ttl: int = None):
+        """
+        Initialize registry.
+        
+        Args:
+            ttl: Seconds a snapshot may be served without reloading
+        """
+        self.ttl = ttl or settings.WEBHOOK_SUBSCRIPTION_TTL
+        self.redis_client = get_redis()
+        self._lock = threading.Lock()
+        self._snapshot: Dict[str, List[Subscription]] = None
+        self._loaded_at = 0.0
+        self._listener: threading.Thread = None
+    
+    def get(self, event_type: str) -> List[Subscription]:
+        """
+        Get enabled subscriptions for an event type.
+        
+        Args:
+            event_type: Type of event
+            
+        Returns:
+            List of subscriptions (empty if none)
+        """
+        
+        self._ensure_listener()
+        
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - self._loaded_at > self.ttl:
+            snapshot = self._reload()
+        
+        return snapshot.get(event_type, [])
+    
+    def _reload(self) -> Dict[str, List[Subscription]]:
+        """Load all enabled webhooks into a new snapshot."""
+        
+        with self._lock:
+            # Another thread may have reloaded while we waited
+            if self._snapshot is not None and time.monotonic() - self._loaded_at <= self.ttl:
+                return self._snapshot
+            
+            loaded_at = time.monotonic()
+            db = SessionLocal()
+            try:
+                rows = db.query(Webhook.id, Webhook.url, Webhook.event_type)\
+                    .filter(Webhook.enabled == True)\
+                    .all()
+            finally:
+                db.close()
+            
+            snapshot: Dict[str, List[Subscription]] = {}
+            for webhook_id, url, event_type in rows:
+                snapshot.setdefault(event_type, []).append(Subscription(webhook_id, url))
+            
+            self._snapshot = snapshot
+            self._loaded_at = loaded_at
+            return snapshot
+    
+    def invalidate(self) -> None:
+        """Drop the local snapshot; the next lookup reloads it."""
+        with self._lock:
+            self._snapshot = None
+    
+    def publish_invalidation(self) -> None:
+        """
+        Invalidate this process's snapshot and broadcast to all others.
+        
+        Broadcast failures are logged; other processes then pick the
+        change up when their snapshot's TTL expires.
+        """
+        
+        self.invalidate()
+        try:
+            self.redis_client.publish(self.CHANNEL, "*")
+        except Exception as e:
+            logger.warning(f"Failed to broadcast webhook subscription invalidation: {str(e)}")
+    
+    def _ensure_listener(self) -> None:
+        """Start the pub/sub listener thread on first use."""
+        
+        if self._listener is not None and self._listener.is_alive():
+            return
+        
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(
+                target=self._listen,
+                name="webhook-subscription-listener",
+                daemon=True,
+            )
+            self._listener.start()
+    
+    def _listen(self) -> None:
+        """Drop the snapshot whenever an invalidation is broadcast."""
+        
+        while True:
+            try:
+                pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.CHANNEL)
+                
+                # Messages may have been missed while (re)connecting
+                self.invalidate()
+                
+                for message in pubsub.listen():
+                    if message.get('type') == 'message':
+                        self.invalidate()
+            
+            except Exception as e:
+                logger.warning(f"Webhook subscription listener error: {str(e)}")
+                self.invalidate()
+                time.sleep(1)
+
+
+@lru_cache
+def get_subscription_registry() -> SubscriptionRegistry:
+    """Get the process-wide subscription registry (cached)."""
+    return SubscriptionRegistry()
@@ -0,0 +1,188 @@
+"""
+SQL statement tracing, slow query logging and a sampling profiler.
+
+Statements are timed with SQLAlchemy cursor events on the engine (see
+app/database.py) and attributed to the request being served through a
+context variable set by TracingMiddleware (app/middleware.py).
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..config import get_settings
+from .metrics import SQL_QUERY_SECONDS
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class RequestTrace:
+    """Timing of one request and the SQL statements it executed."""
+    
+    def __init__(self, label: str):
+        self.label = label
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.statements: Counter = Counter()
+    
+    def record(self, statement: str, seconds: float) -> None:
+        self.queries += 1
+        self.query_seconds += seconds
+        self.statements[statement] += 1
+    
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+    
+    def most_repeated(self) -> Tuple[Optional[str], int]:
+        """Statement executed most often, and how many times."""
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+    
+    def server_timing(self) -> str:
+        """Server-Timing header value (shown in browser dev tools)."""
+        return (
+            f"app;dur={self.elapsed() * 1000:.1f}, "
+            f"db;dur={self.query_seconds * 1000:.1f};desc=\"{self.queries} queries\""
+        )
+
+
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar('current_trace', default=None)
+
+
+def shorten(statement: str, limit: int = 500) -> str:
+    """Single-line statement, truncated for logs."""
+    statement = ' '.join(statement.split())
+    return statement if len(statement) <= limit else f"{statement[:limit]}..."
+
+
+def install_query_tracing(engine: Engine) -> None:
+    """
+    Time every statement executed on ``engine``.
+    
+    Statements slower than SLOW_QUERY_MS are logged. Bulk writes
+    (executemany, as used by imports) are timed but not logged, as they
+    are expected to be slow; import stage timings cover them.
+    
+    Args:
+        engine: SQLAlchemy engine
+    """
+    
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._trace_started = time.perf_counter()
+    
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_trace_started', None)
+        if started is None:
+            return
+        
+        seconds = time.perf_counter() - started
+        SQL_QUERY_SECONDS.observe(seconds)
+        
+        trace = current_trace.get()
+        if trace is not None:
+            trace.record(statement, seconds)
+        
+        if not executemany and seconds * 1000 >= settings.SLOW_QUERY_MS:
+            where = f" in {trace.label}" if trace is not None else ""
+            logger.warning(f"Slow query ({seconds * 1000:.0f}ms{where}): {shorten(statement)}")
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for a single request.
+    
+    A background thread records the stack of every thread each
+    ``interval`` seconds while the request runs. Only stacks inside the
+    request's endpoint are kept, so the profile covers the threadpool
+    thread running a sync endpoint as well as the event loop. Concurrent
+    requests to the same endpoint in this process are sampled too.
+    """
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: List[Tuple] = []
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+    
+    def start(self) -> None:
+        self._thread.start()
+    
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+    
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                self.samples.append(tuple(stack))
+    
+    def folded(self, endpoint: Optional[Callable] = None) -> Dict[str, int]:
+        """
+        Samples as folded stacks, the input format of flame graph tools.
+        
+        Args:
+            endpoint: Function serving the request; without one, stacks
+                running application code are kept
+                
+        Returns:
+            Sample count per ``root;...;leaf`` stack
+        """
+        
+        code = getattr(endpoint, '__code__', None)
+        stacks: Counter = Counter()
+        
+        for stack in self.samples:
+            if code is not None:
+                if code not in stack:
+                    continue
+            elif not any(c.co_filename.startswith(APP_DIR) for c in stack):
+                continue
+            stacks[';'.join(_frame_label(c) for c in reversed(stack))] += 1
+        
+        return dict(stacks)
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def write_profile(path: str, folded: Dict[str, int]) -> List[Tuple[str, int]]:
+    """
+    Write folded stacks to ``path``.
+    
+    Returns:
+        The functions most often at the top of the stack, with counts
+    """
+    
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, count in sorted(folded.items(), key=lambda item: -item[1]):
+            f.write(f"{stack} {count}\n")
+    
+    leaves: Counter = Counter()
+    for stack, count in folded.items():
+        leaves[stack.rsplit(';', 1)[-1]] += count
+    return leaves.most_common(5)
@@ -0,0 +1,72 @@
+"""
+Insert-or-update of counter rows on any database.
+"""
+
+from typing import Dict, List, Sequence, Union
+
+from sqlalchemy import Table, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+
+def upsert(
+    db: Session,
+    table: Table,
+    key: Sequence[str],
+    rows: Union[Dict, List[Dict]],
+    increment: Sequence[str] = (),
+) -> None:
+    """
+    Insert rows, or update the stored rows with the same ``key``.
+    
+    On PostgreSQL and SQLite this is one INSERT ... ON CONFLICT DO UPDATE.
+    Elsewhere each row is updated and, if none matched, inserted under a
+    SAVEPOINT; a concurrent insert of the same key makes it fall back to
+    the update. The caller commits.
+    
+    Args:
+        db: Database session
+        table: Target table, with a unique constraint on ``key``
+        key: Columns identifying a row
+        rows: Row values (including the key columns)
+        increment: Columns added to the stored value; others are replaced
+    """
+    
+    if isinstance(rows, dict):
+        rows = [rows]
+    if not rows:
+        return
+    
+    dialect = db.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        
+        stmt = dialect_insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={
+                name: table.c[name] + stmt.excluded[name] if name in increment else stmt.excluded[name]
+                for name in rows[0] if name not in key
+            },
+        )
+        db.execute(stmt)
+        return
+    
+    for row in rows:
+        where = [table.c[name] == row[name] for name in key]
+        changes = {
+            name: table.c[name] + value if name in increment else value
+            for name, value in row.items() if name not in key
+        }
+        
+        if db.execute(update(table).where(*where).values(changes)).rowcount:
+            continue
+        try:
+            with db.begin_nested():
+                db.execute(insert(table).values(row))
+        except IntegrityError:
+            # Inserted by a concurrent writer since the update
+            db.execute(update(table).where(*where).values(changes))
@@ -0,0 +1,243 @@
+"""
+Webhook delivery logging, aggregated delivery stats and log retention.
+"""
+
+import bisect
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..models import WebhookLog, WebhookDeliveryStats
+from .upsert import upsert
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class WebhookLogService:
+    """Record delivery attempts and maintain per-webhook delivery stats."""
+    
+    # Upper bounds (ms) of the latency histogram buckets; the last one catches the rest
+    LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 120000)
+    
+    @staticmethod
+    def bucket_for(duration_ms: float) -> int:
+        """
+        Map a latency to its histogram bucket.
+        
+        Args:
+            duration_ms: Delivery latency in milliseconds
+            
+        Returns:
+            Upper bound of the bucket in milliseconds
+        """
+        buckets = WebhookLogService.LATENCY_BUCKETS_MS
+        index = bisect.bisect_left(buckets, duration_ms)
+        return buckets[min(index, len(buckets) - 1)]
+    
+    @staticmethod
+    def record(
+        db: Session,
+        webhook_id: int,
+        event_type: str,
+        status_code: Optional[int] = None,
+        response_body: Optional[str] = None,
+        error_message: Optional[str] = None,
+        duration_ms: Optional[float] = None,
+    ) -> None:
+        """
+        Log a delivery attempt and count it in the delivery stats.
+        
+        Attempts without a duration (never sent, e.g. shed by the circuit
+        breaker) are logged but not counted. The caller commits.
+        
+        Args:
+            db: Database session
+            webhook_id: Webhook database ID
+            event_type: Event type
+            status_code: HTTP status returned, if any
+            response_body: Response body (truncated to 500 chars)
+            error_message: Error description, if the attempt failed
+            duration_ms: Time spent on the request
+        """
+        
+        db.add(WebhookLog(
+            webhook_id=webhook_id,
+            event_type=event_type,
+            status_code=status_code,
+            response_body=response_body[:500] if response_body else None,
+            error_message=error_message,
+            duration_ms=duration_ms,
+        ))
+        
+        if duration_ms is not None:
+            success = status_code is not None and 200 <= status_code < 300
+            WebhookLogService._increment_stats(db, webhook_id, duration_ms, success)
+    
+    @staticmethod
+    def _increment_stats(db: Session, webhook_id: int, duration_ms: float, success: bool) -> None:
+        """Atomically add one attempt to today's bucket for this webhook."""
+        
+        values = {
+            'webhook_id': webhook_id,
+            'day': datetime.utcnow().date(),
+            'latency_bucket_ms': WebhookLogService.bucket_for(duration_ms),
+            'attempts': 1,
+            'successes': 1 if success else 0,
+            'total_latency_ms': duration_ms,
+        }
+        
+        upsert(
+            db,
+            WebhookDeliveryStats.__table__,
+            key=('webhook_id', 'day', 'latency_bucket_ms'),
+            rows=values,
+            increment=('attempts', 'successes', 'total_latency_ms'),
+        )
+    
+    @staticmethod
+    def get_stats(db: Session, webhook_id: int, days: int) -> dict:
+        """
+        Aggregate delivery stats for a webhook over the last ``days`` days.
+        
+        Reads at most ``days * len(LATENCY_BUCKETS_MS)`` counter rows.
+        
+        Args:
+            db: Database session
+            webhook_id: Webhook database ID
+            days: Window size in days (including today)
+            
+        Returns:
+            Dictionary with attempts, successes, failures, success_rate,
+            avg_latency_ms and p95_latency_ms
+        """
+        
+        since = datetime.utcnow().date() - timedelta(days=days - 1)
+        rows = db.query(
+            WebhookDeliveryStats.latency_bucket_ms,
+            func.sum(WebhookDeliveryStats.attempts),
+            func.sum(WebhookDeliveryStats.successes),
+            func.sum(WebhookDeliveryStats.total_latency_ms),
+        )\
+            .filter(
+                WebhookDeliveryStats.webhook_id == webhook_id,
+                WebhookDeliveryStats.day >= since,
+            )\
+            .group_by(WebhookDeliveryStats.latency_bucket_ms)\
+            .order_by(WebhookDeliveryStats.latency_bucket_ms)\
+            .all()
+        
+        attempts = sum(row[1] for row in rows)
+        successes = sum(row[2] for row in rows)
+        total_latency = sum(row[3] for row in rows)
+        
+        return {
+            'window_days': days,
+            'attempts': attempts,
+            'successes': successes,
+            'failures': attempts - successes,
+            'success_rate': successes / attempts if attempts else None,
+            'avg_latency_ms': total_latency / attempts if attempts else None,
+            'p95_latency_ms': WebhookLogService._percentile(
+                [(row[0], row[1]) for row in rows], 0.95
+            ),
+        }
+    
+    @staticmethod
+    def _percentile(histogram, quantile: float) -> Optional[float]:
+        """Estimate a percentile from (bucket upper bound, count) pairs by linear interpolation."""
+        
+        total = sum(count for _, count in histogram)
+        if not total:
+            return None
+        
+        target = total * quantile
+        cumulative = 0
+        lower = 0
+        for upper, count in histogram:
+            if cumulative + count >= target:
+                return lower + (upper - lower) * (target - cumulative) / count
+            cumulative += count
+            lower = upper
+        return float(lower)
+    
+    @staticmethod
+    def prune(
+        db: Session,
+        retention_days: int = None,
+        stats_retention_days: int = None,
+        chunk_size: int = None,
+    ) -> int:
+        """
+        Delete expired logs and stats in bounded chunks.
+        
+        Each chunk is its own transaction so pruning never holds long locks
+        or builds a huge transaction, however far behind retention is.
+        
+        Args:
+            db: Database session
+            retention_days: Keep logs newer than this many days
+            stats_retention_days: Keep daily stats newer than this many days
+            chunk_size: Rows deleted per transaction
+            
+        Returns:
+            Number of log rows deleted
+        """
+        
+        retention_days = retention_days or settings.WEBHOOK_LOG_RETENTION_DAYS
+        stats_retention_days = stats_retention_days or settings.WEBHOOK_STATS_RETENTION_DAYS
+        chunk_size = chunk_size or settings.WEBHOOK_LOG_PRUNE_CHUNK
+        
+        # Compare against the database clock, which stamped created_at
+        cutoff = WebhookLogService._days_ago(db, retention_days)
+        
+        deleted = 0
+        while True:
+            ids = [
+                row.id for row in db.query(WebhookLog.id)
+                .filter(WebhookLog.created_at < cutoff)
+                .order_by(WebhookLog.created_at)
+                .limit(chunk_size)
+            ]
+            if not ids:
+                break
+            
+            db.query(WebhookLog)\
+                .filter(WebhookLog.id.in_(ids))\
+                .delete(synchronize_session=False)
+            db.commit()
+            deleted += len(ids)
+            
+            if len(ids) < chunk_size:
+                break
+        
+        # Stats days are stamped by the application clock (_increment_stats)
+        stats_cutoff = datetime.utcnow().date() - timedelta(days=stats_retention_days)
+        db.query(WebhookDeliveryStats)\
+            .filter(WebhookDeliveryStats.day < stats_cutoff)\
+            .delete(synchronize_session=False)
+        db.commit()
+        
+        logger.info(f"Pruned {deleted} webhook log rows older than {retention_days} days")
+        return deleted
+    
+    @staticmethod
+    def _days_ago(db: Session, days: int):
+        """
+        The database clock ``days`` days ago, as a SQL expression where
+        the dialect supports date arithmetic on now().
+        """
+        
+        dialect = db.get_bind().dialect.name
+        if dialect == 'postgresql':
+            return func.now() - timedelta(days=days)
+        if dialect == 'sqlite':
+            # Same UTC text format as the CURRENT_TIMESTAMP server default
+            return func.datetime('now', f'-{days} days')
+        
+        now = db.query(func.now()).scalar()
+        return now.replace(tzinfo=None) - timedelta(days=days)
@@ -2,46 +2,119 @@
 Webhook service for triggering and managing webhook callbacks.
 """
 
-import requests
+import random
 import json
 from typing import Tuple, Optional
 
+from .circuit_breaker import CircuitBreaker
+from ..config import get_settings
+
+settings = get_settings()
+
+
+class WebhookDeliveryError(Exception):
+    """Raised when a webhook delivery attempt fails."""
+    
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        response_body: Optional[str] = None,
+        retryable: bool = True,
+        retry_after: Optional[float] = None,
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response_body = response_body
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(WebhookDeliveryError):
+    """Raised when a delivery is shed because the endpoint's circuit is open."""
+    pass
+
 
 class WebhookService:
     """Trigger and manage webhooks."""
     
-    def __init__(self, timeout: int = 10, max_retries: int = 3):
+    # Statuses that indicate a transient problem on the subscriber's side
+    RETRYABLE_STATUS_CODES = {408, 425, 429}
+    
+    def __init__(
+        self,
+        timeout: int = None,
+        max_retries: int = None,
+        circuit_breaker: CircuitBreaker = None,
+    ):
         """
         Initialize webhook service.
         
         Args:
             timeout: Request timeout in seconds
-            max_retries: Maximum retry attempts
+            max_retries: Maximum retry attempts (scheduled by Celery)
+            circuit_breaker: Breaker shared across workers (created if omitted)
         """
-        self.timeout = timeout
-        self.max_retries = max_retries
+        self.timeout = timeout or settings.WEBHOOK_TIMEOUT
+        self.max_retries = max_retries if max_retries is not None else settings.WEBHOOK_RETRIES
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+    
+    @classmethod
+    def is_retryable_status(cls, status_code: int) -> bool:
+        """Whether a response status should be retried later."""
+        return status_code >= 500 or status_code in cls.RETRYABLE_STATUS_CODES
+    
+    @staticmethod
+    def compute_backoff(attempt: int) -> float:
+        """
+        Exponential backoff with full jitter.
+        
+        Args:
+            attempt: Number of retries already made (0 for the first retry)
+            
+        Returns:
+            Delay in seconds before the next attempt
+        """
+        ceiling = min(settings.WEBHOOK_BACKOFF_MAX, settings.WEBHOOK_BACKOFF_BASE * (2 ** attempt))
+        return random.uniform(settings.WEBHOOK_BACKOFF_BASE / 2, max(ceiling, settings.WEBHOOK_BACKOFF_BASE))
     
     def trigger_webhook(
         self,
         url: str,
         event_type: str,
         payload: dict,
+        respect_circuit: bool = True,
     ) -> Tuple[Optional[int], Optional[str]]:
         """
-        Send webhook request.
+        Send a single webhook delivery attempt.
+        
+        Retries are not performed here; callers schedule them (see
+        ``send_webhook_task``) so a failing endpoint is never hammered
+        in a tight loop.
         
         Args:
             url: Webhook URL
             event_type: Type of event
             payload: Event payload
+            respect_circuit: Shed the attempt if the URL's circuit is open
             
         Returns:
             Tuple of (status_code, response_body)
             
         Raises:
-            Exception: If request fails after retries
+            CircuitOpenError: If the circuit for this URL is open
+            WebhookDeliveryError: On network errors or error statuses
+                (``retryable`` is False for permanent ones)
         """
         
+        if respect_circuit and not self.circuit_breaker.allow_request(url):
+            # No wait left means another worker is probing; its outcome is
+            # known within one timeout
+            raise CircuitOpenError(
+                f"Circuit open for {url}",
+                retry_after=self.circuit_breaker.retry_after(url) or self.circuit_breaker.reset_timeout,
+            )
+        
         headers = {
             'Content-Type': 'application/json',
             'X-Webhook-Event': event_type,
@@ -52,25 +125,31 @@ class WebhookService:
             'data': payload,
         })
         
-        last_exception = None
+        import requests  # Deferred: only deliveries need it, not API startup
         
-        for attempt in range(1, self.max_retries + 1):
-            try:
-                response = requests.post(
-                    url,
-                    data=data,
-                    headers=headers,
-                    timeout=self.timeout,
-                )
-                
-                return response.status_code, response.text
-            
-            except Exception as e:
-                last_exception = e
-                if attempt < self.max_retries:
-                    continue
+        try:
+            response = requests.post(
+                url,
+                data=data,
+                headers=headers,
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            self.circuit_breaker.record_failure(url)
+            raise WebhookDeliveryError(f"Request failed: {str(e)}") from e
+        
+        if response.status_code >= 400:
+            # Permanent errors (404, 410, 401...) count too: a broken endpoint opens the circuit
+            self.circuit_breaker.record_failure(url)
+            raise WebhookDeliveryError(
+                f"Endpoint returned HTTP {response.status_code}",
+                status_code=response.status_code,
+                response_body=response.text,
+                retryable=self.is_retryable_status(response.status_code),
+            )
         
-        raise last_exception or Exception("Webhook request failed")
+        self.circuit_breaker.record_success(url)
+        return response.status_code, response.text
     
     def trigger_webhook_async(
         self,
@@ -53,6 +53,10 @@ const API = {
             return API.request(`/products/${id}`);
         },
 
+        stats: async () => {
+            return API.request('/products/stats');
+        },
+
         create: async (data) => {
             return API.request('/products/', {
                 method: 'POST',
@@ -156,6 +160,12 @@ const API = {
         progress: async (taskId) => {
             return API.request(`/upload/progress/${taskId}`);
         },
+
+        cancel: async (taskId) => {
+            return API.request(`/upload/cancel/${taskId}`, {
+                method: 'POST',
+            });
+        },
     },
 
     // ===== HEALTH CHECK =====
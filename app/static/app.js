@@ -81,13 +81,16 @@ async function initializeDashboard() {
 
 async function updateDashboardStats() {
     try {
-        const response = await API.products.list(1, 1000);
-        const webhooks = await API.webhooks.list();
+        // Totals are maintained server-side; no need to page through products
+        const [catalog, webhooks] = await Promise.all([
+            API.products.stats(),
+            API.webhooks.list(),
+        ]);
 
         const stats = {
-            total: response.total || 0,
-            active: response.items?.filter(p => p.active).length || 0,
-            value: response.items?.reduce((sum, p) => sum + ((p.price || 0) * (p.quantity || 0)), 0) || 0,
+            total: catalog.total_products,
+            active: catalog.active_products,
+            value: catalog.inventory_value,
             webhooks: webhooks?.length || 0,
         };
 
@@ -47,8 +47,29 @@ document.addEventListener('DOMContentLoaded', () => {
             submitUpload();
         });
     }
+
+    const cancelBtn = document.getElementById('cancel-upload-btn');
+    if (cancelBtn) {
+        cancelBtn.addEventListener('click', cancelUpload);
+    }
 });
 
+async function cancelUpload() {
+    if (!currentUploadTaskId) return;
+    if (!confirm('Stop this import? Rows already imported are kept.')) return;
+
+    const cancelBtn = document.getElementById('cancel-upload-btn');
+    if (cancelBtn) cancelBtn.disabled = true;
+
+    try {
+        await API.upload.cancel(currentUploadTaskId);
+    } catch (error) {
+        console.error('Cancel error:', error);
+        alert(`❌ Cancel error: ${error.message}`);
+        if (cancelBtn) cancelBtn.disabled = false;
+    }
+}
+
 function handleFileSelect(file) {
     if (!file.name.endsWith('.csv')) {
         alert('⚠️  Please select a CSV file');
@@ -115,11 +136,16 @@ async function pollProgress() {
 
             updateProgressUI(progress);
 
-            if (progress.status === 'completed' || progress.status === 'failed') {
+            if (['completed', 'failed', 'cancelled'].includes(progress.status)) {
                 clearInterval(progressCheckInterval);
 
+                const cancelBtn = document.getElementById('cancel-upload-btn');
+                if (cancelBtn) cancelBtn.disabled = false;
+
                 if (progress.status === 'completed') {
                     showCompletionModal(progress);
+                } else if (progress.status === 'cancelled') {
+                    alert(`⏹️  Import cancelled after ${progress.processed_rows} rows`);
                 } else {
                     showErrorModal(progress.error || 'Unknown error');
                 }
@@ -0,0 +1,167 @@
+"""
+Static files served under content-hashed names with long-lived caching.
+"""
+
+import hashlib
+import os
+import re
+import stat
+from typing import Dict, Tuple
+
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+# name.<hash>.ext, as produced by HashedStaticFiles.hashed_name
+HASHED_NAME = re.compile(r'^(?P<stem>.+)\.(?P<hash>[0-9a-f]{12})(?P<suffix>\.[^./]+)$')
+
+
+class HashedStaticFiles(StaticFiles):
+    """
+    StaticFiles serving assets under content-hashed names.
+    
+    ``app.js`` is also served as ``app.<hash>.js``, where the hash is of
+    its content, with a one-year immutable Cache-Control: a changed file
+    gets a new URL, so browsers never need to revalidate it. HTML pages
+    are rendered with their ``/static/...`` references rewritten to the
+    hashed names and, like any file requested by its plain name, are
+    served with ``Cache-Control: no-cache`` (revalidated by ETag).
+    
+    The name map is built once and rebuilt only when a directory's
+    modification time changes, i.e. when files are added, removed or
+    replaced (as editors and deploys do). A file edited in place keeps
+    its old hash in pages until then; a hashed name of an older version
+    falls back to the current file, uncached, so it is never stale.
+    """
+    
+    IMMUTABLE = "public, max-age=31536000, immutable"
+    REVALIDATE = "no-cache"
+    
+    def __init__(self, directory: str, url_prefix: str = "/static"):
+        super().__init__(directory=directory)
+        self.root = directory
+        self.url_prefix = url_prefix
+        self._hashes: Dict[str, Tuple[float, str]] = {}  # name -> (mtime, hash)
+        self._pages: Dict[str, Tuple[Tuple, bytes]] = {}  # html name -> ((manifest, mtime), body)
+        self._manifest: Tuple[Tuple, Dict[str, str]] = self._build_manifest()  # (directory mtimes, map)
+    
+    @staticmethod
+    def hashed_name(name: str, digest: str) -> str:
+        """``app.js`` -> ``app.<digest>.js``."""
+        stem, suffix = os.path.splitext(name)
+        return f"{stem}.{digest}{suffix}"
+    
+    def _file(self, name: str) -> str:
+        """Full path of a regular file in the directory, or None."""
+        full_path, stat_result = self.lookup_path(name)
+        return full_path if stat_result is not None and stat.S_ISREG(stat_result.st_mode) else None
+    
+    def _digest(self, name: str) -> str:
+        """Content hash of ``name``, cached until the file changes."""
+        
+        path = self._file(name)
+        mtime = os.stat(path).st_mtime
+        cached = self._hashes.get(name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        self._hashes[name] = (mtime, digest)
+        return digest
+    
+    def _directory_mtimes(self, directories) -> Tuple:
+        """Modification times of ``directories``; None for one that is gone."""
+        
+        mtimes = []
+        for directory in directories:
+            try:
+                mtimes.append((directory, os.stat(directory).st_mtime))
+            except FileNotFoundError:
+                mtimes.append((directory, None))
+        return tuple(mtimes)
+    
+    def _build_manifest(self) -> Tuple[Tuple, Dict[str, str]]:
+        """Walk the directory, hashing every asset."""
+        
+        directories = []
+        manifest = {}
+        for directory, _, files in os.walk(self.root):
+            directories.append(directory)
+            for file in files:
+                name = os.path.relpath(os.path.join(directory, file), self.root).replace(os.sep, '/')
+                manifest[name] = self.hashed_name(name, self._digest(name))
+        return self._directory_mtimes(directories), manifest
+    
+    def _current_manifest(self) -> Tuple[Tuple, Dict[str, str]]:
+        """
+        The cached manifest with its directory mtimes, rebuilt if stale.
+        
+        Only the directories are stat'ed; the tree is walked again when
+        one of them has changed.
+        """
+        
+        current = self._manifest
+        key = current[0]
+        if self._directory_mtimes(directory for directory, _ in key) != key:
+            current = self._manifest = self._build_manifest()
+        return current
+    
+    def manifest(self) -> Dict[str, str]:
+        """Map of every asset name to its hashed name."""
+        return self._current_manifest()[1]
+    
+    def _render(self, name: str) -> bytes:
+        """HTML page with its asset references pointing at hashed names."""
+        
+        version, manifest = self._current_manifest()
+        key = (version, os.stat(self._file(name)).st_mtime)
+        cached = self._pages.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        with open(self._file(name), 'r', encoding='utf-8') as f:
+            html = f.read()
+        
+        prefix = re.escape(self.url_prefix)
+        
+        def replace(match):
+            asset = match.group('asset')
+            if asset not in manifest:
+                return match.group(0)
+            return f'{match.group("attr")}="{self.url_prefix}/{manifest[asset]}"'
+        
+        body = re.sub(rf'(?P<attr>src|href)="{prefix}/(?P<asset>[^"?#]+)"', replace, html).encode('utf-8')
+        self._pages[name] = (key, body)
+        return body
+    
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        name = path.replace(os.sep, '/')
+        match = HASHED_NAME.match(name)
+        
+        if match is not None:
+            original = f"{match.group('stem')}{match.group('suffix')}"
+            if self._file(original) is not None:
+                response = await super().get_response(original, scope)
+                current = self._digest(original) == match.group('hash')
+                response.headers['Cache-Control'] = self.IMMUTABLE if current else self.REVALIDATE
+                return response
+        
+        if name.endswith('.html') and self._file(name) is not None:
+            return self._page_response(name, scope)
+        
+        response = await super().get_response(path, scope)
+        response.headers['Cache-Control'] = self.REVALIDATE
+        return response
+    
+    def _page_response(self, name: str, scope: Scope) -> Response:
+        """Rendered HTML page, or 304 if the client has it."""
+        body = self._render(name)
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        headers = {'ETag': etag, 'Cache-Control': self.REVALIDATE}
+        
+        for header, value in scope['headers']:
+            if header == b'if-none-match' and etag in value.decode('latin-1'):
+                return Response(status_code=304, headers=headers)
+        
+        return Response(body, media_type='text/html', headers=headers)
@@ -0,0 +1,174 @@
+"""
+Outbox dispatcher: drains the webhook outbox into Celery delivery tasks.
+
+Run one or more instances alongside the Celery workers:
+
+    python -m app.workers.dispatcher
+"""
+
+import json
+import logging
+import signal
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Tuple
+
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models import OutboxEvent
+from ..services.outbox import OutboxService
+from ..services.product_events import ProductEventBatcher
+from .tasks import trigger_webhooks_for_event
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class OutboxDispatcher:
+    """
+    Claim outbox rows in bulk and hand them to the webhook delivery tasks.
+    
+    Delivery is at-least-once: rows are deleted in the same transaction
+    that claimed them, after every delivery task has been enqueued. If
+    the broker or the dispatcher fails midway the transaction rolls back
+    and the rows are picked up again. Several dispatchers can run in
+    parallel because claims use ``SKIP LOCKED``.
+    """
+    
+    def __init__(self, claim_size: int = None, poll_interval: float = None):
+        """
+        Initialize dispatcher.
+        
+        Args:
+            claim_size: Maximum outbox rows claimed per cycle
+            poll_interval: Seconds to sleep when the outbox is drained
+        """
+        self.claim_size = claim_size or settings.OUTBOX_CLAIM_SIZE
+        self.poll_interval = poll_interval or settings.OUTBOX_POLL_INTERVAL
+        self._running = False
+    
+    @staticmethod
+    def plan(events: List[OutboxEvent], now: datetime = None) -> Tuple[List[OutboxEvent], List[Tuple[str, dict]]]:
+        """
+        Decide which claimed events to send now and build their payloads.
+        
+        Product events of the same type are coalesced into batches of up
+        to PRODUCT_EVENT_BATCH_SIZE SKUs. Other events are sent as-is, in
+        outbox order: product events enqueued before one (e.g. the last
+        batches of an import before its ``import.completed``) are sent
+        first, full or not. A type whose remaining SKUs do not yet fill a
+        batch is held back until its oldest row is PRODUCT_EVENT_MAX_WAIT
+        seconds old.
+        
+        Args:
+            events: Claimed events, oldest first
+            now: Current UTC time (for testing)
+            
+        Returns:
+            Tuple of (events to delete, list of (event_type, payload))
+        """
+        
+        now = now or datetime.utcnow()
+        pending = OrderedDict()  # Product event type -> [(event, skus)]
+        ready = []
+        deliveries = []
+        
+        for event in events:
+            payload = json.loads(event.payload)
+            if event.event_type in ProductEventBatcher.EVENT_TYPES:
+                pending.setdefault(event.event_type, []).append((event, payload['skus']))
+                continue
+            
+            # Product events enqueued before this one go out first
+            for event_type, group in pending.items():
+                deliveries.extend(OutboxDispatcher._product_deliveries(event_type, group))
+                ready.extend(event for event, _ in group)
+            pending.clear()
+            
+            deliveries.append((event.event_type, payload))
+            ready.append(event)
+        
+        for event_type, group in pending.items():
+            skus = sum(len(skus) for _, skus in group)
+            age = (now - group[0][0].created_at).total_seconds()
+            if skus < settings.PRODUCT_EVENT_BATCH_SIZE and age < settings.PRODUCT_EVENT_MAX_WAIT:
+                continue
+            
+            deliveries.extend(OutboxDispatcher._product_deliveries(event_type, group))
+            ready.extend(event for event, _ in group)
+        
+        return ready, deliveries
+    
+    @staticmethod
+    def _product_deliveries(event_type: str, group: List[Tuple[OutboxEvent, List[str]]]) -> List[Tuple[str, dict]]:
+        """Coalesce one type's product events into batched deliveries."""
+        return [
+            (event_type, ProductEventBatcher.build_payload(skus))
+            for skus in ProductEventBatcher.coalesce(skus for _, skus in group)
+        ]
+    
+    def dispatch_once(self) -> int:
+        """
+        Run a single claim/deliver/delete cycle.
+        
+        Returns:
+            Number of outbox rows dispatched
+        """
+        
+        db = SessionLocal()
+        
+        try:
+            events = OutboxService.claim(db, self.claim_size)
+            ready, deliveries = self.plan(events)
+            
+            for event_type, payload in deliveries:
+                trigger_webhooks_for_event(event_type, payload)
+            
+            OutboxService.delete(db, ready)
+            db.commit()
+            
+            if ready:
+                logger.info(f"Dispatched {len(ready)} outbox events as {len(deliveries)} deliveries")
+            
+            return len(ready)
+        
+        except Exception:
+            db.rollback()
+            raise
+        
+        finally:
+            db.close()
+    
+    def stop(self, *args) -> None:
+        """Stop the dispatch loop after the current cycle."""
+        self._running = False
+    
+    def run(self) -> None:
+        """Dispatch until stopped, sleeping only when the outbox is drained."""
+        
+        self._running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        
+        logger.info("Outbox dispatcher started")
+        
+        while self._running:
+            try:
+                dispatched = self.dispatch_once()
+            except Exception as e:
+                logger.error(f"Outbox dispatch failed: {str(e)}")
+                dispatched = 0
+            
+            if dispatched < self.claim_size:
+                time.sleep(self.poll_interval)
+        
+        logger.info("Outbox dispatcher stopped")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    OutboxDispatcher().run()
@@ -0,0 +1,64 @@
+"""
+Celery queues and task routing.
+
+Bulk imports, small imports and webhook deliveries each get their own
+queue, so one long import cannot hold up webhooks or interactive
+uploads as long as each queue has its own worker (see docker-compose.yml).
+"""
+
+from typing import Optional
+
+from ..config import get_settings
+from ..redis_client import get_broker_redis
+
+settings = get_settings()
+
+IMPORTS_BULK = "imports_bulk"
+IMPORTS_SMALL = "imports_small"
+WEBHOOKS = "webhooks"
+IMPORT_QUEUES = (IMPORTS_SMALL, IMPORTS_BULK)
+
+# process_csv is routed per upload (see import_queue); this is its default
+TASK_ROUTES = {
+    "process_csv": {"queue": IMPORTS_BULK},
+    "send_webhook": {"queue": WEBHOOKS},
+}
+
+
+def import_queue(file_size: Optional[int]) -> str:
+    """
+    Pick the queue for an import by the size of its file.
+    
+    Args:
+        file_size: Uploaded file size in bytes, or None if not known
+        
+    Returns:
+        IMPORTS_SMALL up to SMALL_IMPORT_MAX_MB, else (or if the size is
+        unknown) IMPORTS_BULK
+    """
+    if file_size is None or file_size > settings.SMALL_IMPORT_MAX_MB * 1024 * 1024:
+        return IMPORTS_BULK
+    return IMPORTS_SMALL
+
+
+def queue_depth(queue: str) -> Optional[int]:
+    """
+    Count the tasks waiting in a queue (not yet taken by a worker).
+    
+    With the Redis transport a queue is a list named after it, so this
+    is one LLEN on the broker.
+    
+    Args:
+        queue: Queue name
+        
+    Returns:
+        Number of waiting tasks, or None if the broker is not Redis
+        
+    Raises:
+        redis.RedisError: If the broker is unreachable
+    """
+    
+    client = get_broker_redis()
+    if client is None:
+        return None
+    return client.llen(queue)
@@ -4,17 +4,34 @@ Celery background tasks for async processing.
 
 import os
 import logging
+import time
 from datetime import datetime
 
+from celery.exceptions import SoftTimeLimitExceeded
+from celery.signals import worker_ready
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
 from ..database import SessionLocal
-from ..models import Product, Webhook, WebhookLog
+from ..services.batch_sizing import AdaptiveBatchSizer
+from ..services.catalog_stats import CatalogStatsService
+from ..services.catalog_version import get_catalog_version
+from ..services.checkpoints import ImportCheckpointService
+from ..services.columnar_parser import ColumnarCSVParser
 from ..services.csv_parser import CSVParser
+from ..services.dedupe import DuplicateSkuFilter
+from ..services.import_errors import ImportErrorReport
+from ..services.metrics import ImportMetrics, start_metrics_server
+from ..services.outbox import OutboxService
+from ..services.pipeline import ImportPipeline
+from ..services.product_events import ProductEventBatcher, record_product_events
+from ..services.product_writer import ProductBatchWriter
 from ..services.progress import ProgressService
-from ..services.webhook_service import WebhookService
+from ..services.subscriptions import get_subscription_registry
+from ..services.webhook_logs import WebhookLogService
+from ..services.webhook_service import WebhookService, WebhookDeliveryError, CircuitOpenError
 from ..config import get_settings
+from .queues import TASK_ROUTES
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -40,6 +57,7 @@ def get_celery_app():
             result_serializer='json',
             timezone='UTC',
             enable_utc=True,
+            task_routes=TASK_ROUTES,
         )
         return app
 
@@ -48,11 +66,36 @@ def get_celery_app():
 celery_app = get_celery_app()
 
 
-@celery_app.task(name="process_csv")
-def process_csv_task(task_id: str, file_path: str):
+@worker_ready.connect
+def serve_worker_metrics(**kwargs):
+    """Expose the worker's Prometheus metrics once it is up."""
+    start_metrics_server(settings.WORKER_METRICS_PORT)
+
+
+@celery_app.task(
+    name="process_csv",
+    bind=True,
+    acks_late=True,
+    reject_on_worker_lost=True,
+    soft_time_limit=settings.IMPORT_SOFT_TIME_LIMIT,
+    max_retries=settings.IMPORT_MAX_RETRIES,
+)
+def process_csv_task(self, task_id: str, file_path: str):
     """
     Process CSV file in batches and upsert products.
     
+    Every batch commits together with a checkpoint of the file position
+    and counters. An attempt stopped by the soft time limit or a lost
+    database connection is retried, and one whose worker died is
+    redelivered (acks_late); either way it resumes after the last
+    committed batch. The file is kept until the import finishes.
+    
+    A cancel request (ProgressService.request_cancel) is checked before
+    starting and after every batch; committed batches are kept.
+    
+    Time spent in each stage (see ImportMetrics) is exported to Prometheus
+    and stored with the task's progress after every batch.
+    
     Args:
         task_id: Task identifier
         file_path: Path to the CSV file
@@ -60,68 +103,174 @@ def process_csv_task(task_id: str, file_path: str):
     
     db = SessionLocal()
     progress_service = ProgressService()
+    metrics = ImportMetrics()
+    dedupe = None
+    error_report = None
+    batches = None
+    finished = True  # False while a retry still needs the file
     
     try:
-        logger.info(f"Starting CSV processing for task {task_id}")
+        checkpoint = ImportCheckpointService.start(db, task_id)
+        if checkpoint.completed:
+            logger.info(f"CSV import {task_id} already completed, ignoring redelivery")
+            return
+        
+        if progress_service.is_cancel_requested(task_id):
+            checkpoint.completed = True
+            db.commit()
+            progress_service.mark_cancelled(task_id)
+            logger.info(f"CSV import {task_id} cancelled before it started")
+            return
+        
+        resume = ImportCheckpointService.resume_point(checkpoint)
+        resume_row = resume.next_row if resume is not None else None
+        if resume is not None:
+            logger.info(f"Resuming CSV processing for task {task_id} at row {resume_row}")
+        else:
+            logger.info(f"Starting CSV processing for task {task_id}")
+        
         progress_service.update_progress(task_id, status='processing')
         
         # Count total rows first
-        with open(file_path, 'r') as f:
+        with metrics.stage('count'), open(file_path, 'r') as f:
             total_rows = sum(1 for _ in f) - 1  # Subtract header
         
         progress_service.update_progress(task_id, total_rows=total_rows)
         
-        created_count = 0
-        updated_count = 0
-        failed_count = 0
-        processed_count = 0
+        created_count = checkpoint.created_products
+        updated_count = checkpoint.updated_products
+        failed_count = checkpoint.failed_rows
+        duplicate_count = checkpoint.duplicate_rows
+        processed_count = checkpoint.processed_rows
+        
+        parser = ColumnarCSVParser if settings.CSV_PARSER == 'columnar' else CSVParser
+        error_report = ImportErrorReport(task_id, resume_row=resume_row)
+        dedupe = DuplicateSkuFilter(task_id, resume_row=resume_row)
+        last_wins = dedupe.policy == DuplicateSkuFilter.LAST_WINS
+        
+        # Batch size adapts to observed write latency and memory, within bounds
+        sizer = AdaptiveBatchSizer(
+            buffered_batches=settings.IMPORT_PIPELINE_DEPTH + 2,
+        ) if settings.ADAPTIVE_BATCH_SIZE else None
+        
+        # Parse the next batches on a background thread while this one is written
+        batches = metrics.timed('wait', ImportPipeline.prefetch(
+            metrics.timed('parse', parser.parse_csv(file_path, sizer or settings.BATCH_SIZE, start=resume)),
+            settings.IMPORT_PIPELINE_DEPTH,
+        ))
         
         # Process CSV in batches
-        for batch, errors in CSVParser.parse_csv(file_path):
-            processed_count += len(batch)
+        cancelled = False
+        for batch, errors in batches:
+            # The sizer is told about the batch it asked for, before dedupe drops rows
+            parsed_rows = len(batch)
+            parsed_bytes = batch.nbytes() if sizer is not None else 0
+            processed_count += parsed_rows
             failed_count += len(errors)
+            error_report.add_parse_errors(errors)
+            metrics.count('read', len(batch) + len(errors))
+            metrics.count('parse_error', len(errors))
+            started = time.perf_counter()
             
-            # Upsert batch
-            for product_data in batch:
-                try:
-                    sku = product_data['sku']
-                    
-                    # Check if product exists (case-insensitive)
-                    existing = db.query(Product).filter(
-                        func.lower(Product.sku) == sku.lower()
-                    ).first()
-                    
-                    if existing:
-                        # Update existing product
-                        for key, value in product_data.items():
-                            setattr(existing, key, value)
-                        updated_count += 1
-                    else:
-                        # Create new product
-                        new_product = Product(**product_data)
-                        db.add(new_product)
-                        created_count += 1
-                
-                except Exception as e:
-                    logger.error(f"Error processing product {product_data.get('sku')}: {str(e)}")
-                    failed_count += 1
+            # Resolve SKUs repeated within the file
+            with metrics.stage('dedupe'):
+                batch, duplicates = dedupe.filter(batch)
+                written = dedupe.written(batch.skus) if last_wins and duplicates else set()
+            duplicate_count += duplicates
             
-            # Bulk commit
-            db.commit()
+            # Upsert batch; rows the database refuses are rejected on their own
+            with metrics.stage('write'):
+                created_skus, updated_skus, _, rejected = ProductBatchWriter.write_isolated(db, batch)
             
-            # Update progress
-            progress_service.update_progress(
-                task_id,
+            # Repeats applied on top of a row this import wrote count as
+            # duplicates only: those folded in by the writer, and updates
+            # of SKUs an earlier batch wrote
+            applied_repeats = sum(1 for sku in updated_skus if sku.lower() in written)
+            if last_wins and batch:
+                dedupe.record_written(created_skus + updated_skus, batch.row_numbers[0])
+            
+            created_count += len(created_skus)
+            updated_count += len(updated_skus) - applied_repeats
+            failed_count += len(rejected)
+            for row_number, sku, reason in rejected:
+                error_report.add(row_number, sku, ImportErrorReport.WRITE, reason)
+            
+            metrics.count('created', len(created_skus))
+            metrics.count('updated', len(updated_skus) - applied_repeats)
+            metrics.count('duplicate', duplicates)
+            metrics.count('rejected', len(rejected))
+            
+            # Change events are committed atomically with the batch
+            with metrics.stage('events'):
+                record_product_events(db, ProductEventBatcher.CREATED, created_skus)
+                record_product_events(db, ProductEventBatcher.UPDATED, updated_skus)
+            
+            ImportCheckpointService.advance(
+                checkpoint,
+                batch.resume,
                 processed_rows=processed_count,
                 created_products=created_count,
                 updated_products=updated_count,
                 failed_rows=failed_count,
+                duplicate_rows=duplicate_count,
             )
             
+            # Bulk commit (batch, its events and the checkpoint); the reports
+            # go first, as a resumed attempt drops their uncommitted lines
+            with metrics.stage('commit'):
+                error_report.flush()
+                dedupe.flush()
+                db.commit()
+            metrics.batch_committed()
+            get_catalog_version().bump()
+            
+            if sizer is not None:
+                sizer.observe(parsed_rows, time.perf_counter() - started, parsed_bytes)
+            
+            # Update progress
+            with metrics.stage('progress'):
+                progress_service.update_progress(
+                    task_id,
+                    processed_rows=processed_count,
+                    created_products=created_count,
+                    updated_products=updated_count,
+                    failed_rows=failed_count,
+                    duplicate_rows=duplicate_count,
+                    batch_size=sizer.size if sizer is not None else settings.BATCH_SIZE,
+                    batch_sizes=sizer.history if sizer is not None else None,
+                    metrics=metrics.snapshot(),
+                )
+                cancelled = progress_service.is_cancel_requested(task_id)
+            
             logger.info(
                 f"Batch processed: {processed_count}/{total_rows} rows, "
-                f"{created_count} created, {updated_count} updated"
+                f"{created_count} created, {updated_count} updated, "
+                f"write {metrics.seconds['write']:.2f}s, commit {metrics.seconds['commit']:.2f}s so far"
             )
+            
+            if cancelled:
+                break
+        
+        if cancelled:
+            # Nothing left to do: a redelivery must not resume the import
+            checkpoint.completed = True
+            db.commit()
+            progress_service.update_progress(task_id, metrics=metrics.snapshot())
+            progress_service.mark_cancelled(task_id)
+            metrics.finish('cancelled')
+            logger.info(f"CSV import {task_id} cancelled after {processed_count} rows")
+            return
+        
+        # Queue import completion for the outbox dispatcher
+        checkpoint.completed = True
+        OutboxService.enqueue(db, 'import.completed', {
+            'task_id': task_id,
+            'created': created_count,
+            'updated': updated_count,
+            'failed': failed_count,
+            'duplicates': duplicate_count,
+        })
+        db.commit()
         
         # Mark as completed
         progress_service.update_progress(
@@ -131,111 +280,207 @@ def process_csv_task(task_id: str, file_path: str):
             created_products=created_count,
             updated_products=updated_count,
             failed_rows=failed_count,
+            duplicate_rows=duplicate_count,
+            metrics=metrics.snapshot(),
             completed=True,
         )
+        metrics.finish('completed')
         
-        logger.info(f"CSV processing completed for task {task_id}")
+        logger.info(f"CSV processing completed for task {task_id}: {metrics.snapshot()}")
+    
+    except (SoftTimeLimitExceeded, OperationalError) as e:
+        db.rollback()
         
-        # Trigger webhooks for import completion
-        trigger_webhooks_for_event('import.completed', {
-            'task_id': task_id,
-            'created': created_count,
-            'updated': updated_count,
-            'failed': failed_count,
-        })
+        if self.request.retries >= self.max_retries:
+            logger.error(f"Error processing CSV {task_id}, giving up: {str(e)}")
+            progress_service.mark_failed(task_id, str(e))
+            metrics.finish('failed')
+            return
+        
+        # Resume from the checkpoint; a time limit needs no wait
+        countdown = 0 if isinstance(e, SoftTimeLimitExceeded) else min(2 ** self.request.retries, 60)
+        logger.warning(f"CSV import {task_id} interrupted ({type(e).__name__}), resuming in {countdown}s")
+        progress_service.update_progress(task_id, status='retrying', metrics=metrics.snapshot())
+        metrics.finish('retrying')
+        finished = False
+        raise self.retry(exc=e, countdown=countdown)
     
     except Exception as e:
         logger.error(f"Error processing CSV {task_id}: {str(e)}")
         progress_service.mark_failed(task_id, str(e))
+        metrics.finish('failed')
     
     finally:
+        # Stop the parser thread (blocked on its full queue if the loop
+        # ended early) before the file and reports go away
+        if batches is not None:
+            batches.close()
         db.close()
         
-        # Cleanup temp file
+        if error_report is not None:
+            error_report.close()
+        if dedupe is not None:
+            dedupe.close(keep_store=not finished)
+        
+        # Cleanup temp file once the import is over
         try:
-            if os.path.exists(file_path):
+            if finished and os.path.exists(file_path):
                 os.remove(file_path)
         except Exception as e:
             logger.warning(f"Failed to delete temp file {file_path}: {str(e)}")
 
 
-@celery_app.task(name="send_webhook")
+# Unlimited Celery retries: sheds are free and real attempts are counted in ``attempts``
+@celery_app.task(name="send_webhook", bind=True, max_retries=None)
 def send_webhook_task(
+    self,
     webhook_id: int,
     url: str,
     event_type: str,
     payload: dict,
+    attempts: int = 0,
 ):
     """
     Send webhook request and log result.
     
+    Failed attempts are retried through Celery with exponential backoff
+    and jitter instead of immediately, and deliveries to an endpoint
+    whose circuit is open are deferred until it may be probed again.
+    Deferred deliveries never reached the endpoint, so they do not use
+    up the WEBHOOK_RETRIES budget; only real attempts do.
+    
     Args:
         webhook_id: Webhook database ID
         url: Webhook URL
         event_type: Event type
         payload: Event payload
+        attempts: Delivery attempts made by earlier runs (set on retry)
     """
     
     db = SessionLocal()
+    webhook_service = WebhookService()
+    attempt = attempts + 1
+    start_time = time.time()
     
     try:
-        webhook_service = WebhookService()
         status_code, response_body = webhook_service.trigger_webhook(
             url, event_type, payload
         )
         
         # Log success
-        log = WebhookLog(
-            webhook_id=webhook_id,
-            event_type=event_type,
+        WebhookLogService.record(
+            db,
+            webhook_id,
+            event_type,
             status_code=status_code,
-            response_body=response_body[:500] if response_body else None,
+            response_body=response_body,
+            duration_ms=(time.time() - start_time) * 1000,
         )
-        db.add(log)
         db.commit()
         
         logger.info(f"Webhook {webhook_id} triggered successfully: {status_code}")
     
+    except CircuitOpenError as e:
+        # Jitter spreads the deferred deliveries after the circuit reopens
+        countdown = e.retry_after + webhook_service.compute_backoff(attempts)
+        logger.info(f"Webhook {webhook_id} deferred {countdown:.1f}s: {str(e)}")
+        raise self.retry(exc=e, countdown=countdown)
+    
+    except WebhookDeliveryError as e:
+        WebhookLogService.record(
+            db,
+            webhook_id,
+            event_type,
+            status_code=e.status_code,
+            response_body=e.response_body,
+            error_message=f"Attempt {attempt}: {str(e)}",
+            duration_ms=(time.time() - start_time) * 1000,
+        )
+        db.commit()
+        
+        if not e.retryable or attempt > webhook_service.max_retries:
+            logger.error(f"Webhook {webhook_id} failed after {attempt} attempts: {str(e)}")
+            return
+        
+        countdown = webhook_service.compute_backoff(attempts)
+        if e.retry_after:
+            countdown = max(countdown, e.retry_after)
+        
+        logger.warning(
+            f"Webhook {webhook_id} attempt {attempt} failed ({str(e)}), "
+            f"retrying in {countdown:.1f}s"
+        )
+        raise self.retry(exc=e, countdown=countdown, kwargs={**self.request.kwargs, 'attempts': attempt})
+    
     except Exception as e:
         logger.error(f"Webhook {webhook_id} failed: {str(e)}")
         
         # Log failure
-        log = WebhookLog(
-            webhook_id=webhook_id,
-            event_type=event_type,
+        WebhookLogService.record(
+            db,
+            webhook_id,
+            event_type,
             error_message=str(e),
         )
-        db.add(log)
         db.commit()
     
     finally:
         db.close()
 
 
-def trigger_webhooks_for_event(event_type: str, payload: dict):
+@celery_app.task(name="prune_webhook_logs")
+def prune_webhook_logs_task():
     """
-    Trigger all webhooks for a specific event.
+    Delete webhook logs and delivery stats past their retention period.
     
-    Args:
-        event_type: Type of event
-        payload: Event payload
+    Scheduled periodically by Celery beat (see celery_app.py).
     """
     
     db = SessionLocal()
     
     try:
-        webhooks = db.query(Webhook).filter(
-            Webhook.event_type == event_type,
-            Webhook.enabled == True,
-        ).all()
-        
-        for webhook in webhooks:
-            send_webhook_task.delay(
-                webhook.id,
-                webhook.url,
-                event_type,
-                payload,
-            )
+        WebhookLogService.prune(db)
+    finally:
+        db.close()
+
+
+@celery_app.task(name="rebuild_catalog_stats")
+def rebuild_catalog_stats_task():
+    """
+    Recompute the catalog totals from the products table.
     
+    Scheduled daily by Celery beat (see celery_app.py) to correct any
+    drift in the incrementally maintained totals.
+    """
+    
+    db = SessionLocal()
+    
+    try:
+        CatalogStatsService.rebuild(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
+
+
+def trigger_webhooks_for_event(event_type: str, payload: dict):
+    """
+    Trigger all webhooks for a specific event.
+    
+    Subscribers come from the in-process subscription registry, so the
+    common case needs no database round trip.
+    
+    Args:
+        event_type: Type of event
+        payload: Event payload
+    """
+    
+    for subscription in get_subscription_registry().get(event_type):
+        send_webhook_task.delay(
+            subscription.webhook_id,
+            subscription.url,
+            event_type,
+            payload,
+        )
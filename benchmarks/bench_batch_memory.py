@@ -0,0 +1,99 @@
+"""
+Measure the memory held by one parsed import batch.
+
+Compares, for a single batch of synthetic products:
+
+- dicts: the old parser output, a list of per-row dicts
+- dicts + ORM: the old write path, which also built a Product per row
+- ProductBatch: the column-oriented batch both parsers now yield
+
+Reports bytes still allocated once the batch is built, the peak while
+building it, and the number of live allocated blocks, via tracemalloc.
+
+Usage:
+    python -m benchmarks.bench_batch_memory [--rows 10000]
+"""
+
+import argparse
+import csv
+import gc
+import os
+import tempfile
+import tracemalloc
+
+from app.models import Product
+from app.services.columnar_parser import ColumnarCSVParser
+from app.services.csv_parser import CSVParser
+from benchmarks.bench_csv_parser import generate_csv
+
+
+def build_dicts(path: str, rows: int):
+    """The old batch: one validated dict per row."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [CSVParser._validate_row(row) for row in csv.DictReader(f)][:rows]
+
+
+def build_orm(path: str, rows: int):
+    """The old write path: dicts plus a transient Product per row."""
+    products = build_dicts(path, rows)
+    return products, [Product(**product) for product in products]
+
+
+def build_batch(path: str, rows: int):
+    """The new batch, as yielded by the columnar parser."""
+    return next(ColumnarCSVParser.parse_csv(path, batch_size=rows))[0]
+
+
+def measure(build, path: str, rows: int):
+    """Return (bytes held, peak bytes, live blocks) for the built object."""
+    
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    
+    result = build(path, rows)
+    
+    gc.collect()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    
+    stats = after.compare_to(before, 'filename')
+    held = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    
+    del result
+    return held, peak, blocks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    args = parser.parse_args()
+    
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    
+    try:
+        # Only valid rows, so every variant holds the same number of products
+        generate_csv(path, args.rows, invalid_ratio=0)
+        raw_bytes = os.path.getsize(path)
+        
+        print(f"{args.rows} rows, {raw_bytes:,} bytes of CSV")
+        print(f"  {'':<14} {'held':>12} {'x raw':>6} {'peak':>12} {'blocks':>8}")
+        
+        for label, build in (
+            ('dicts', build_dicts),
+            ('dicts + ORM', build_orm),
+            ('ProductBatch', build_batch),
+        ):
+            held, peak, blocks = measure(build, path, args.rows)
+            print(f"  {label:<14} {held:12,} {held / raw_bytes:6.1f} {peak:12,} {blocks:8,}")
+    
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
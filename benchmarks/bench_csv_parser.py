@@ -0,0 +1,98 @@
+"""
+Benchmark the row-based and columnar CSV parsers.
+
+Generates a synthetic product CSV (with a sprinkling of invalid rows),
+parses it with both parsers, checks they produce identical batches and
+errors, and prints rows per second for each.
+
+Usage:
+    python -m benchmarks.bench_csv_parser [--rows 200000] [--repeat 3]
+"""
+
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+from app.services.columnar_parser import ColumnarCSVParser
+from app.services.csv_parser import CSVParser
+
+
+def generate_csv(path: str, rows: int, seed: int = 42, invalid_ratio: float = 0.01) -> None:
+    """Write a synthetic product CSV with ``invalid_ratio`` of the rows invalid."""
+    
+    rng = random.Random(seed)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['sku', 'name', 'description', 'price', 'quantity', 'active'])
+        for i in range(rows):
+            sku = f"SKU-{i:08d}"
+            name = f"Product {i}"
+            price = f"{rng.uniform(1, 500):.2f}"
+            quantity = str(rng.randint(0, 1000))
+            active = rng.choice(['true', 'false', 'yes', '0', ''])
+            
+            roll = rng.random() / invalid_ratio if invalid_ratio else 1
+            if roll < 0.25:
+                sku = ''
+            elif roll < 0.5:
+                name = '  '
+            elif roll < 0.75:
+                price = 'n/a'
+            elif roll < 1:
+                quantity = '1.5'
+            
+            writer.writerow([sku, name, f"Description for product {i}", price, quantity, active])
+
+
+def run(parser, path: str):
+    """Parse the whole file, returning (elapsed seconds, batches, errors)."""
+    
+    batches = []
+    errors = []
+    started = time.perf_counter()
+    for batch, batch_errors in parser.parse_csv(path):
+        batches.append(batch)
+        errors.extend(batch_errors)
+    return time.perf_counter() - started, batches, errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    
+    try:
+        generate_csv(path, args.rows)
+        
+        results = {}
+        for label, impl in (('rows', CSVParser), ('columnar', ColumnarCSVParser)):
+            best = None
+            for _ in range(args.repeat):
+                elapsed, batches, errors = run(impl, path)
+                best = elapsed if best is None else min(best, elapsed)
+            results[label] = (best, batches, errors)
+        
+        rows_result = results['rows']
+        columnar_result = results['columnar']
+        if [list(batch) for batch in rows_result[1]] != [list(batch) for batch in columnar_result[1]] \
+                or rows_result[2] != columnar_result[2]:
+            raise SystemExit("Parsers disagree on batches or errors")
+        
+        print(f"{args.rows} rows, {len(rows_result[2])} invalid, best of {args.repeat}")
+        for label, (elapsed, _, _) in results.items():
+            print(f"  {label:<9} {elapsed:7.3f}s  {args.rows / elapsed:12,.0f} rows/s")
+        print(f"  speedup   {rows_result[0] / columnar_result[0]:.2f}x")
+    
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark GET /api/products/ against the ORM + response model path.
+
+Seeds a temporary SQLite database, then requests the same pages in-process
+from the current endpoint (column tuples encoded with orjson) and from a
+copy of the previous implementation (ORM objects validated through
+ProductListResponse and encoded by FastAPI), checks both return the same
+JSON, and prints requests per second for each.
+
+Usage:
+    python -m benchmarks.bench_product_list [--rows 100000] [--page-size 100] [--requests 500]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+LEGACY_PATH = "/bench/legacy-products/"
+
+
+def add_legacy_endpoint(app) -> None:
+    """Mount the ORM-based listing (as before the fast path) for comparison."""
+    
+    from fastapi import Depends, Query
+    from sqlalchemy.orm import Session
+    
+    from app.database import get_db
+    from app.models import Product
+    from app.schemas import ProductListResponse
+    
+    @app.get(LEGACY_PATH, response_model=ProductListResponse)
+    def legacy_list_products(
+        page: int = Query(1, ge=1),
+        page_size: int = Query(20, ge=1, le=100),
+        db: Session = Depends(get_db),
+    ):
+        query = db.query(Product)
+        total = query.count()
+        items = query.offset((page - 1) * page_size).limit(page_size).all()
+        return ProductListResponse(
+            items=items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=(total + page_size - 1) // page_size,
+        )
+
+
+async def measure(client, path: str, pages: int, page_size: int, requests: int) -> float:
+    """Requests per second for ``requests`` sequential page fetches."""
+    
+    started = time.perf_counter()
+    for i in range(requests):
+        response = await client.get(f"{path}?page={i % pages + 1}&page_size={page_size}")
+        response.raise_for_status()
+    return requests / (time.perf_counter() - started)
+
+
+async def run(args) -> None:
+    import httpx
+    
+    from app.main import app
+    
+    add_legacy_endpoint(app)
+    transport = httpx.ASGITransport(app=app)
+    pages = min(args.rows // args.page_size, 50) or 1
+    
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for page in (1, pages):
+            fast = await client.get(f"/api/products/?page={page}&page_size={args.page_size}")
+            legacy = await client.get(f"{LEGACY_PATH}?page={page}&page_size={args.page_size}")
+            assert fast.json() == legacy.json(), f"Responses differ on page {page}"
+        print("Responses identical")
+        
+        results = {}
+        for label, path in (('orm + response model', LEGACY_PATH), ('columns + orjson', '/api/products/')):
+            await measure(client, path, pages, args.page_size, min(args.requests, 50))  # Warm up
+            results[label] = max(
+                [await measure(client, path, pages, args.page_size, args.requests) for _ in range(args.repeat)]
+            )
+            print(f"{label:<22} {results[label]:>8.0f} req/s")
+    
+    print(f"Speedup: {results['columns + orjson'] / results['orm + response model']:.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    # Settings are read at import time, so configure the app before importing it
+    work_dir = tempfile.mkdtemp(prefix='bench_product_list_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(work_dir, 'products.db')}"
+    os.environ['DEBUG'] = 'False'
+    os.environ.setdefault('SLOW_REQUEST_MS', '60000')
+    
+    logging.disable(logging.INFO)
+    
+    from app import models  # noqa: F401 (registers the tables)
+    from app.database import init_db
+    from benchmarks.load_test import seed_products
+    
+    init_db()
+    print(f"Seeding {args.rows:,} products...")
+    seed_products(args.rows, args.seed)
+    
+    try:
+        asyncio.run(run(args))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+API cold start benchmark: import time and spawn-to-ready time.
+
+Each run starts a fresh interpreter, so nothing is cached in-process:
+
+- import: time to ``import app.main``, measured inside the interpreter;
+  also checks that modules which must stay lazy (the Celery app, the
+  HTTP client used for webhook delivery) were not imported
+- ready: time from spawning ``uvicorn app.main:app`` to its first
+  200 from /health
+  
+The API must start without Postgres or Redis, so both point at
+addresses nothing listens on. Exits 1 if the median ready time exceeds
+--target-ms or a lazy module was imported, so CI can gate on it.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat 5] [--target-ms 2500]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+# Modules that only uploads or webhook deliveries need
+LAZY_MODULES = ('celery', 'app.workers.tasks', 'requests')
+
+IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({'seconds': elapsed, 'loaded': [m for m in %r if m in sys.modules]}))
+"""
+
+
+def startup_env(work_dir: str) -> dict:
+    """Environment for a cold start that cannot reach any backing service."""
+    env = dict(os.environ)
+    env['DATABASE_URL'] = f"sqlite:///{os.path.join(work_dir, 'unused.db')}"
+    env['REDIS_URL'] = 'redis://127.0.0.1:1/0'
+    env['CELERY_BROKER_URL'] = 'redis://127.0.0.1:1/0'
+    env['CELERY_RESULT_BACKEND'] = 'redis://127.0.0.1:1/0'
+    env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+    return env
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def measure_import(env: dict) -> dict:
+    """Seconds to import app.main in a fresh interpreter, and lazy modules it loaded."""
+    result = subprocess.run(
+        [sys.executable, '-c', IMPORT_SCRIPT % (LAZY_MODULES,)],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_ready(env: dict, timeout: float = 30.0) -> float:
+    """Seconds from spawning uvicorn to the first 200 from /health."""
+    
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app', '--port', str(port), '--log-level', 'warning'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {server.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise RuntimeError(f"Not ready after {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def summarize(label: str, seconds) -> float:
+    """Print min/median/max in ms; return the median."""
+    ms = sorted(s * 1000 for s in seconds)
+    median = statistics.median(ms)
+    print(f"{label:<8} min {ms[0]:>7.0f}ms  median {median:>7.0f}ms  max {ms[-1]:>7.0f}ms")
+    return median
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--target-ms', type=float, default=2500,
+                        help="Fail if the median spawn-to-ready time exceeds this")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory(prefix='bench_startup_') as work_dir:
+        env = startup_env(work_dir)
+        imports = [measure_import(env) for _ in range(args.repeat)]
+        ready = [measure_ready(env) for _ in range(args.repeat)]
+    
+    summarize('import', [run['seconds'] for run in imports])
+    median = summarize('ready', ready)
+    
+    failed = False
+    loaded = sorted({module for run in imports for module in run['loaded']})
+    if loaded:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(loaded)}")
+        failed = True
+    if median > args.target_ms:
+        print(f"FAIL: median ready time {median:.0f}ms exceeds target {args.target_ms:.0f}ms")
+        failed = True
+    if not failed:
+        print(f"OK: ready within {args.target_ms:.0f}ms target")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Deterministic synthetic product catalogs for import benchmarks.
+
+A catalog of ``rows`` data rows mixes:
+
+- new products (SKU-<n>)
+- updates of products already in the database (EXISTING-<n>, see
+  ``seed_existing``), ``update_ratio`` of the rows
+- repeats of a SKU seen earlier in the same file, in a different case,
+  ``duplicate_ratio`` of the rows
+- invalid rows (missing SKU or name, bad price or quantity),
+  ``invalid_ratio`` of the rows
+  
+The same arguments always produce byte-identical files, so results are
+comparable across commits and machines.
+
+Usage:
+    python -m benchmarks.catalog out.csv --rows 1000000 [--update-ratio 0.2]
+"""
+
+import argparse
+import csv
+import random
+from typing import Dict
+
+HEADER = ['sku', 'name', 'description', 'price', 'quantity', 'active']
+ACTIVE_VALUES = ['true', 'false', 'yes', '0', '']
+
+
+def existing_sku(index: int) -> str:
+    """SKU of the ``index``-th product seeded before an import."""
+    return f"EXISTING-{index:08d}"
+
+
+def existing_count(rows: int, update_ratio: float) -> int:
+    """Products to seed so ``update_ratio`` of the rows can update one."""
+    return max(int(rows * update_ratio), 1) if update_ratio else 0
+
+
+def generate_catalog(
+    path: str,
+    rows: int,
+    seed: int = 42,
+    duplicate_ratio: float = 0.01,
+    update_ratio: float = 0.2,
+    invalid_ratio: float = 0.01,
+) -> Dict[str, int]:
+    """
+    Write a synthetic product CSV.
+    
+    Args:
+        path: Output file
+        rows: Data rows to write
+        seed: Random seed
+        duplicate_ratio: Share of rows repeating an earlier SKU of the file
+        update_ratio: Share of rows updating a seeded product
+        invalid_ratio: Share of rows failing validation
+        
+    Returns:
+        Count of rows of each kind (new, update, duplicate, invalid)
+    """
+    
+    rng = random.Random(seed)
+    existing = existing_count(rows, update_ratio)
+    counts = {'new': 0, 'update': 0, 'duplicate': 0, 'invalid': 0}
+    new_skus = 0
+    
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        
+        for i in range(rows):
+            roll = rng.random()
+            name = f"Product {i}"
+            price = f"{rng.uniform(1, 500):.2f}"
+            quantity = str(rng.randint(0, 1000))
+            
+            if roll < invalid_ratio:
+                kind = 'invalid'
+                sku = f"BAD-{i:08d}"
+                fault = rng.randrange(4)
+                if fault == 0:
+                    sku = ''
+                elif fault == 1:
+                    name = '  '
+                elif fault == 2:
+                    price = 'n/a'
+                else:
+                    quantity = '1.5'
+            elif roll < invalid_ratio + duplicate_ratio and new_skus:
+                kind = 'duplicate'
+                sku = f"sku-{rng.randrange(new_skus):08d}"
+            elif roll < invalid_ratio + duplicate_ratio + update_ratio and existing:
+                kind = 'update'
+                sku = existing_sku(rng.randrange(existing))
+            else:
+                kind = 'new'
+                sku = f"SKU-{new_skus:08d}"
+                new_skus += 1
+            
+            counts[kind] += 1
+            writer.writerow([
+                sku,
+                name,
+                f"Description for product {i}",
+                price,
+                quantity,
+                rng.choice(ACTIVE_VALUES),
+            ])
+    
+    return counts
+
+
+def seed_existing(db, rows: int, update_ratio: float, chunk: int = 10000) -> int:
+    """
+    Insert the products a catalog's update rows refer to, and commit.
+    
+    Args:
+        db: Database session
+        rows: Catalog rows
+        update_ratio: Catalog update ratio
+        chunk: Products per write
+        
+    Returns:
+        Number of products inserted
+    """
+    
+    from app.services.product_batch import ProductBatch
+    from app.services.product_writer import ProductBatchWriter
+    
+    count = existing_count(rows, update_ratio)
+    for start in range(0, count, chunk):
+        indexes = range(start, min(start + chunk, count))
+        batch = ProductBatch.from_columns(
+            indexes,
+            [existing_sku(i) for i in indexes],
+            [f"Existing product {i}" for i in indexes],
+            prices=[10.0] * len(indexes),
+        )
+        ProductBatchWriter.write(db, batch)
+        db.commit()
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('path')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--duplicate-ratio', type=float, default=0.01)
+    parser.add_argument('--update-ratio', type=float, default=0.2)
+    parser.add_argument('--invalid-ratio', type=float, default=0.01)
+    args = parser.parse_args()
+    
+    counts = generate_catalog(
+        args.path,
+        args.rows,
+        seed=args.seed,
+        duplicate_ratio=args.duplicate_ratio,
+        update_ratio=args.update_ratio,
+        invalid_ratio=args.invalid_ratio,
+    )
+    print(f"Wrote {args.rows} rows to {args.path}: {counts}")
+
+
+if __name__ == "__main__":
+    main()
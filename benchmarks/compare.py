@@ -0,0 +1,75 @@
+"""
+Compare two import benchmark result files.
+
+Matches results by catalog size, database and stage, and prints the
+change in rows per second and peak RSS. Exits with status 1 when a
+stage got slower, or used more memory, by more than the threshold.
+
+Usage:
+    python -m benchmarks.compare base.json new.json [--threshold 0.1]
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Tuple
+
+
+def load(path: str) -> Tuple[Dict, Dict]:
+    """Return (report, results keyed by (catalog rows, database, stage))."""
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    results = {
+        (result['catalog_rows'], result['database'] or '-', result['stage']): result
+        for result in report['results']
+    }
+    return report, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('base')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Relative change counted as a regression (default 0.1)')
+    args = parser.parse_args()
+    
+    base_report, base = load(args.base)
+    new_report, new = load(args.new)
+    
+    if base_report['params'] != new_report['params']:
+        print(f"Warning: parameters differ\n  base: {base_report['params']}\n  new:  {new_report['params']}")
+    
+    print(f"base {base_report['commit']} -> new {new_report['commit']}")
+    print(f"{'rows':>10} {'database':<11} {'stage':<11} {'rows/s base':>12} {'new':>12} {'change':>8} {'RSS MB':>15}")
+    
+    regressions = 0
+    for key in sorted(set(base) & set(new)):
+        before, after = base[key], new[key]
+        rows, database, stage = key
+        
+        if 'error' in before or 'error' in after:
+            print(f"{rows:>10} {database:<11} {stage:<11} skipped (failed in one run)")
+            continue
+        
+        change = after['rows_per_second'] / before['rows_per_second'] - 1
+        rss_change = after['peak_rss_mb'] / before['peak_rss_mb'] - 1 if before['peak_rss_mb'] else 0
+        flag = ''
+        if change < -args.threshold or rss_change > args.threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        
+        print(
+            f"{rows:>10} {database:<11} {stage:<11} {before['rows_per_second']:>12,.0f} "
+            f"{after['rows_per_second']:>12,.0f} {change:>+8.1%} "
+            f"{before['peak_rss_mb']:>7.0f}->{after['peak_rss_mb']:<7.0f}{flag}"
+        )
+    
+    for key in sorted(set(base) ^ set(new)):
+        print(f"{key[0]:>10} {key[1]:<11} {key[2]:<11} only in {'base' if key in base else 'new'}")
+    
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+"""
+API latency load test for the product and upload progress endpoints.
+
+Seeds the products table (and a few upload progress entries in Redis),
+then drives the API with ``--concurrency`` concurrent clients for
+``--duration`` seconds using a weighted mix of requests:
+
+- list: first pages of GET /api/products/
+- deep_page: pages near the end of the listing (large OFFSET)
+- filter_name: name search combined with the active filter
+- sku_search: partial SKU search for one of the hot SKUs
+- get: GET /api/products/{id} for a random product
+- get_hot: GET /api/products/{id} for a handful of hot products
+- progress: GET /api/upload/progress/{task_id} (skipped without Redis)
+
+The app runs in-process (default, via httpx's ASGI transport), under a
+local uvicorn started by the harness (--serve), or at an existing URL
+(--url, which must use the database given to --database-url).
+
+Reports per-operation throughput, p50/p90/p99/max latency and a latency
+histogram, and writes them as JSON tagged with the git commit. As a
+regression gate it exits with status 1 when a p99 exceeds --max-p99, or
+grows by more than --threshold over a --baseline result file.
+
+Usage:
+    python -m benchmarks.load_test --rows 1000000 --concurrency 32 --duration 30 \\
+        [--mix list=30,deep_page=10,get=40] [--serve --workers 4] \\
+        [--baseline old.json --threshold 0.25] [--max-p99 get=50,list=200]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from benchmarks.bench_import import database_label, git_commit
+
+DEFAULT_MIX = {
+    'list': 30,
+    'deep_page': 10,
+    'filter_name': 15,
+    'sku_search': 10,
+    'get': 20,
+    'get_hot': 10,
+    'progress': 5,
+}
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+HOT_PRODUCTS = 10
+PROGRESS_TASKS = 20
+PAGE_SIZE = 20
+SEED_CHUNK = 10000
+
+ADJECTIVES = ['Red', 'Blue', 'Large', 'Small', 'Steel', 'Wooden', 'Organic', 'Smart', 'Classic', 'Portable']
+NOUNS = ['Chair', 'Lamp', 'Kettle', 'Backpack', 'Speaker', 'Desk', 'Bottle', 'Jacket', 'Drill', 'Camera']
+
+
+def parse_weights(spec: Optional[str], defaults: Dict[str, float] = None) -> Dict[str, float]:
+    """Parse ``name=value,name=value`` into a dict."""
+    
+    if not spec:
+        return dict(defaults or {})
+    
+    weights = {}
+    for item in spec.split(','):
+        name, _, value = item.partition('=')
+        weights[name.strip()] = float(value)
+    return weights
+
+
+def seed_products(rows: int, seed: int) -> None:
+    """Insert ``rows`` deterministic products into an empty products table."""
+    
+    from sqlalchemy import insert
+    
+    from app.database import SessionLocal
+    from app.models import Product
+    
+    rng = random.Random(seed)
+    statement = insert(Product.__table__)
+    db = SessionLocal()
+    
+    try:
+        for start in range(0, rows, SEED_CHUNK):
+            db.execute(statement, [
+                {
+                    'sku': f"LT-{i:08d}",
+                    'name': f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}",
+                    'description': f"Load test product {i}",
+                    'price': round(rng.uniform(1, 500), 2),
+                    'quantity': rng.randint(0, 1000),
+                    'active': rng.random() < 0.8,
+                }
+                for i in range(start, min(start + SEED_CHUNK, rows))
+            ])
+            db.commit()
+    finally:
+        db.close()
+
+
+def prepare_database(args) -> int:
+    """Create tables and seed products as requested; return the product count."""
+    
+    from sqlalchemy import func, select
+    
+    from app.database import SessionLocal, init_db
+    from app.models import Product
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        count = db.scalar(select(func.count()).select_from(Product))
+        if args.reuse and count >= args.rows:
+            return count
+        if count:
+            if not args.allow_reset:
+                sys.exit(f"products table has {count} rows; pass --reuse or --allow-reset")
+            db.query(Product).delete()
+            db.commit()
+    finally:
+        db.close()
+    
+    print(f"Seeding {args.rows:,} products...")
+    seed_products(args.rows, args.seed)
+    return args.rows
+
+
+def prepare_progress() -> List[str]:
+    """Create upload progress entries, or return [] if Redis is unreachable."""
+    
+    import redis
+    
+    from app.services.progress import ProgressService
+    
+    try:
+        progress_service = ProgressService()
+        progress_service.redis_client.ping()
+    except redis.RedisError as e:
+        print(f"Redis unreachable ({str(e)}); skipping the progress operation")
+        return []
+    
+    task_ids = [f"loadtest-{i}" for i in range(PROGRESS_TASKS)]
+    for task_id in task_ids:
+        progress_service.init_progress(task_id, f"{task_id}.csv")
+        progress_service.update_progress(task_id, status='processing', total_rows=100000, processed_rows=50000)
+    return task_ids
+
+
+class RequestPlan:
+    """Build the request path for each operation of the mix."""
+    
+    def __init__(self, products: int, task_ids: List[str], seed: int):
+        self.products = products
+        self.task_ids = task_ids
+        self.last_page = max((products + PAGE_SIZE - 1) // PAGE_SIZE, 1)
+        hot = random.Random(seed)
+        self.hot_ids = [hot.randint(1, products) for _ in range(HOT_PRODUCTS)]
+    
+    def path(self, operation: str, rng: random.Random) -> str:
+        if operation == 'list':
+            return f"/api/products/?page={rng.randint(1, 5)}&page_size={PAGE_SIZE}"
+        if operation == 'deep_page':
+            page = rng.randint(max(int(self.last_page * 0.9), 1), self.last_page)
+            return f"/api/products/?page={page}&page_size={PAGE_SIZE}"
+        if operation == 'filter_name':
+            return f"/api/products/?name={rng.choice(NOUNS)}&active=true&page_size={PAGE_SIZE}"
+        if operation == 'sku_search':
+            return f"/api/products/?sku=LT-{rng.choice(self.hot_ids) - 1:08d}"
+        if operation == 'get':
+            return f"/api/products/{rng.randint(1, self.products)}"
+        if operation == 'get_hot':
+            # Skewed towards the first hot products
+            return f"/api/products/{self.hot_ids[min(int(rng.expovariate(0.5)), HOT_PRODUCTS - 1)]}"
+        if operation == 'progress':
+            return f"/api/upload/progress/{rng.choice(self.task_ids)}"
+        raise ValueError(f"Unknown operation: {operation}")
+
+
+class LatencyStats:
+    """Latency samples per operation."""
+    
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+    
+    def record(self, operation: str, seconds: float, ok: bool) -> None:
+        self.samples.setdefault(operation, []).append(seconds)
+        if not ok:
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+    
+    @staticmethod
+    def summarize(samples: List[float], errors: int, duration: float) -> Dict:
+        ordered = sorted(samples)
+        
+        def percentile(p: float) -> float:
+            return round(ordered[min(int(p * len(ordered)), len(ordered) - 1)] * 1000, 3)
+        
+        histogram = {str(bound): 0 for bound in HISTOGRAM_BUCKETS_MS}
+        histogram['inf'] = 0
+        for seconds in ordered:
+            ms = seconds * 1000
+            for bound in HISTOGRAM_BUCKETS_MS:
+                if ms <= bound:
+                    histogram[str(bound)] += 1
+                    break
+            else:
+                histogram['inf'] += 1
+        
+        return {
+            'count': len(ordered),
+            'errors': errors,
+            'requests_per_second': round(len(ordered) / duration, 1),
+            'p50_ms': percentile(0.50),
+            'p90_ms': percentile(0.90),
+            'p99_ms': percentile(0.99),
+            'max_ms': round(ordered[-1] * 1000, 3),
+            'histogram_ms': histogram,
+        }
+    
+    def report(self, duration: float) -> Dict:
+        results = {
+            operation: self.summarize(samples, self.errors.get(operation, 0), duration)
+            for operation, samples in sorted(self.samples.items())
+        }
+        everything = [seconds for samples in self.samples.values() for seconds in samples]
+        if everything:
+            results['all'] = self.summarize(everything, sum(self.errors.values()), duration)
+        return results
+
+
+async def drive(client, plan: RequestPlan, mix: Dict[str, float], args) -> LatencyStats:
+    """Run the clients: warm-up first, then the measured period."""
+    
+    import httpx
+    
+    operations = list(mix)
+    weights = [mix[operation] for operation in operations]
+    stats = LatencyStats()
+    started = time.perf_counter()
+    measure_from = started + args.warmup
+    deadline = measure_from + args.duration
+    
+    async def client_loop(index: int) -> None:
+        rng = random.Random(args.seed * 1000 + index)
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                return
+            operation = rng.choices(operations, weights)[0]
+            path = plan.path(operation, rng)
+            request_started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if request_started >= measure_from:
+                stats.record(operation, time.perf_counter() - request_started, ok)
+    
+    await asyncio.gather(*(client_loop(i) for i in range(args.concurrency)))
+    return stats
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: int) -> (subprocess.Popen, str):
+    """Start uvicorn on a free local port and wait until it answers."""
+    
+    import httpx
+    
+    port = free_port()
+    server = subprocess.Popen([
+        sys.executable, '-m', 'uvicorn', 'app.main:app',
+        '--host', '127.0.0.1', '--port', str(port),
+        '--workers', str(workers), '--log-level', 'warning', '--no-access-log',
+    ])
+    url = f"http://127.0.0.1:{port}"
+    
+    for _ in range(300):
+        try:
+            if httpx.get(f"{url}/health").status_code == 200:
+                return server, url
+        except httpx.HTTPError:
+            pass
+        if server.poll() is not None:
+            sys.exit("uvicorn exited during startup")
+        time.sleep(0.1)
+    
+    server.terminate()
+    sys.exit("uvicorn did not become ready within 30s")
+
+
+def gate(results: Dict, args) -> List[str]:
+    """Regression gate failures for this run."""
+    
+    failures = []
+    
+    for operation, limit in parse_weights(args.max_p99).items():
+        if operation in results and results[operation]['p99_ms'] > limit:
+            failures.append(f"{operation}: p99 {results[operation]['p99_ms']:.1f}ms > {limit:.1f}ms")
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        for operation, result in results.items():
+            before = baseline.get(operation)
+            if before and result['p99_ms'] > before['p99_ms'] * (1 + args.threshold):
+                failures.append(
+                    f"{operation}: p99 {result['p99_ms']:.1f}ms vs baseline {before['p99_ms']:.1f}ms"
+                )
+    
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000, help='Products to seed')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=20, help='Measured seconds')
+    parser.add_argument('--warmup', type=float, default=3, help='Unmeasured seconds first')
+    parser.add_argument('--mix', default=None, help='Operation weights, e.g. list=30,get=70')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', default=None, help='Default: temporary SQLite file')
+    parser.add_argument('--reuse', action='store_true', help='Keep an already seeded products table')
+    parser.add_argument('--allow-reset', action='store_true', help='Allow deleting existing products')
+    parser.add_argument('--serve', action='store_true', help='Run the app under a local uvicorn')
+    parser.add_argument('--workers', type=int, default=1, help='uvicorn workers with --serve')
+    parser.add_argument('--url', default=None, help='Load-test a running server instead')
+    parser.add_argument('--max-p99', default=None, help='Gate: operation=ms,...')
+    parser.add_argument('--baseline', default=None, help='Gate: earlier results file')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed p99 growth over --baseline')
+    parser.add_argument('--output', default=None,
+                        help='JSON results file (default: benchmark-results/load-<commit>.json)')
+    args = parser.parse_args()
+    
+    # Settings are read at import time, so configure the app before importing it
+    work_dir = tempfile.mkdtemp(prefix='load_test_')
+    os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(work_dir, 'load.db')}"
+    os.environ['DEBUG'] = 'False'
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    
+    import httpx
+    
+    server = None
+    task_ids = []
+    try:
+        products = prepare_database(args)
+        task_ids = prepare_progress()
+        
+        mix = parse_weights(args.mix, DEFAULT_MIX)
+        if not task_ids:
+            mix.pop('progress', None)
+        plan = RequestPlan(products, task_ids, args.seed)
+        
+        if args.url:
+            target = args.url
+            client = httpx.AsyncClient(base_url=args.url, timeout=30)
+        elif args.serve:
+            server, target = start_server(args.workers)
+            limits = httpx.Limits(max_connections=args.concurrency)
+            client = httpx.AsyncClient(base_url=target, timeout=30, limits=limits)
+        else:
+            from app.main import app
+            
+            target = 'in-process'
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://loadtest', timeout=30)
+        
+        print(
+            f"{products:,} products, {args.concurrency} clients, {args.duration:.0f}s "
+            f"(+{args.warmup:.0f}s warm-up) against {target}"
+        )
+        
+        async def run() -> LatencyStats:
+            async with client:
+                return await drive(client, plan, mix, args)
+        
+        stats = asyncio.run(run())
+    
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        if task_ids:
+            from app.services.progress import ProgressService
+            
+            progress_service = ProgressService()
+            for task_id in task_ids:
+                progress_service.delete_progress(task_id)
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    results = stats.report(args.duration)
+    
+    print(f"{'operation':<12} {'count':>8} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for operation, result in results.items():
+        print(
+            f"{operation:<12} {result['count']:>8} {result['errors']:>7} {result['requests_per_second']:>9.1f} "
+            f"{result['p50_ms']:>9.2f} {result['p90_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['max_ms']:>9.2f}"
+        )
+    
+    commit = git_commit()
+    report = {
+        'benchmark': 'api_load',
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'params': {
+            'rows': products,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'mix': mix,
+            'target': 'url' if args.url else ('uvicorn' if args.serve else 'in-process'),
+            'workers': args.workers if args.serve else None,
+            'database': database_label(os.environ['DATABASE_URL']),
+        },
+        'results': results,
+    }
+    
+    output = args.output or os.path.join('benchmark-results', f"load-{commit or 'unknown'}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    
+    failures = gate(results, args)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,9 @@ Celery app initialization and configuration.
 """
 
 from celery import Celery
+from celery.schedules import crontab
 from app.config import get_settings
+from app.workers.queues import TASK_ROUTES
 
 settings = get_settings()
 
@@ -20,8 +22,21 @@ celery_app.conf.update(
     timezone='UTC',
     enable_utc=True,
     task_track_started=True,
-    task_time_limit=30 * 60,  # 30 minutes
+    task_routes=TASK_ROUTES,
+    task_time_limit=30 * 60,  # 30 minutes (imports stop at IMPORT_SOFT_TIME_LIMIT and resume)
     broker_connection_retry_on_startup=True,
+    beat_schedule={
+        # Rolling retention for webhook_logs (deletes in bounded chunks)
+        'prune-webhook-logs': {
+            'task': 'prune_webhook_logs',
+            'schedule': crontab(minute=17),  # Hourly
+        },
+        # Recompute catalog totals to correct drift in the incremental updates
+        'rebuild-catalog-stats': {
+            'task': 'rebuild_catalog_stats',
+            'schedule': crontab(minute=43, hour=3),  # Daily
+        },
+    },
 )
 
 # Auto-discover tasks from app.workers.tasks
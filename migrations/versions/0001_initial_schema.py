@@ -0,0 +1,177 @@
+"""Initial schema
+
+Tables and indexes as previously created by init_db (Base.metadata.create_all).
+Databases created that way are adopted: tables and indexes that already exist
+are kept, missing ones (such as tables added in later releases) created, and
+columns missing from an existing table added.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_table(name: str) -> bool:
+    if context.is_offline_mode():  # --sql: no database to inspect
+        return False
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _create_table(name: str, *columns, **kwargs) -> None:
+    if not _has_table(name):
+        op.create_table(name, *columns, **kwargs)
+        return
+    
+    # Adopted table, possibly created from an older model
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns(name)}
+    for column in columns:
+        if isinstance(column, sa.Column) and column.name not in existing:
+            op.add_column(name, column)
+
+
+def _index_names(table: str) -> set:
+    if context.is_offline_mode():
+        return set()
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        # Reflection skips expression indexes such as lower(sku)
+        return set(bind.execute(
+            sa.text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+            {'table': table},
+        ).scalars())
+    return {index['name'] for index in sa.inspect(bind).get_indexes(table)}
+
+
+def _create_index(name: str, table: str, columns, unique: bool = False) -> None:
+    if name not in _index_names(table):
+        op.create_index(name, table, columns, unique=unique)
+
+
+def upgrade() -> None:
+    _create_table(
+        'products',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sku', sa.String(length=255), nullable=False),
+        sa.Column('name', sa.String(length=500), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('price', sa.Float(), nullable=True),
+        sa.Column('quantity', sa.Integer(), nullable=True),
+        sa.Column('active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    _create_index('ix_products_id', 'products', ['id'])
+    _create_index('ix_products_sku', 'products', ['sku'], unique=True)
+    _create_index('ix_products_active', 'products', ['active'])
+    _create_index('ix_products_sku_lower', 'products', [sa.text('lower(sku)')])
+    
+    _create_table(
+        'webhooks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('url', sa.String(length=2000), nullable=False),
+        sa.Column('event_type', sa.String(length=50), nullable=False),
+        sa.Column('enabled', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    _create_index('ix_webhooks_id', 'webhooks', ['id'])
+    _create_index('ix_webhooks_event_type', 'webhooks', ['event_type'])
+    _create_index('ix_webhooks_enabled', 'webhooks', ['enabled'])
+    
+    _create_table(
+        'upload_tasks',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('filename', sa.String(length=500), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=True),
+        sa.Column('total_rows', sa.Integer(), nullable=True),
+        sa.Column('processed_rows', sa.Integer(), nullable=True),
+        sa.Column('created_products', sa.Integer(), nullable=True),
+        sa.Column('updated_products', sa.Integer(), nullable=True),
+        sa.Column('failed_rows', sa.Integer(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    _create_index('ix_upload_tasks_id', 'upload_tasks', ['id'])
+    
+    _create_table(
+        'import_checkpoints',
+        sa.Column('task_id', sa.String(length=36), nullable=False),
+        sa.Column('resume_offset', sa.BigInteger(), nullable=True),
+        sa.Column('resume_row', sa.Integer(), nullable=True),
+        sa.Column('next_row', sa.Integer(), nullable=True),
+        sa.Column('processed_rows', sa.Integer(), nullable=False),
+        sa.Column('created_products', sa.Integer(), nullable=False),
+        sa.Column('updated_products', sa.Integer(), nullable=False),
+        sa.Column('failed_rows', sa.Integer(), nullable=False),
+        sa.Column('duplicate_rows', sa.Integer(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('completed', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('task_id'),
+    )
+    
+    _create_table(
+        'webhook_logs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('webhook_id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(length=50), nullable=False),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('response_body', sa.Text(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    _create_index('ix_webhook_logs_id', 'webhook_logs', ['id'])
+    _create_index('ix_webhook_logs_webhook_id', 'webhook_logs', ['webhook_id'])
+    
+    _create_table(
+        'webhook_delivery_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('webhook_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('latency_bucket_ms', sa.Integer(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('successes', sa.Integer(), nullable=False),
+        sa.Column('total_latency_ms', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('webhook_id', 'day', 'latency_bucket_ms', name='uq_webhook_delivery_stats_bucket'),
+    )
+    _create_index('ix_webhook_delivery_stats_id', 'webhook_delivery_stats', ['id'])
+    _create_index('ix_webhook_delivery_stats_day', 'webhook_delivery_stats', ['day'])
+    
+    _create_table(
+        'webhook_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(length=50), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    _create_index('ix_webhook_outbox_id', 'webhook_outbox', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_table('webhook_outbox')
+    op.drop_table('webhook_delivery_stats')
+    op.drop_table('webhook_logs')
+    op.drop_table('import_checkpoints')
+    op.drop_table('upload_tasks')
+    op.drop_table('webhooks')
+    op.drop_table('products')
@@ -0,0 +1,75 @@
+"""Catalog stats
+
+Incrementally maintained catalog totals, seeded from the products table.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SLOTS = 16  # CatalogStatsService.SLOTS
+
+
+def upgrade() -> None:
+    offline = context.is_offline_mode()
+    
+    if offline or not sa.inspect(op.get_bind()).has_table('catalog_stats'):
+        op.create_table(
+            'catalog_stats',
+            sa.Column('slot', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('products', sa.BigInteger(), nullable=False),
+            sa.Column('active_products', sa.BigInteger(), nullable=False),
+            sa.Column('total_quantity', sa.BigInteger(), nullable=False),
+            sa.Column('inventory_value', sa.Float(), nullable=False),
+            sa.PrimaryKeyConstraint('slot'),
+        )
+    elif op.get_bind().execute(sa.text("SELECT count(*) FROM catalog_stats")).scalar():
+        return  # Created and maintained by init_db's create_all; already seeded
+    
+    stats = sa.table(
+        'catalog_stats',
+        sa.column('slot', sa.Integer),
+        sa.column('products', sa.BigInteger),
+        sa.column('active_products', sa.BigInteger),
+        sa.column('total_quantity', sa.BigInteger),
+        sa.column('inventory_value', sa.Float),
+    )
+    products = sa.table(
+        'products',
+        sa.column('price', sa.Float),
+        sa.column('quantity', sa.Integer),
+        sa.column('active', sa.Boolean),
+    )
+    quantity = sa.func.coalesce(products.c.quantity, 0)
+    
+    # Slot 0 holds the current totals, the other slots start at zero
+    op.execute(stats.insert().from_select(
+        ['slot', 'products', 'active_products', 'total_quantity', 'inventory_value'],
+        sa.select(
+            sa.literal(0),
+            sa.func.count(),
+            sa.func.coalesce(sa.func.sum(sa.case((products.c.active, 1), else_=0)), 0),
+            sa.func.coalesce(sa.func.sum(quantity), 0),
+            sa.func.coalesce(sa.func.sum(sa.func.coalesce(products.c.price, 0.0) * quantity), 0.0),
+        ).select_from(products),
+    ))
+    op.bulk_insert(stats, [
+        {'slot': slot, 'products': 0, 'active_products': 0, 'total_quantity': 0, 'inventory_value': 0.0}
+        for slot in range(1, SLOTS)
+    ])
+
+
+def downgrade() -> None:
+    op.drop_table('catalog_stats')
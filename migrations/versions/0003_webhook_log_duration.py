@@ -0,0 +1,53 @@
+"""Webhook log duration and composite index
+
+Adds webhook_logs.duration_ms and replaces the webhook_id index with
+(webhook_id, created_at), plus a created_at index for retention pruning.
+Tables created by init_db after these were added to the model already
+have them; they are left as they are.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _inspect():
+    if context.is_offline_mode():  # --sql: no database to inspect
+        return set(), set()
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns('webhook_logs')}
+    indexes = {index['name'] for index in inspector.get_indexes('webhook_logs')}
+    return columns, indexes
+
+
+def upgrade() -> None:
+    columns, indexes = _inspect()
+    
+    if 'duration_ms' not in columns:
+        op.add_column('webhook_logs', sa.Column('duration_ms', sa.Float(), nullable=True))
+    if 'ix_webhook_logs_webhook_id_created_at' not in indexes:
+        op.create_index('ix_webhook_logs_webhook_id_created_at', 'webhook_logs', ['webhook_id', 'created_at'])
+    if 'ix_webhook_logs_created_at' not in indexes:
+        op.create_index('ix_webhook_logs_created_at', 'webhook_logs', ['created_at'])
+    if context.is_offline_mode() or 'ix_webhook_logs_webhook_id' in indexes:
+        op.drop_index('ix_webhook_logs_webhook_id', table_name='webhook_logs')
+
+
+def downgrade() -> None:
+    op.create_index('ix_webhook_logs_webhook_id', 'webhook_logs', ['webhook_id'])
+    op.drop_index('ix_webhook_logs_created_at', table_name='webhook_logs')
+    op.drop_index('ix_webhook_logs_webhook_id_created_at', table_name='webhook_logs')
+    with op.batch_alter_table('webhook_logs') as batch:
+        batch.drop_column('duration_ms')
@@ -0,0 +1,102 @@
+"""
+Shared fixtures. Tests run against throwaway SQLite databases and need
+no PostgreSQL or Redis.
+"""
+
+import os
+import tempfile
+
+# Settings are read once, on first import of the app
+_scratch = tempfile.mkdtemp(prefix="product-importer-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_scratch}/app.db")
+os.environ.setdefault("UPLOAD_DIR", os.path.join(_scratch, "uploads"))
+
+import fakeredis
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import models  # noqa: F401 (registers the tables)
+from app import redis_client
+from app.config import get_settings
+from app.database import Base, engine
+from app.services.product_batch import ProductBatch
+from app.services.rate_limit import get_rate_limiter
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Session on a fresh database created from the models."""
+    
+    engine = create_engine(f"sqlite:///{tmp_path}/test.db")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def app_db():
+    """Fresh tables on the app's own engine, for code that opens SessionLocal."""
+    
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    """In-memory Redis (fakeredis) behind get_redis for every service."""
+    
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(redis_client.redis, "from_url", lambda url, **kwargs: client)
+    caches = (redis_client.get_redis, redis_client.get_broker_redis, get_rate_limiter)
+    for cache in caches:
+        cache.cache_clear()
+    yield client
+    for cache in caches:
+        cache.cache_clear()
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    """Point UPLOAD_DIR (import reports, SKU stores) at a temporary directory."""
+    
+    path = tmp_path / "uploads"
+    path.mkdir()
+    monkeypatch.setattr(get_settings(), "UPLOAD_DIR", str(path))
+    return path
+
+
+@pytest.fixture
+def write_csv(tmp_path):
+    """Write CSV text to a file, returning its path."""
+    
+    def write(text: str, name: str = "products.csv") -> str:
+        path = tmp_path / name
+        path.write_text(text)
+        return str(path)
+    
+    return write
+
+
+@pytest.fixture
+def make_batch():
+    """
+    Build a ProductBatch from rows of ``columns`` values, numbered from
+    ``first_row``; a row may be a bare value for a single column. Names
+    default to "Name <row number>".
+    """
+    
+    def make(rows, columns=("sku",), first_row: int = 2) -> ProductBatch:
+        batch = ProductBatch()
+        for row_number, row in enumerate(rows, start=first_row):
+            values = dict(zip(columns, row if isinstance(row, tuple) else (row,)))
+            batch.append(**{"name": f"Name {row_number}", **values}, row_number=row_number)
+        return batch
+    
+    return make
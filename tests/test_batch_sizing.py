@@ -0,0 +1,50 @@
+"""
+AdaptiveBatchSizer growth, shrinking and bounds.
+"""
+
+from app.services.batch_sizing import AdaptiveBatchSizer
+
+
+def make_sizer(**kwargs) -> AdaptiveBatchSizer:
+    options = dict(initial=1000, min_size=100, max_size=100000, target_seconds=2.0, memory_budget_mb=1024)
+    options.update(kwargs)
+    return AdaptiveBatchSizer(**options)
+
+
+def test_grows_while_full_batches_are_fast():
+    sizer = make_sizer()
+    
+    sizer.observe(1000, 0.1)
+    assert sizer.size == 1500
+    sizer.observe(1500, 0.1)
+    assert sizer.size == 2250
+
+
+def test_holds_on_partial_batch():
+    sizer = make_sizer()
+    
+    sizer.observe(400, 0.1)
+    assert sizer.size == 1000
+
+
+def test_shrinks_towards_target_latency():
+    sizer = make_sizer(initial=10000)
+    
+    sizer.observe(10000, 4.0)
+    assert sizer.size == 5000
+
+
+def test_steps_back_when_growth_stops_paying_off():
+    sizer = make_sizer()
+    
+    sizer.observe(1000, 0.1)  # 10000 rows/s
+    sizer.observe(1500, 0.15)  # Same rate: no gain
+    assert sizer.size == 1000
+
+
+def test_memory_budget_caps_size():
+    sizer = make_sizer(memory_budget_mb=1, buffered_batches=2)
+    
+    # 1000 rows took 1 MiB; two batches alive fit 500 rows in the budget
+    sizer.observe(1000, 0.1, nbytes=1024 * 1024)
+    assert sizer.size == 500
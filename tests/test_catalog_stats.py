@@ -0,0 +1,106 @@
+"""
+Catalog totals kept up to date by the deltas of every product write.
+"""
+
+import pytest
+
+from app.models import CatalogStats
+from app.services.catalog_stats import CatalogStatsService, StatsDelta
+from app.services.product_writer import ProductBatchWriter
+
+COLUMNS = ("sku", "price", "quantity", "active")
+
+
+def assert_totals(totals, products, active_products, total_quantity, inventory_value):
+    assert totals['products'] == products
+    assert totals['active_products'] == active_products
+    assert totals['total_quantity'] == total_quantity
+    assert totals['inventory_value'] == pytest.approx(inventory_value)
+
+
+@pytest.fixture(params=["sqlite", "other"])
+def stats_db(request, db, monkeypatch):
+    """The db fixture, also taking the upsert path of databases without ON CONFLICT."""
+    if request.param == "other":
+        monkeypatch.setattr(db.get_bind().dialect, "name", "mysql")
+    return db
+
+
+def test_delta_add_and_remove():
+    delta = StatsDelta()
+    assert not delta
+    
+    delta.add(2.5, 4, True)
+    delta.add(None, None, False)
+    delta.remove(1.0, 3, True)
+    
+    assert delta
+    assert delta.values() == {'products': 1, 'active_products': 0, 'total_quantity': 1, 'inventory_value': 7.0}
+    
+    delta.remove(None, None, False)
+    delta.add(1.0, 3, True)
+    delta.remove(2.5, 4, True)
+    assert not delta
+
+
+def test_writes_keep_totals_in_step_with_the_catalog(stats_db, make_batch):
+    db = stats_db
+    ProductBatchWriter.write(db, make_batch([
+        ("a", 2.0, 5, True),
+        ("b", None, None, None),
+        ("c", 1.5, 2, False),
+    ], COLUMNS))
+    db.commit()
+    assert_totals(CatalogStatsService.get(db), 3, 2, 7, 13.0)
+    
+    # New price for a, b deactivated, c untouched by missing values, d created
+    ProductBatchWriter.write(db, make_batch([
+        ("A", 3.0, None, None),
+        ("b", None, 1, False),
+        ("c", None, None, None),
+        ("d", 4.0, 1, True),
+    ], COLUMNS))
+    db.commit()
+    
+    totals = CatalogStatsService.get(db)
+    assert_totals(totals, 4, 2, 9, 22.0)
+    assert totals == pytest.approx(CatalogStatsService.rebuild(db))
+
+
+def test_rolled_back_write_leaves_totals_unchanged(stats_db, make_batch):
+    db = stats_db
+    ProductBatchWriter.write(db, make_batch([("a", 2.0, 5, True)], COLUMNS))
+    db.commit()
+    
+    ProductBatchWriter.write(db, make_batch([("b", 1.0, 1, True)], COLUMNS))
+    db.rollback()
+    
+    assert_totals(CatalogStatsService.get(db), 1, 1, 5, 10.0)
+
+
+def test_deltas_spread_over_slots_sum_up(stats_db, make_batch):
+    db = stats_db
+    for _ in range(50):
+        delta = StatsDelta()
+        delta.add(1.0, 2, True)
+        CatalogStatsService.apply(db, delta)
+    db.commit()
+    
+    assert db.query(CatalogStats).count() > 1
+    assert_totals(CatalogStatsService.get(db), 50, 50, 100, 100.0)
+
+
+def test_rebuild_washes_out_drift(stats_db, make_batch):
+    db = stats_db
+    ProductBatchWriter.write(db, make_batch([("a", 2.0, 5, True), ("b", 1.0, 1, False)], COLUMNS))
+    drift = StatsDelta()
+    drift.add(100.0, 100, True)
+    CatalogStatsService.apply(db, drift)
+    db.commit()
+    
+    totals = CatalogStatsService.rebuild(db)
+    db.commit()
+    
+    assert_totals(totals, 2, 1, 6, 11.0)
+    assert_totals(CatalogStatsService.get(db), 2, 1, 6, 11.0)
+    assert db.query(CatalogStats).count() == CatalogStatsService.SLOTS
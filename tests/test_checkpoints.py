@@ -0,0 +1,72 @@
+"""
+Import checkpoints and the reports truncated when an import resumes.
+"""
+
+import csv
+
+from app.models import ImportCheckpoint, Product
+from app.services.checkpoints import ImportCheckpointService
+from app.services.csv_parser import CSVParser
+from app.services.product_writer import ProductBatchWriter
+from app.services.reports import CSVReport
+
+PRODUCTS_CSV = "sku,name,price\n" + "".join(f"S{i},Name {i},{i}\n" for i in range(10))
+
+
+def import_batches(db, path, task_id, stop_after=None):
+    """Import like the task does, committing a checkpoint with every batch."""
+    
+    checkpoint = ImportCheckpointService.start(db, task_id)
+    start = ImportCheckpointService.resume_point(checkpoint)
+    processed = checkpoint.processed_rows or 0
+    created = checkpoint.created_products or 0
+    
+    for count, (batch, _) in enumerate(CSVParser.parse_csv(path, 3, start=start)):
+        if count == stop_after:
+            break
+        batch_created, _, _ = ProductBatchWriter.write(db, batch)
+        processed += len(batch)
+        created += len(batch_created)
+        ImportCheckpointService.advance(checkpoint, batch.resume, processed, created, 0, 0, 0)
+        db.commit()
+    return checkpoint
+
+
+def test_first_attempt_has_no_resume_point(db):
+    checkpoint = ImportCheckpointService.start(db, "task")
+    
+    assert checkpoint.attempts == 1
+    assert ImportCheckpointService.resume_point(checkpoint) is None
+
+
+def test_resumes_after_the_last_committed_batch(db, write_csv):
+    path = write_csv(PRODUCTS_CSV)
+    
+    interrupted = import_batches(db, path, "task", stop_after=2)
+    assert (interrupted.next_row, interrupted.processed_rows) == (8, 6)
+    
+    # An uncommitted batch is rolled back with its checkpoint
+    ImportCheckpointService.advance(interrupted, (0, 0, 99), 99, 99, 0, 0, 0)
+    db.rollback()
+    
+    resumed = import_batches(db, path, "task")
+    
+    assert resumed.attempts == 2
+    assert (resumed.processed_rows, resumed.created_products) == (10, 10)
+    assert sorted(sku for sku, in db.query(Product.sku)) == sorted(f"S{i}" for i in range(10))
+    assert db.query(ImportCheckpoint).count() == 1
+
+
+def test_report_drops_lines_of_uncommitted_rows(tmp_path):
+    path = str(tmp_path / "report.csv")
+    report = CSVReport(path, ["row", "sku"])
+    for row in (2, 5, 9, 12):
+        report.add([row, f"s{row}"])
+    report.close()
+    
+    resumed = CSVReport(path, ["row", "sku"], resume_row=9)
+    resumed.add([10, "again"])
+    resumed.close()
+    
+    with open(path, newline='') as f:
+        assert list(csv.reader(f)) == [["row", "sku"], ["2", "s2"], ["5", "s5"], ["10", "again"]]
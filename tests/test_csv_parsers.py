@@ -0,0 +1,110 @@
+"""
+Row and columnar CSV parsers: batches, validation errors and resume points.
+"""
+
+import pytest
+
+from app.services.columnar_parser import ColumnarCSVParser
+from app.services.csv_parser import CSVParser, CSVParseError
+
+PARSERS = pytest.mark.parametrize("parser", [CSVParser, ColumnarCSVParser], ids=["rows", "columnar"])
+
+# Rows 2-13: every third row is invalid, alternating missing name and bad price
+MIXED_CSV = "sku,name,price,quantity\n" + "".join(
+    f"S{i},,1,1\n" if i % 6 == 2 else f"S{i},Name {i},x,1\n" if i % 6 == 5 else f"S{i},Name {i},{i}.5,{i}\n"
+    for i in range(12)
+)
+
+
+def parse_all(parser, path, batch_size, start=None):
+    batches, errors = [], []
+    for batch, batch_errors in parser.parse_csv(path, batch_size, start=start):
+        batches.append(batch)
+        errors.extend(batch_errors)
+    return batches, errors
+
+
+@PARSERS
+@pytest.mark.parametrize("batch_size", [1, 2, 3, 5, 100])
+def test_reports_every_invalid_row(parser, write_csv, batch_size):
+    path = write_csv(MIXED_CSV)
+    
+    batches, errors = parse_all(parser, path, batch_size)
+    
+    assert [error.row for error in errors] == [4, 7, 10, 13]
+    assert [row for batch in batches for row in batch.row_numbers] == [2, 3, 5, 6, 8, 9, 11, 12]
+    assert all(len(batch) <= batch_size for batch in batches)
+
+
+@PARSERS
+def test_reports_errors_after_the_last_valid_row(parser, write_csv):
+    path = write_csv("sku,name,price\na,A,1\nb,,2\nc,C,x\n")
+    
+    batches, errors = parse_all(parser, path, 1)
+    
+    assert [list(batch.skus) for batch in batches] == [['a'], []]
+    assert errors == [
+        (3, 'b', "Name is required and cannot be empty"),
+        (4, 'c', "Invalid price value: x"),
+    ]
+
+
+@PARSERS
+def test_reports_errors_of_a_file_without_valid_rows(parser, write_csv):
+    path = write_csv("sku,name\n,A\nb,\n")
+    
+    batches, errors = parse_all(parser, path, 10)
+    
+    assert [len(batch) for batch in batches] == [0]
+    assert errors == [
+        (2, '', "SKU is required and cannot be empty"),
+        (3, 'b', "Name is required and cannot be empty"),
+    ]
+
+
+@PARSERS
+def test_missing_required_column(parser, write_csv):
+    path = write_csv("sku,price\na,1\n")
+    
+    with pytest.raises(CSVParseError, match="Missing required columns"):
+        parse_all(parser, path, 10)
+
+
+@PARSERS
+def test_parsers_agree(parser, write_csv):
+    path = write_csv(MIXED_CSV)
+    
+    batches, errors = parse_all(parser, path, 4)
+    expected_batches, expected_errors = parse_all(CSVParser, path, 4)
+    
+    assert errors == expected_errors
+    assert [list(batch) for batch in batches] == [list(batch) for batch in expected_batches]
+
+
+@PARSERS
+@pytest.mark.parametrize("batch_size", [1, 2, 3])
+def test_resumes_after_every_batch(parser, write_csv, batch_size):
+    # Quoted line breaks and blank lines make byte offsets and row numbers diverge
+    path = write_csv(
+        'sku,name,description,price\n'
+        'a,A,"two\nlines",1\n'
+        '\n'
+        'b,,,2\n'
+        'c,C,"x, ""y""",3\n'
+        'd,D,,x\n'
+        'e,E,"more\n\nlines",5\n'
+        'f,F,,6\n'
+    )
+    batches, errors = [], []
+    for batch, batch_errors in parser.parse_csv(path, batch_size):
+        batches.append((list(batch), batch.resume))
+        errors.extend(batch_errors)
+        
+    for index, (_, resume) in enumerate(batches):
+        rest, rest_errors = parse_all(parser, path, batch_size, start=resume)
+        
+        assert [row for batch in rest for row in batch] == [
+            row for rows, _ in batches[index + 1:] for row in rows
+        ]
+        assert rest_errors == [error for error in errors if error.row >= resume.next_row]
+        
\ No newline at end of file
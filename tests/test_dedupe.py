@@ -0,0 +1,80 @@
+"""
+Duplicate SKU policies of DuplicateSkuFilter.
+"""
+
+import csv
+
+import pytest
+
+from app.services.dedupe import DuplicateSkuFilter
+
+
+def read_report(dedupe: DuplicateSkuFilter):
+    with open(dedupe.report_path, newline='') as f:
+        return list(csv.reader(f))[1:]
+
+
+@pytest.fixture
+def make_filter(upload_dir):
+    filters = []
+    
+    def make(policy: str, task_id: str = "task", resume_row=None) -> DuplicateSkuFilter:
+        dedupe = DuplicateSkuFilter(task_id, policy=policy, resume_row=resume_row)
+        filters.append(dedupe)
+        return dedupe
+    
+    yield make
+    for dedupe in filters:
+        dedupe.close()
+
+
+def test_last_wins_keeps_repeated_rows(make_filter, make_batch):
+    dedupe = make_filter(DuplicateSkuFilter.LAST_WINS)
+    
+    first, duplicates = dedupe.filter(make_batch(["A", "B", "a"]))
+    assert (list(first.skus), duplicates) == (["A", "B", "a"], 1)
+    
+    second, duplicates = dedupe.filter(make_batch(["C", "b"], first_row=5))
+    assert (list(second.skus), duplicates) == (["C", "b"], 1)
+    
+    dedupe.flush()
+    assert read_report(dedupe) == [["4", "a", "2", "applied"], ["6", "b", "3", "applied"]]
+
+
+def test_first_wins_drops_repeated_rows(make_filter, make_batch):
+    dedupe = make_filter(DuplicateSkuFilter.FIRST_WINS)
+    
+    first, duplicates = dedupe.filter(make_batch(["A", "B", "a"]))
+    assert (list(first.skus), list(first.row_numbers), duplicates) == (["A", "B"], [2, 3], 1)
+    
+    second, duplicates = dedupe.filter(make_batch(["b", "C", "c"], first_row=5))
+    assert (list(second.skus), list(second.names), duplicates) == (["C"], ["Name 6"], 2)
+    
+    dedupe.flush()
+    assert read_report(dedupe) == [
+        ["4", "a", "2", "ignored"],
+        ["5", "b", "3", "ignored"],
+        ["7", "c", "6", "ignored"],
+    ]
+    assert dedupe.duplicate_count == 3
+
+
+def test_resume_forgets_uncommitted_rows(make_filter, make_batch):
+    dedupe = make_filter(DuplicateSkuFilter.FIRST_WINS)
+    dedupe.filter(make_batch(["A", "B"]))
+    dedupe.filter(make_batch(["C", "a"], first_row=4))  # Never committed
+    dedupe.flush()
+    dedupe.close(keep_store=True)
+    
+    resumed = make_filter(DuplicateSkuFilter.FIRST_WINS, resume_row=4)
+    batch, duplicates = resumed.filter(make_batch(["C", "a"], first_row=4))
+    
+    # C is new again; a still repeats row 2, reported once
+    assert (list(batch.skus), duplicates) == (["C"], 1)
+    resumed.flush()
+    assert read_report(resumed) == [["5", "a", "2", "ignored"]]
+
+
+def test_unknown_policy(upload_dir):
+    with pytest.raises(ValueError, match="Unknown duplicate SKU policy"):
+        DuplicateSkuFilter("task", policy="newest")
@@ -0,0 +1,113 @@
+"""
+Outbox dispatcher: claiming, coalescing and holding back product events.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import SessionLocal
+from app.models import OutboxEvent
+from app.services.outbox import OutboxService
+from app.workers import dispatcher
+from app.workers.dispatcher import OutboxDispatcher
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture(autouse=True)
+def batch_size(monkeypatch):
+    monkeypatch.setattr(dispatcher.settings, "PRODUCT_EVENT_BATCH_SIZE", 3)
+    monkeypatch.setattr(dispatcher.settings, "PRODUCT_EVENT_MAX_WAIT", 5)
+
+
+def make_event(event_type: str, age: float = 0, **payload) -> OutboxEvent:
+    return OutboxEvent(
+        event_type=event_type,
+        payload=json.dumps(payload),
+        created_at=NOW - timedelta(seconds=age),
+    )
+
+
+def product_event(event_type: str, *skus, age: float = 0) -> OutboxEvent:
+    return make_event(event_type, age, count=len(skus), skus=list(skus))
+
+
+def test_coalesces_product_events_into_full_batches():
+    events = [
+        product_event("product.created", "a", "b"),
+        product_event("product.updated", "x"),
+        product_event("product.created", "c", "d"),
+    ]
+    
+    ready, deliveries = OutboxDispatcher.plan(events, now=NOW)
+    
+    # Created SKUs fill a batch and go out with the remainder; the lone update waits
+    assert deliveries == [
+        ("product.created", {"count": 3, "skus": ["a", "b", "c"]}),
+        ("product.created", {"count": 1, "skus": ["d"]}),
+    ]
+    assert ready == [events[0], events[2]]
+
+
+def test_holds_partial_batches_until_the_oldest_event_is_due():
+    events = [product_event("product.created", "a", age=6), product_event("product.created", "b", age=1)]
+    
+    ready, deliveries = OutboxDispatcher.plan(events, now=NOW)
+    
+    assert deliveries == [("product.created", {"count": 2, "skus": ["a", "b"]})]
+    assert ready == events
+    
+    assert OutboxDispatcher.plan(events, now=NOW - timedelta(seconds=2)) == ([], [])
+
+
+def test_product_events_go_out_before_a_later_event():
+    events = [
+        product_event("product.created", "a"),
+        product_event("product.updated", "x"),
+        make_event("import.completed", task_id="t"),
+        product_event("product.created", "b"),
+    ]
+    
+    ready, deliveries = OutboxDispatcher.plan(events, now=NOW)
+    
+    assert deliveries == [
+        ("product.created", {"count": 1, "skus": ["a"]}),
+        ("product.updated", {"count": 1, "skus": ["x"]}),
+        ("import.completed", {"task_id": "t"}),
+    ]
+    # The product event after it is held as usual
+    assert ready == events[:3]
+
+
+def test_dispatch_once_deletes_only_sent_events(app_db, monkeypatch):
+    sent = []
+    monkeypatch.setattr(dispatcher, "trigger_webhooks_for_event", lambda *delivery: sent.append(delivery))
+    
+    with SessionLocal() as db:
+        OutboxService.enqueue(db, "product.created", {"count": 2, "skus": ["a", "b"]})
+        OutboxService.enqueue(db, "import.completed", {"task_id": "t"})
+        OutboxService.enqueue(db, "product.updated", {"count": 1, "skus": ["x"]})
+        db.commit()
+    
+    assert OutboxDispatcher(claim_size=10).dispatch_once() == 2
+    
+    assert sent == [
+        ("product.created", {"count": 2, "skus": ["a", "b"]}),
+        ("import.completed", {"task_id": "t"}),
+    ]
+    with SessionLocal() as db:
+        assert [event.event_type for event in db.query(OutboxEvent)] == ["product.updated"]
+
+
+def test_dispatch_once_claims_at_most_claim_size(app_db, monkeypatch):
+    monkeypatch.setattr(dispatcher, "trigger_webhooks_for_event", lambda *delivery: None)
+    
+    with SessionLocal() as db:
+        for index in range(5):
+            OutboxService.enqueue(db, "import.completed", {"task_id": str(index)})
+        db.commit()
+    
+    dispatch = OutboxDispatcher(claim_size=2)
+    assert [dispatch.dispatch_once() for _ in range(4)] == [2, 2, 1, 0]
@@ -0,0 +1,86 @@
+"""
+End-to-end CSV import task: counters and change events.
+"""
+
+import json
+
+import pytest
+from sqlalchemy import text
+
+from app.database import SessionLocal
+from app.models import ImportCheckpoint, OutboxEvent, Product
+from app.services.progress import ProgressService
+from app.workers import tasks
+
+
+@pytest.fixture
+def run_import(app_db, redis, upload_dir, write_csv, monkeypatch):
+    """Run process_csv_task over CSV text with small fixed batches."""
+    
+    monkeypatch.setattr(tasks.settings, "ADAPTIVE_BATCH_SIZE", False)
+    monkeypatch.setattr(tasks.settings, "DUPLICATE_SKU_POLICY", "last")
+    
+    def run(csv_text: str, batch_size: int, task_id: str = "task") -> ImportCheckpoint:
+        monkeypatch.setattr(tasks.settings, "BATCH_SIZE", batch_size)
+        ProgressService().init_progress(task_id, "products.csv")
+        tasks.process_csv_task.apply(args=(task_id, write_csv(csv_text)))
+        with SessionLocal() as db:
+            return db.get(ImportCheckpoint, task_id)
+    
+    return run
+
+
+@pytest.fixture
+def reject_bad_names(app_db):
+    """Make the database refuse products named 'bad', like a failed constraint."""
+    with app_db.begin() as connection:
+        for operation in ("INSERT", "UPDATE"):
+            connection.execute(text(
+                f"CREATE TRIGGER reject_bad_{operation.lower()} BEFORE {operation} ON products "
+                "WHEN NEW.name = 'bad' BEGIN SELECT RAISE(ABORT, 'bad name'); END"
+            ))
+
+
+def counters(checkpoint: ImportCheckpoint) -> tuple:
+    return (
+        checkpoint.created_products,
+        checkpoint.updated_products,
+        checkpoint.duplicate_rows,
+        checkpoint.failed_rows,
+    )
+
+
+def updated_events() -> list:
+    with SessionLocal() as db:
+        return [
+            json.loads(event.payload)['skus']
+            for event in db.query(OutboxEvent).filter(OutboxEvent.event_type == 'product.updated')
+        ]
+
+
+def test_repeats_count_as_duplicates_only(run_import):
+    with SessionLocal() as db:
+        db.add(Product(sku="X", name="Old"))
+        db.commit()
+    
+    checkpoint = run_import("sku,name\nX,One\nA,A\nx,Two\nB,B\na,A2\nX,Three\n", batch_size=3)
+    
+    # X updated once (repeated twice), A created once (repeated once)
+    assert counters(checkpoint) == (2, 1, 3, 0)
+    assert updated_events() == [["X"], ["a", "X"]]
+
+
+def test_repeat_of_a_rejected_row_is_a_create(run_import, reject_bad_names):
+    checkpoint = run_import("sku,name\nA,bad\nB,B\na,A\nC,C\nA,A again\n", batch_size=2)
+    
+    # a is the first row written for its SKU; the last A is a repeat of it
+    assert counters(checkpoint) == (3, 0, 2, 1)
+    with SessionLocal() as db:
+        assert sorted(sku for sku, in db.query(Product.sku)) == ["A", "B", "C"]
+
+
+def test_rejected_repeat_is_not_an_update(run_import, reject_bad_names):
+    checkpoint = run_import("sku,name\nA,A\nB,B\nA,bad\n", batch_size=2)
+    
+    assert counters(checkpoint) == (2, 0, 1, 1)
+    assert updated_events() == []
@@ -0,0 +1,162 @@
+"""
+Alembic migrations: fresh databases, and databases created by the old
+startup create_all that are adopted by the baseline revision.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import (
+    Boolean, Column, DateTime, Float, Integer, MetaData, String, Table, Text, create_engine, func, inspect,
+)
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.services.webhook_logs import WebhookLogService
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# SQLite cannot reflect lower(sku); assert_matches_models checks it by name
+pytestmark = pytest.mark.filterwarnings("ignore:.*expression-based index")
+
+
+def baseline_metadata() -> MetaData:
+    """The schema init_db created before migrations were introduced."""
+    
+    metadata = MetaData()
+    Table(
+        "products", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("sku", String(255), unique=True, nullable=False, index=True),
+        Column("name", String(500), nullable=False),
+        Column("description", Text),
+        Column("price", Float),
+        Column("quantity", Integer),
+        Column("active", Boolean, index=True),
+        Column("created_at", DateTime, server_default=func.now()),
+        Column("updated_at", DateTime, server_default=func.now()),
+    )
+    Table(
+        "webhooks", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("url", String(2000), nullable=False),
+        Column("event_type", String(50), nullable=False, index=True),
+        Column("enabled", Boolean, index=True),
+        Column("created_at", DateTime, server_default=func.now()),
+        Column("updated_at", DateTime, server_default=func.now()),
+    )
+    Table(
+        "upload_tasks", metadata,
+        Column("id", String(36), primary_key=True, index=True),
+        Column("filename", String(500), nullable=False),
+        Column("status", String(50)),
+        Column("total_rows", Integer),
+        Column("processed_rows", Integer),
+        Column("created_products", Integer),
+        Column("updated_products", Integer),
+        Column("failed_rows", Integer),
+        Column("error_message", Text),
+        Column("created_at", DateTime, server_default=func.now()),
+        Column("completed_at", DateTime),
+    )
+    Table(
+        "webhook_logs", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("webhook_id", Integer, nullable=False, index=True),
+        Column("event_type", String(50), nullable=False),
+        Column("status_code", Integer),
+        Column("response_body", Text),
+        Column("error_message", Text),
+        Column("created_at", DateTime, server_default=func.now()),
+    )
+    return metadata
+
+
+def alembic(url: str, *args: str) -> None:
+    """Run the alembic command line against ``url``."""
+    
+    subprocess.run(
+        [sys.executable, "-m", "alembic", *args],
+        cwd=ROOT,
+        env={**os.environ, "DATABASE_URL": url},
+        check=True,
+        capture_output=True,
+    )
+
+
+def assert_matches_models(engine) -> None:
+    with engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), Base.metadata) == []
+        assert connection.exec_driver_sql(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'index' AND name = 'ix_products_sku_lower'"
+        ).scalar() == 1
+
+
+def assert_logs_deliveries(engine) -> None:
+    with Session(engine) as db:
+        WebhookLogService.record(db, 1, "product.created", status_code=200, duration_ms=12.5)
+        db.commit()
+        assert WebhookLogService.get_stats(db, 1, 1)["attempts"] == 1
+
+
+@pytest.fixture
+def database(tmp_path):
+    url = f"sqlite:///{tmp_path}/migrated.db"
+    engine = create_engine(url)
+    yield url, engine
+    engine.dispose()
+
+
+def test_upgrade_fresh_database(database):
+    url, engine = database
+    alembic(url, "upgrade", "head")
+    
+    assert_matches_models(engine)
+    assert_logs_deliveries(engine)
+
+
+def test_upgrade_adopts_baseline_create_all_database(database):
+    url, engine = database
+    baseline_metadata().create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            baseline_metadata().tables["products"].insert(),
+            [{"sku": "A-1", "name": "A", "price": 2.0, "quantity": 3, "active": True}],
+        )
+    
+    alembic(url, "upgrade", "head")
+    
+    assert_matches_models(engine)
+    assert_logs_deliveries(engine)
+    
+    indexes = {index["name"] for index in inspect(engine).get_indexes("webhook_logs")}
+    assert "ix_webhook_logs_webhook_id" not in indexes
+    assert "ix_webhook_logs_webhook_id_created_at" in indexes
+    
+    # Catalog stats are seeded from the existing products
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT sum(products), sum(total_quantity) FROM catalog_stats").one() == (1, 3)
+
+
+def test_upgrade_adopts_current_create_all_database(database):
+    url, engine = database
+    Base.metadata.create_all(engine)
+    
+    alembic(url, "upgrade", "head")
+    
+    assert_matches_models(engine)
+
+
+def test_downgrade_to_base_and_back(database):
+    url, engine = database
+    alembic(url, "upgrade", "head")
+    alembic(url, "downgrade", "base")
+    
+    assert inspect(engine).get_table_names() == ["alembic_version"]
+    
+    alembic(url, "upgrade", "head")
+    assert_matches_models(engine)
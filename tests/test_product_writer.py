@@ -0,0 +1,64 @@
+"""
+Bulk product upserts and isolation of rows the database rejects.
+"""
+
+from app.models import Product
+from app.services.catalog_stats import CatalogStatsService
+from app.services.product_batch import ProductBatch
+from app.services.product_writer import ProductBatchWriter
+
+COLUMNS = ("sku", "name", "price", "quantity")
+
+
+def test_write_creates_and_updates_case_insensitively(db, make_batch):
+    db.add(Product(sku="A-1", name="Old", price=1.0, quantity=1))
+    db.commit()
+    
+    created, updated, repeated = ProductBatchWriter.write(db, make_batch([
+        ("a-1", "New", None, 5),
+        ("B-2", "B", 2.0, None),
+        ("b-2", "B again", None, 7),
+    ], COLUMNS))
+    db.commit()
+    
+    assert created == ["B-2"]
+    assert updated == ["a-1"]
+    assert repeated == ["b-2"]
+    products = {product.sku: product for product in db.query(Product)}
+    assert (products["a-1"].name, products["a-1"].price, products["a-1"].quantity) == ("New", 1.0, 5)
+    # Repeated SKUs fold in order; the last spelling is stored
+    assert (products["b-2"].name, products["b-2"].price, products["b-2"].quantity) == ("B again", 2.0, 7)
+
+
+def test_write_isolated_rejects_only_bad_rows(db, make_batch):
+    # A missing name violates NOT NULL; bisection must single out rows 4 and 9
+    rows = [(f"S{i}", None if i in (2, 7) else f"Name {i}", 1.0, 1) for i in range(10)]
+    
+    created, updated, repeated, rejected = ProductBatchWriter.write_isolated(db, make_batch(rows, COLUMNS))
+    db.commit()
+    
+    assert [(row, sku) for row, sku, _ in rejected] == [(4, "S2"), (9, "S7")]
+    assert all("NOT NULL" in reason for _, _, reason in rejected)
+    assert created == [f"S{i}" for i in range(10) if i not in (2, 7)]
+    assert updated == repeated == []
+    assert db.query(Product).count() == 8
+    
+    # Rolled-back halves leave no trace in the catalog totals
+    assert CatalogStatsService.get(db)["products"] == 8
+
+
+def test_write_isolated_keeps_file_order_for_repeated_skus(db, make_batch):
+    rows = [("S1", "First", 1.0, 1), ("S2", None, 1.0, 1), ("s1", "Second", None, 2), ("S3", "Third", 3.0, 3)]
+    
+    created, updated, repeated, rejected = ProductBatchWriter.write_isolated(db, make_batch(rows, COLUMNS))
+    db.commit()
+    
+    assert [sku for _, sku, _ in rejected] == ["S2"]
+    # s1 lands in another half than S1, yet is still a repeat, not an update
+    assert (created, updated, repeated) == (["S1", "S3"], [], ["s1"])
+    product = db.query(Product).filter(Product.sku.ilike("s1")).one()
+    assert (product.name, product.price, product.quantity) == ("Second", 1.0, 2)
+
+
+def test_write_isolated_empty_batch(db):
+    assert ProductBatchWriter.write_isolated(db, ProductBatch()) == ([], [], [], [])
@@ -0,0 +1,91 @@
+"""
+Hashed static files: the asset manifest behind rendered pages.
+"""
+
+import os
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from app.static_files import HashedStaticFiles
+
+PAGE = '<script src="/static/app.js"></script><script src="/static/extra.js"></script>'
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    (tmp_path / "index.html").write_text(PAGE)
+    (tmp_path / "app.js").write_text("console.log(1);")
+    # Back-date the directory so a change made during the test moves its mtime
+    os.utime(tmp_path, (0, 0))
+    return tmp_path
+
+
+@pytest.fixture
+def walks(monkeypatch):
+    """Count walks of the static tree."""
+    
+    calls = []
+    walk = os.walk
+    
+    def counting_walk(top, *args, **kwargs):
+        calls.append(top)
+        return walk(top, *args, **kwargs)
+    
+    monkeypatch.setattr(os, "walk", counting_walk)
+    return calls
+
+
+@pytest.fixture
+def static(static_dir, walks):
+    files = HashedStaticFiles(directory=str(static_dir))
+    client = TestClient(Starlette(routes=[Mount("/static", app=files)]))
+    return files, client
+
+
+def test_manifest_is_built_once(static, walks):
+    files, client = static
+    
+    for _ in range(3):
+        page = client.get("/static/index.html").text
+    
+    assert len(walks) == 1
+    assert f'/static/{files.manifest()["app.js"]}' in page
+    assert '"/static/extra.js"' in page
+
+
+def test_new_asset_rebuilds_the_manifest(static, static_dir, walks):
+    files, client = static
+    client.get("/static/index.html")
+    
+    (static_dir / "extra.js").write_text("console.log(2);")
+    page = client.get("/static/index.html").text
+    
+    assert len(walks) == 2
+    assert f'/static/{files.manifest()["extra.js"]}' in page
+
+
+def test_edited_page_is_rendered_again(static, static_dir, walks):
+    _, client = static
+    client.get("/static/index.html")
+    
+    index = static_dir / "index.html"
+    index.write_text("<p>new</p>")
+    os.utime(index, (1, 1))
+    
+    assert client.get("/static/index.html").text == "<p>new</p>"
+    assert len(walks) == 1
+
+
+def test_hash_of_an_older_version_serves_the_current_file(static, static_dir):
+    files, client = static
+    stale = files.manifest()["app.js"]
+    
+    (static_dir / "app.js").write_text("console.log(3);")
+    os.utime(static_dir / "app.js", (1, 1))
+    response = client.get(f"/static/{stale}")
+    
+    assert response.text == "console.log(3);"
+    assert response.headers["cache-control"] == HashedStaticFiles.REVALIDATE
@@ -0,0 +1,140 @@
+"""
+CSV upload endpoint: queue routing and load shedding before the body is read.
+"""
+
+import asyncio
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.main import app
+from app.routers import upload as upload_router
+from app.services.progress import ProgressService
+from app.services.rate_limit import ImportSlots
+from app.workers import tasks
+from app.workers.queues import IMPORTS_BULK, IMPORTS_SMALL
+
+CSV = b"sku,name\na,A\n"
+
+
+@pytest.fixture
+def client(redis, monkeypatch):
+    monkeypatch.setattr(tasks.settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(tasks.settings, "MAX_CONCURRENT_IMPORTS_PER_CLIENT", 1)
+    return TestClient(app)
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    """Imports handed to Celery, as (task_id, file_path, queue)."""
+    
+    imports = []
+    
+    def apply_async(args, queue=None, **options):
+        imports.append((*args, queue))
+    
+    monkeypatch.setattr(tasks.process_csv_task, "apply_async", apply_async)
+    yield imports
+    for _, file_path, _ in imports:
+        os.remove(file_path)
+
+
+@pytest.fixture
+def forms_read(monkeypatch):
+    """Count request bodies parsed as forms."""
+    
+    reads = []
+    form = Request.form
+    
+    def counting_form(self, *args, **kwargs):
+        reads.append(self.url.path)
+        return form(self, *args, **kwargs)
+    
+    monkeypatch.setattr(Request, "form", counting_form)
+    return reads
+
+
+def upload(client, filename="products.csv", content=CSV):
+    return client.post("/api/upload/", files={"file": (filename, content, "text/csv")})
+
+
+def held_slots(redis) -> int:
+    return sum(redis.zcard(key) for key in redis.keys(f"{ImportSlots.PREFIX}*"))
+
+
+def test_upload_enqueues_the_import(client, enqueued, redis):
+    response = upload(client)
+    
+    assert response.status_code == 200
+    task_id, file_path, queue = enqueued[0]
+    assert response.json()["task_id"] == task_id
+    assert queue == IMPORTS_SMALL
+    with open(file_path, "rb") as f:
+        assert f.read() == CSV
+    assert held_slots(redis) == 1
+
+
+def test_full_queue_refuses_before_reading_the_body(client, enqueued, forms_read, redis):
+    redis.rpush(IMPORTS_SMALL, *range(tasks.settings.IMPORT_MAX_BACKLOG))
+    
+    response = upload(client)
+    
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == str(tasks.settings.IMPORT_BACKLOG_RETRY_AFTER)
+    assert forms_read == [] and enqueued == []
+    assert held_slots(redis) == 0
+
+
+def test_routes_by_declared_size(client, enqueued, redis, monkeypatch):
+    monkeypatch.setattr(tasks.settings, "SMALL_IMPORT_MAX_MB", 0)
+    redis.rpush(IMPORTS_SMALL, *range(tasks.settings.IMPORT_MAX_BACKLOG))
+    
+    # Over the small-import size, so the full small queue does not matter
+    assert upload(client).status_code == 200
+    assert enqueued[0][2] == IMPORTS_BULK
+
+
+def test_client_over_its_import_cap_is_refused_before_reading_the_body(client, enqueued, forms_read, redis):
+    assert upload(client).status_code == 200
+    forms_read.clear()
+    
+    response = upload(client)
+    
+    assert response.status_code == 429
+    assert forms_read == []
+    assert len(enqueued) == 1 and held_slots(redis) == 1
+
+
+@pytest.mark.parametrize("filename, status_code", [("products.txt", 400), ("", 422)])
+def test_refused_file_frees_its_slot(client, enqueued, redis, filename, status_code):
+    response = upload(client, filename=filename)
+    
+    assert response.status_code == status_code
+    assert enqueued == []
+    assert held_slots(redis) == 0
+
+
+def test_redis_calls_run_off_the_event_loop(client, enqueued, monkeypatch):
+    on_loop = []
+    
+    def record(function):
+        def wrapper(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(function.__name__)
+            except RuntimeError:
+                pass
+            return function(*args, **kwargs)
+        return wrapper
+    
+    monkeypatch.setattr(upload_router, "queue_depth", record(upload_router.queue_depth))
+    monkeypatch.setattr(ImportSlots, "acquire", record(ImportSlots.acquire))
+    monkeypatch.setattr(ProgressService, "init_progress", record(ProgressService.init_progress))
+    monkeypatch.setattr(ProgressService, "get_progress", record(ProgressService.get_progress))
+    
+    task_id = upload(client).json()["task_id"]
+    assert client.get(f"/api/upload/progress/{task_id}").status_code == 200
+    
+    assert on_loop == []
@@ -0,0 +1,185 @@
+"""
+Webhook deliveries: circuit breaker, backoff and the retry budget.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+import requests
+from celery.exceptions import Retry
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import WebhookLog
+from app.services import circuit_breaker
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.webhook_service import CircuitOpenError, WebhookDeliveryError, WebhookService
+from app.workers.tasks import send_webhook_task
+
+URL = "https://example.com/hook"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time for the breaker."""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(circuit_breaker, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+@pytest.fixture
+def breaker(redis, clock):
+    return CircuitBreaker(failure_threshold=3, reset_timeout=60)
+
+
+@pytest.fixture
+def respond(monkeypatch):
+    """Make every webhook POST answer with the given status, counting calls."""
+    
+    calls = []
+    
+    def set_status(status_code: int):
+        def post(url, **kwargs):
+            calls.append(url)
+            return SimpleNamespace(status_code=status_code, text=f"HTTP {status_code}")
+        monkeypatch.setattr(requests, "post", post)
+        return calls
+    
+    return set_status
+
+
+@pytest.fixture
+def retries(monkeypatch):
+    """Capture the retries send_webhook_task schedules instead of running them."""
+    
+    scheduled = []
+    
+    def retry(exc=None, countdown=None, kwargs=None, **options):
+        scheduled.append(SimpleNamespace(exc=exc, countdown=countdown, kwargs=kwargs or {}))
+        return Retry(exc=exc, when=countdown)
+    
+    monkeypatch.setattr(send_webhook_task, "retry", retry)
+    return scheduled
+
+
+def open_circuit(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure(URL)
+
+
+def webhook_logs():
+    with SessionLocal() as db:
+        return [log.error_message for log in db.query(WebhookLog).order_by(WebhookLog.id)]
+
+
+def test_breaker_opens_after_consecutive_failures(breaker, clock):
+    breaker.record_failure(URL)
+    breaker.record_failure(URL)
+    breaker.record_success(URL)
+    breaker.record_failure(URL)
+    breaker.record_failure(URL)
+    assert breaker.allow_request(URL)
+    
+    breaker.record_failure(URL)
+    
+    assert not breaker.allow_request(URL)
+    assert breaker.get_status(URL)['state'] == CircuitBreaker.OPEN
+    clock.value += 20
+    assert breaker.retry_after(URL) == 40
+
+
+def test_breaker_admits_one_probe_after_the_timeout(breaker, clock):
+    open_circuit(breaker)
+    clock.value += 60
+    
+    assert breaker.get_status(URL)['state'] == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request(URL)
+    assert not breaker.allow_request(URL)
+    
+    # A failed probe reopens the circuit for another timeout
+    breaker.record_failure(URL)
+    assert not breaker.allow_request(URL)
+    assert breaker.retry_after(URL) == 60
+    
+    clock.value += 60
+    assert breaker.allow_request(URL)
+    breaker.record_success(URL)
+    assert breaker.get_status(URL)['state'] == CircuitBreaker.CLOSED
+    assert breaker.allow_request(URL)
+
+
+@pytest.mark.parametrize("attempt", range(12))
+def test_backoff_is_jittered_and_capped(attempt):
+    settings = get_settings()
+    ceiling = max(settings.WEBHOOK_BACKOFF_BASE, min(settings.WEBHOOK_BACKOFF_MAX, settings.WEBHOOK_BACKOFF_BASE * 2 ** attempt))
+    
+    delays = [WebhookService.compute_backoff(attempt) for _ in range(50)]
+    
+    assert all(settings.WEBHOOK_BACKOFF_BASE / 2 <= delay <= ceiling for delay in delays)
+
+
+@pytest.mark.parametrize("status_code, retryable", [(404, False), (410, False), (401, False), (429, True), (503, True)])
+def test_error_statuses_count_against_the_circuit(breaker, respond, status_code, retryable):
+    respond(status_code)
+    service = WebhookService(circuit_breaker=breaker)
+    
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(WebhookDeliveryError) as error:
+            service.trigger_webhook(URL, "product.created", {})
+        assert (error.value.status_code, error.value.retryable) == (status_code, retryable)
+    
+    with pytest.raises(CircuitOpenError):
+        service.trigger_webhook(URL, "product.created", {})
+
+
+def test_shed_while_probing_waits_for_the_probe(breaker, clock, respond):
+    calls = respond(200)
+    service = WebhookService(circuit_breaker=breaker)
+    open_circuit(breaker)
+    clock.value += 60
+    assert breaker.allow_request(URL)  # Another worker's probe
+    
+    with pytest.raises(CircuitOpenError) as error:
+        service.trigger_webhook(URL, "product.created", {})
+    
+    assert error.value.retry_after == breaker.reset_timeout
+    assert calls == []
+
+
+def test_sheds_do_not_use_up_the_retry_budget(app_db, redis, clock, respond, retries):
+    calls = respond(200)
+    open_circuit(CircuitBreaker())
+    
+    # Deferred many times over already
+    send_webhook_task.apply(args=(1, URL, "product.created", {}), retries=50)
+    
+    assert calls == [] and webhook_logs() == []
+    assert len(retries) == 1
+    assert isinstance(retries[0].exc, CircuitOpenError)
+    assert retries[0].countdown >= get_settings().CIRCUIT_RESET_TIMEOUT
+    assert "attempts" not in retries[0].kwargs
+
+
+def test_real_attempts_use_up_the_retry_budget(app_db, redis, respond, retries):
+    respond(503)
+    max_retries = get_settings().WEBHOOK_RETRIES
+    
+    send_webhook_task.apply(args=(1, URL, "product.created", {}), retries=50)
+    assert [retry.kwargs for retry in retries] == [{'attempts': 1}]
+    
+    send_webhook_task.apply(args=(1, URL, "product.created", {}), kwargs={'attempts': max_retries}, retries=60)
+    
+    assert len(retries) == 1
+    assert webhook_logs() == [
+        "Attempt 1: Endpoint returned HTTP 503",
+        f"Attempt {max_retries + 1}: Endpoint returned HTTP 503",
+    ]
+
+
+def test_permanent_errors_are_not_retried(app_db, redis, respond, retries):
+    respond(404)
+    
+    send_webhook_task.apply(args=(1, URL, "product.created", {}))
+    
+    assert retries == []
+    assert webhook_logs() == ["Attempt 1: Endpoint returned HTTP 404"]
@@ -0,0 +1,61 @@
+"""
+Webhook log retention.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app.models import WebhookDeliveryStats, WebhookLog
+from app.services import webhook_logs
+from app.services.webhook_logs import WebhookLogService
+
+
+class FarFuture(datetime):
+    """An application clock a year ahead of the database."""
+    
+    @classmethod
+    def utcnow(cls):
+        return datetime.utcnow() + timedelta(days=365)
+
+
+def add_log(db, days_old: int) -> None:
+    stamp = db.scalar(select(func.datetime('now', f'-{days_old} days')))
+    db.add(WebhookLog(webhook_id=1, event_type="product.created", created_at=datetime.fromisoformat(stamp)))
+
+
+def test_prune_deletes_expired_logs_in_chunks(db):
+    for days_old in (30, 20, 15, 13, 1):
+        add_log(db, days_old)
+    db.add(WebhookLog(webhook_id=1, event_type="product.created"))  # Stamped by the database
+    db.commit()
+    
+    assert WebhookLogService.prune(db, retention_days=14, chunk_size=2) == 3
+    assert db.query(WebhookLog).count() == 3
+
+
+def test_prune_follows_the_database_clock(db, monkeypatch):
+    monkeypatch.setattr(webhook_logs, "datetime", FarFuture)
+    add_log(db, 20)
+    add_log(db, 1)
+    db.commit()
+    
+    assert WebhookLogService.prune(db, retention_days=14) == 1
+
+
+def test_prune_deletes_expired_stats(db):
+    today = datetime.utcnow().date()
+    for days_old in (400, 10):
+        db.add(WebhookDeliveryStats(
+            webhook_id=1,
+            day=today - timedelta(days=days_old),
+            latency_bucket_ms=50,
+            attempts=1,
+            successes=1,
+            total_latency_ms=10,
+        ))
+    db.commit()
+    
+    WebhookLogService.prune(db, stats_retention_days=365)
+    
+    assert [stats.day for stats in db.query(WebhookDeliveryStats)] == [today - timedelta(days=10)]